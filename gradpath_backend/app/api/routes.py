@@ -1,58 +1,119 @@
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+import gzip
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # 20 MB hard cap on every upload
 _MAX_UPLOAD_BYTES = 20 * 1024 * 1024
 _VALID_DOC_KINDS = {"transcript", "degree_audit", "course_catalog", "prereq_list"}
+_PREVIEW_MAX_PAGES = 3
+_PREVIEW_MAX_CHARS = 2000
 
 from app.schemas.plan import PlanGenerateRequest, PlanGenerateResponse
 from app.schemas.plan_detail import PlanDetailResponse
 from app.schemas.plan_compare import PlanCompareResponse
 from app.schemas.risk import RiskResponse
 from app.schemas.simulate import SimulateRequest, SimulateResponse
-from app.schemas.course import CourseCreate, CourseCreateRequest, CourseResponse
+from app.schemas.course import CourseCreateRequest, CourseImportResponse, CourseResponse
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, UserOut
 from app.schemas.transcript import (
     TranscriptUploadResponse,
     TranscriptConfirmRequest,
     TranscriptConfirmResponse,
+    TranscriptImportResponse,
     TranscriptStatusResponse,
 )
 from app.schemas.document import DocumentUploadResponse
 from app.schemas.parse_preview import ParsePreviewResponse, DocumentParsePreview
+from app.schemas.batch import BatchRequest, BatchSubResponse
+from app.schemas.dashboard import DashboardResponse
 from app.schemas.student import StudentCreateRequest, StudentResponse, StudentResumeResponse, StudentUpdateRequest
 from app.schemas.program import ProgramCreateRequest, ProgramResponse
 from app.schemas.requirement import RequirementCreateRequest, RequirementResponse
 from app.schemas.prerequisite import PrerequisiteCreateRequest, PrerequisiteResponse
-from app.services.planner import generate_plan
-from app.services.students import create_student, calculate_gpa, get_student, update_student
+from app.services.planner import generate_plan, generate_plan_stream
+from app.services.students import (
+    calculate_gpa_async,
+    create_student,
+    get_student_async,
+    lookup_student_async,
+    update_student,
+)
 from app.services.courses import bulk_create_courses
+from app.services.catalog_import import import_catalog_csv
 from app.services.transcripts import (
     create_transcript_stub,
     create_transcript_with_csv,
     create_transcript_with_pdf,
     confirm_transcript,
     get_parse_preview_for_document,
-    get_transcript_status,
+    get_transcript_status_async,
 )
+from app.services.transcript_import import get_import_report, import_transcript_archive
 from app.services.documents import create_document, create_document_from_pdf
-from app.services.pdf_parser import extract_text_from_pdf
+from app.services.batch import run_batch
+from app.services.dashboard import get_dashboard, parse_sections
+from app.services.ingest import status_events
+from app.services.etags import completed_plan_etag, plan_etag, student_etag, transcript_etag
+from app.services.pdf_pool import extract_text_in_pool
 from app.services.programs import create_program, add_requirements
 from app.services.prerequisites import bulk_create_prereqs
-from app.services.plans import get_plan, get_plan_risks, compare_plans
-from app.services.transcript_parser import parse_catalog_csv
+from app.services.plans import (
+    get_plan_async,
+    get_plan_risks_async,
+    get_stored_plan_async,
+    materialize_plan_document,
+)
+from app.services.plan_diff import compare_plans
 from app.services.simulate import simulate_plan
 from app.services.auth import get_current_user, login_user, register_user
-from app.core.database import get_db
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.query_stats import query_budget
 from app.models.user import User
+from app.models.document import DocumentUpload
 from app.models.transcript import Transcript
 from app.models.plan import Plan
-from app.models.student import Student
 
 router = APIRouter(prefix="/api")
 
 
+def _not_modified(
+    request: Request, response: Response, etag: str | None, immutable: bool = False
+) -> Response | None:
+    """Return a bare 304 when If-None-Match matches ``etag``; otherwise tag ``response``."""
+    if etag is None:
+        return None
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=31536000, immutable" if immutable else "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _gzip_json_response(request: Request, response: Response, body: bytes) -> Response:
+    """Send a gzip-compressed JSON body as-is, or inflated for clients without gzip."""
+    headers = {
+        name: response.headers[name] for name in ("etag", "cache-control") if name in response.headers
+    }
+    headers["Vary"] = "Accept-Encoding"
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/students", response_model=StudentResponse)
+@query_budget(6)
 def create_student_endpoint(
     payload: StudentCreateRequest,
     db: Session = Depends(get_db),
@@ -61,12 +122,34 @@ def create_student_endpoint(
 
 
 @router.get("/students/{student_id}/gpa")
-def get_student_gpa(student_id: int, db: Session = Depends(get_db)):
-    gpa, credits = calculate_gpa(db, student_id)
+@query_budget(4)
+async def get_student_gpa(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    etag = await db.run_sync(transcript_etag, student_id, "gpa")
+    if cached := _not_modified(request, response, etag):
+        return cached
+    gpa, credits = await calculate_gpa_async(db, student_id)
     return {"student_id": student_id, "gpa": gpa, "credits": credits}
 
 
+@router.get("/students/{student_id}/dashboard", response_model=DashboardResponse)
+@query_budget(8)
+def get_student_dashboard_endpoint(
+    student_id: int,
+    fields: str | None = Query(
+        None, description="Comma-separated sections: student,plan,risks,gpa,transcript"
+    ),
+    db: Session = Depends(get_read_db),
+):
+    return get_dashboard(db, student_id, parse_sections(fields))
+
+
 @router.post("/plans/generate", response_model=PlanGenerateResponse)
+@query_budget(20)
 def generate_plan_endpoint(
     payload: PlanGenerateRequest,
     db: Session = Depends(get_db),
@@ -74,6 +157,19 @@ def generate_plan_endpoint(
     return generate_plan(db, payload)
 
 
+@router.post("/plans/generate/stream")
+def generate_plan_stream_endpoint(payload: PlanGenerateRequest, request: Request):
+    """``/plans/generate`` streamed term by term, as NDJSON or server-sent events.
+
+    Send ``Accept: text/event-stream`` for SSE; anything else gets NDJSON.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        generate_plan_stream(payload, sse=sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+
+
 @router.post("/courses", response_model=list[CourseResponse])
 def bulk_create_courses_endpoint(
     payload: CourseCreateRequest,
@@ -82,14 +178,12 @@ def bulk_create_courses_endpoint(
     return bulk_create_courses(db, payload.courses)
 
 
-@router.post("/courses/upload", response_model=list[CourseResponse])
+@router.post("/courses/upload", response_model=CourseImportResponse)
 def upload_courses_endpoint(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    raw = file.file.read().decode("utf-8", errors="ignore")
-    rows = parse_catalog_csv(raw)
-    return bulk_create_courses(db, [CourseCreate(**row) for row in rows])
+    return import_catalog_csv(db, file.file)
 
 
 @router.post("/transcripts/upload", response_model=TranscriptUploadResponse)
@@ -109,6 +203,42 @@ def upload_transcript_endpoint(
     return create_transcript_stub(db, student_id, filename)
 
 
+@router.get("/transcripts/uploads/{transcript_id}", response_model=TranscriptUploadResponse)
+def get_transcript_upload_endpoint(transcript_id: int, db: Session = Depends(get_db)):
+    transcript = db.get(Transcript, transcript_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="Transcript not found.")
+    return transcript
+
+
+@router.get("/transcripts/uploads/{transcript_id}/events")
+def transcript_upload_events_endpoint(transcript_id: int, db: Session = Depends(get_db)):
+    """Server-sent ``status`` events until the upload is parsed or fails."""
+    if db.get(Transcript, transcript_id) is None:
+        raise HTTPException(status_code=404, detail="Transcript not found.")
+    return StreamingResponse(
+        status_events(Transcript, transcript_id), media_type="text/event-stream"
+    )
+
+
+@router.post("/transcripts/import", response_model=TranscriptImportResponse)
+def import_transcripts_endpoint(
+    file: UploadFile = File(..., description="Zip of transcript PDFs/CSVs"),
+    manifest: UploadFile | None = File(None, description="filename,student_id CSV"),
+    db: Session = Depends(get_db),
+):
+    # The archive is read entry by entry from the spooled upload, never whole.
+    # Re-submitting the same archive resumes it.
+    return import_transcript_archive(
+        db, file.file, file.filename, manifest.file if manifest else None
+    )
+
+
+@router.get("/transcripts/imports/{import_id}", response_model=TranscriptImportResponse)
+def get_transcript_import_endpoint(import_id: int, db: Session = Depends(get_db)):
+    return get_import_report(db, import_id)
+
+
 @router.post("/documents/upload", response_model=DocumentUploadResponse)
 def upload_document_endpoint(
     student_id: int,
@@ -130,14 +260,40 @@ def upload_document_endpoint(
     return create_document(db, student_id, kind, filename)
 
 
+@router.get("/documents/{document_id}", response_model=DocumentUploadResponse)
+def get_document_endpoint(document_id: int, db: Session = Depends(get_db)):
+    doc = db.get(DocumentUpload, document_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    return doc
+
+
+@router.get("/documents/{document_id}/events")
+def document_events_endpoint(document_id: int, db: Session = Depends(get_db)):
+    """Server-sent ``status`` events until the document is ingested or fails."""
+    if db.get(DocumentUpload, document_id) is None:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    return StreamingResponse(
+        status_events(DocumentUpload, document_id), media_type="text/event-stream"
+    )
+
+
 @router.post("/documents/preview", response_model=ParsePreviewResponse)
 def preview_document_endpoint(file: UploadFile = File(...)):
     data = file.file.read(_MAX_UPLOAD_BYTES + 1)
     if len(data) > _MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=413, detail="File exceeds 20 MB limit.")
-    text = extract_text_from_pdf(data)
-    excerpt = text[:2000] if text else ""
-    return ParsePreviewResponse(text_excerpt=excerpt, length=len(text))
+    # Only the first page or two are needed for the excerpt; stop extracting there.
+    text, pages_left = extract_text_in_pool(
+        data, max_pages=_PREVIEW_MAX_PAGES, max_chars=_PREVIEW_MAX_CHARS
+    )
+    excerpt = text[:_PREVIEW_MAX_CHARS] if text else ""
+    return ParsePreviewResponse(
+        text_excerpt=excerpt,
+        length=len(text),
+        # Pages left unread, or the last page read cut short for the excerpt
+        truncated=pages_left or len(text) > _PREVIEW_MAX_CHARS,
+    )
 
 
 @router.post("/programs", response_model=ProgramResponse)
@@ -172,6 +328,7 @@ def bulk_create_prereqs_endpoint(
 # BEFORE the parametric route /plans/{plan_id} or FastAPI will swallow them.
 
 @router.post("/plans/simulate", response_model=SimulateResponse)
+@query_budget(20)
 def simulate_plan_endpoint(
     payload: SimulateRequest,
     db: Session = Depends(get_db),
@@ -180,10 +337,11 @@ def simulate_plan_endpoint(
 
 
 @router.get("/plans/compare", response_model=PlanCompareResponse)
+@query_budget(10)
 def compare_plans_endpoint(
     baseline_plan_id: int,
     simulated_plan_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     result = compare_plans(db, baseline_plan_id, simulated_plan_id)
     if result is None:
@@ -198,16 +356,42 @@ def compare_plans_endpoint(
 
 
 @router.get("/plans/{plan_id}", response_model=PlanDetailResponse)
-def get_plan_endpoint(plan_id: int, db: Session = Depends(get_db)):
-    plan = get_plan(db, plan_id)
+@query_budget(8)
+async def get_plan_endpoint(
+    plan_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    stored = await get_stored_plan_async(db, plan_id)
+    etag = completed_plan_etag(plan_id, stored.status if stored else None, "detail")
+    if cached := _not_modified(request, response, etag, immutable=True):
+        return cached
+    if stored is not None and stored.parent_plan_id is not None:
+        # Simulated plan: materialized from its baseline, then cached
+        document = await db.run_sync(materialize_plan_document, plan_id)
+        return _gzip_json_response(request, response, document)
+    if stored is not None and stored.document is not None:
+        # Document-stored plan: the gzip body is the response, no ORM loading
+        return _gzip_json_response(request, response, stored.document)
+    plan = await get_plan_async(db, plan_id)
     if plan is None:
         raise HTTPException(status_code=404, detail="Plan not found.")
     return plan
 
 
 @router.get("/plans/{plan_id}/risks", response_model=list[RiskResponse])
-def get_plan_risks_endpoint(plan_id: int, db: Session = Depends(get_db)):
-    return get_plan_risks(db, plan_id)
+@query_budget(8)
+async def get_plan_risks_endpoint(
+    plan_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    etag = await db.run_sync(plan_etag, plan_id, "risks")
+    if cached := _not_modified(request, response, etag, immutable=True):
+        return cached
+    return await get_plan_risks_async(db, plan_id)
 
 
 # ── Auth ──────────────────────────────────────────────────────────────────────
@@ -229,86 +413,54 @@ def me_endpoint(current_user: User = Depends(get_current_user)):
 
 # ── Students ──────────────────────────────────────────────────────────────────
 @router.get("/students/lookup")
-def lookup_student_endpoint(
+@query_budget(4)
+async def lookup_student_endpoint(
     school_student_id: str = Query(..., description="School-issued student ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Look up a returning student by their school-issued student ID.
     Returns the DB record id, display name, major, and the id of their
     most recently generated plan (if any).
     """
-    students = (
-        db.query(Student)
-        .filter(Student.student_id == school_student_id)
-        .order_by(Student.id)
-        .all()
-    )
-    if not students:
-        raise HTTPException(status_code=404, detail="No student found with that student ID.")
-
-    # Pick the record with the most transcript data
-    from app.models.transcript import TranscriptCourse as TC
-    best = students[0]
-    best_count = (
-        db.query(TC)
-        .join(Transcript, TC.transcript_id == Transcript.id)
-        .filter(Transcript.student_id == best.id)
-        .count()
-    )
-    for candidate in students[1:]:
-        count = (
-            db.query(TC)
-            .join(Transcript, TC.transcript_id == Transcript.id)
-            .filter(Transcript.student_id == candidate.id)
-            .count()
-        )
-        if count > best_count:
-            best = candidate
-            best_count = count
-
-    latest_plan = (
-        db.query(Plan)
-        .filter(Plan.student_id == best.id)
-        .order_by(Plan.id.desc())
-        .first()
-    )
-
-    return {
-        "db_id": best.id,
-        "first_name": best.first_name,
-        "last_name": best.last_name,
-        "major": best.major,
-        "school": best.school,
-        "plan_id": latest_plan.id if latest_plan else None,
-    }
+    return await lookup_student_async(db, school_student_id)
 
 @router.get("/students/{student_id}", response_model=StudentResumeResponse)
-def get_student_endpoint(student_id: int, db: Session = Depends(get_db)):
-    student = get_student(db, student_id)
+@query_budget(6)
+async def get_student_endpoint(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    etag = await db.run_sync(student_etag, student_id)
+    if cached := _not_modified(request, response, etag):
+        return cached
+    student = await get_student_async(db, student_id)
     # Attach latest transcript info for the resume-where-you-left-off flow
-    latest = (
-        db.query(Transcript)
-        .filter(Transcript.student_id == student_id)
+    latest = await db.scalar(
+        select(Transcript)
+        .where(Transcript.student_id == student_id)
         .order_by(Transcript.uploaded_at.desc())
-        .first()
+        .limit(1)
     )
-    latest_plan = (
-        db.query(Plan)
-        .filter(Plan.student_id == student_id)
+    latest_plan_id = await db.scalar(
+        select(Plan.id)
+        .where(Plan.student_id == student_id, Plan.kind == "baseline")
         .order_by(Plan.id.desc())
-        .first()
+        .limit(1)
     )
     result = StudentResumeResponse.model_validate(student)
     if latest:
         result.transcript_id = latest.id
         result.transcript_status = latest.status
-    if latest_plan:
-        result.plan_id = latest_plan.id
+    if latest_plan_id:
+        result.plan_id = latest_plan_id
     return result
 
 
 @router.put("/students/{student_id}", response_model=StudentResumeResponse)
+@query_budget(8)
 def update_student_endpoint(
     student_id: int,
     payload: StudentUpdateRequest,
@@ -322,8 +474,8 @@ def update_student_endpoint(
         .first()
     )
     latest_plan = (
-        db.query(Plan)
-        .filter(Plan.student_id == student_id)
+        db.query(Plan.id)
+        .filter(Plan.student_id == student_id, Plan.kind == "baseline")
         .order_by(Plan.id.desc())
         .first()
     )
@@ -346,11 +498,21 @@ def parse_document_endpoint(document_id: int, db: Session = Depends(get_db)):
 # ── Transcripts ───────────────────────────────────────────────────────────────
 
 @router.get("/transcripts/{student_id}", response_model=TranscriptStatusResponse)
-def get_transcript_status_endpoint(student_id: int, db: Session = Depends(get_db)):
-    return get_transcript_status(db, student_id)
+@query_budget(5)
+async def get_transcript_status_endpoint(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    etag = await db.run_sync(transcript_etag, student_id, "transcript")
+    if cached := _not_modified(request, response, etag):
+        return cached
+    return await get_transcript_status_async(db, student_id)
 
 
 @router.post("/transcripts/confirm", response_model=TranscriptConfirmResponse)
+@query_budget(10)
 def confirm_transcript_endpoint(
     payload: TranscriptConfirmRequest,
     db: Session = Depends(get_db),
@@ -361,8 +523,17 @@ def confirm_transcript_endpoint(
 # ── Simulations ───────────────────────────────────────────────────────────────
 
 @router.post("/simulations/run", response_model=SimulateResponse)
+@query_budget(20)
 def run_simulation_endpoint(
     payload: SimulateRequest,
     db: Session = Depends(get_db),
 ):
     return simulate_plan(db, payload)
+
+
+# ── Batching ──────────────────────────────────────────────────────────────────
+
+@router.post("/batch", response_model=list[BatchSubResponse])
+async def batch_endpoint(payload: BatchRequest, request: Request):
+    """Run several /api requests in one round trip; responses come back in order."""
+    return await run_batch(router, request, payload.requests)
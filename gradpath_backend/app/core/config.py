@@ -6,6 +6,72 @@ class Settings(BaseSettings):
     jwt_secret: str = "change_me_in_production"
     environment: str = "development"
 
+    # Async engine used by the read endpoints (asyncpg / aiosqlite). Derived from
+    # database_url unless set, e.g. when psycopg2-only query options must change.
+    async_database_url: str | None = None
+    db_async_pool_size: int = 20
+    db_async_max_overflow: int = 10
+    db_async_pool_timeout_seconds: float = 30.0
+
+    # Optional read replica for read-only GET endpoints (see core/database.py).
+    # Requests sending "X-Read-Your-Writes: 1" still read from the primary.
+    read_database_url: str | None = None
+    async_read_database_url: str | None = None
+
+    # Per-request SQL statement counts (see core/query_stats.py), sent as X-DB-*
+    # headers in development. With query_budget_enforce (tests) an endpoint that
+    # runs more statements than its @query_budget fails the request.
+    query_stats_enabled: bool = True
+    query_budget_enforce: bool = False
+    query_repeat_threshold: int = 5  # identical statements per request reported as repeated
+
+    # GET /metrics in the Prometheus text format (see core/metrics.py)
+    metrics_enabled: bool = True
+
+    # PDF text extraction runs in a separate process pool (see services/pdf_pool.py)
+    pdf_pool_enabled: bool = True
+    pdf_pool_workers: int = 2
+    pdf_pool_max_queue: int = 16  # jobs waiting or running before uploads get a 503
+    pdf_job_timeout_seconds: float = 30.0
+    pdf_max_pages: int = 200
+    pdf_worker_memory_mb: int = 1024
+    pdf_worker_max_jobs: int = 50  # recycle a worker process after this many jobs
+
+    # Background re-parse of stored documents after a parser version bump
+    reparse_workers: int = 2
+    reparse_batch_size: int = 200
+    # After a failed run the worker waits this long, doubling per consecutive failure
+    reparse_retry_seconds: float = 5.0
+    reparse_retry_max_seconds: float = 300.0
+
+    # Background ingest of uploaded PDFs (see services/ingest.py)
+    ingest_workers: int = 2
+    ingest_poll_seconds: float = 5.0  # also picks up uploads queued by other app processes
+    ingest_stale_seconds: float = 600.0  # reclaim "extracting" rows left by a crashed worker
+    ingest_events_timeout_seconds: float = 300.0
+
+    # "rows": plan_terms/plan_items/risks rows. "document": one compressed JSON
+    # document per plan, served by GET /plans/{id} without ORM loading.
+    plan_storage: str = "rows"
+    plan_cache_size: int = 512  # materialized simulated plans kept in memory per process
+    plan_diff_cache_size: int = 1024  # GET /plans/compare results, by plan pair
+
+    # Retention of simulations and superseded baselines (see services/plan_gc.py).
+    # A student's latest plan is always kept.
+    plan_gc_enabled: bool = True
+    plan_gc_interval_seconds: float = 3600.0
+    plan_gc_batch_size: int = 200  # plans deleted per transaction
+    plan_simulation_retention_days: float = 7.0
+    plan_superseded_retention_days: float = 30.0
+
+    # POST /api/batch (see services/batch.py)
+    batch_max_requests: int = 20
+    batch_request_timeout_seconds: float = 30.0  # per sub-request; answered with a 504
+
+    # Bulk transcript archive import (see services/transcript_import.py)
+    import_workers: int = 2
+    import_batch_files: int = 50  # files committed together; the resume granularity
+
     class Config:
         env_file = ".env"
         extra = "ignore"
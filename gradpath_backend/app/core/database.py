@@ -1,13 +1,62 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the read-heavy endpoints; writes still go through `engine`.
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Read-only endpoints use the replica unless the client asks to see its own writes,
+# e.g. when fetching a plan right after generating it.
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+def _async_database_url(database_url: str, override: str | None):
+	if override:
+		return make_url(override)
+	url = make_url(database_url)
+	return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def _async_pool_options(url) -> dict:
+	# aiosqlite runs without a connection pool; size the pool for server databases only
+	if url.get_backend_name() == "sqlite":
+		return {}
+	return {
+		"pool_size": settings.db_async_pool_size,
+		"max_overflow": settings.db_async_max_overflow,
+		"pool_timeout": settings.db_async_pool_timeout_seconds,
+	}
+
+
+def _create_async_engine(database_url: str, override: str | None):
+	url = _async_database_url(database_url, override)
+	return create_async_engine(url, pool_pre_ping=True, **_async_pool_options(url))
+
+
+async_engine = _create_async_engine(settings.database_url, settings.async_database_url)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.read_database_url:
+	read_engine = create_engine(settings.read_database_url, pool_pre_ping=True)
+	async_read_engine = _create_async_engine(
+		settings.read_database_url, settings.async_read_database_url
+	)
+else:
+	read_engine, async_read_engine = engine, async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(
+	async_read_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Generator:
 	db = SessionLocal()
@@ -15,3 +64,28 @@ def get_db() -> Generator:
 		yield db
 	finally:
 		db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+	async with AsyncSessionLocal() as db:
+		yield db
+
+
+def _reads_own_writes(request: Request) -> bool:
+	return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
+
+
+def get_read_db(request: Request) -> Generator:
+	"""Session on the read replica (the primary when none is configured or requested)."""
+	factory = SessionLocal if _reads_own_writes(request) else ReadSessionLocal
+	db = factory()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+	factory = AsyncSessionLocal if _reads_own_writes(request) else AsyncReadSessionLocal
+	async with factory() as db:
+		yield db
@@ -0,0 +1,336 @@
+"""In-process metrics served by ``GET /metrics`` in the Prometheus text format.
+
+A small registry rather than a client library: counters and histograms keep
+plain per-label-set counts behind one lock each, so an observation costs a
+``bisect`` and a few additions. Gauges that mirror state owned elsewhere (the
+DB pools) are read only when the endpoint is scraped.
+
+- ``MetricsMiddleware`` times every HTTP request by method, route template
+  and status code.
+- ``instrument_pools`` adds checkout wait times and connection counts for the
+  SQLAlchemy pools.
+- ``timed`` / ``stage_timer`` / ``timed_iter`` record hot-path stages
+  (extraction, parsing, graph building, scheduling, plan persistence) in
+  ``gradpath_stage_duration_seconds``.
+
+Figures are per process; with several app workers each one is scraped
+separately.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond stages through slow PDF extractions
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# (name, help, type, [(labels, value)]) as yielded by a gauge callback
+GaugeFamily = tuple[str, str, str, list[tuple[dict, float]]]
+
+_metrics: list = []
+_collectors: list[Callable[[], Iterable[GaugeFamily]]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines += [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values
+        ]
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, seconds: float, *labelvalues) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total) for key, (counts, total) in self._series.items()
+            )
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def register_gauges(collect: Callable[[], Iterable[GaugeFamily]]):
+    """Add a scrape-time callback yielding ``(name, help, type, [(labels, value)])``."""
+    _collectors.append(collect)
+    return collect
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _metrics:
+        lines += metric.render()
+    for collect in _collectors:
+        for name, documentation, kind, samples in collect():
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            lines += [
+                f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+                for labels, value in samples
+            ]
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = Histogram(
+    "gradpath_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "gradpath_stage_duration_seconds",
+    "Time spent in hot-path stages of ingest and planning.",
+    ("stage",),
+)
+DB_CHECKOUT_SECONDS = Histogram(
+    "gradpath_db_pool_checkout_wait_seconds",
+    "Time to check out a DB connection, waiting for a free one or opening a new one.",
+    ("pool",),
+)
+PLANS_GENERATED = Counter(
+    "gradpath_plans_generated_total", "Baseline plans generated, by storage mode.", ("storage",)
+)
+SIMULATIONS = Counter("gradpath_simulations_total", "What-if simulations stored.")
+UPLOADS = Counter(
+    "gradpath_uploads_total", "Transcripts and documents uploaded.", ("kind", "format")
+)
+PARSED_COURSES = Counter(
+    "gradpath_parsed_courses_total",
+    "Transcript courses parsed from uploads, by parse confidence.",
+    ("confidence",),
+)
+
+# Upper bounds of the parse confidence buckets, lowest first
+_CONFIDENCE_BUCKETS = ((0.5, "lt_0.5"), (0.7, "0.5_0.7"), (0.9, "0.7_0.9"))
+
+
+def record_parse_confidence(rows: Iterable[dict]) -> None:
+    """Count parsed transcript rows into ``PARSED_COURSES`` by their ``confidence``."""
+    counts: dict[str, int] = {}
+    for row in rows:
+        confidence = row.get("confidence")
+        if confidence is None:
+            bucket = "unknown"
+        else:
+            bucket = next(
+                (name for bound, name in _CONFIDENCE_BUCKETS if confidence < bound), "ge_0.9"
+            )
+        counts[bucket] = counts.get(bucket, 0) + 1
+    for bucket, count in counts.items():
+        PARSED_COURSES.inc(bucket, amount=count)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+
+
+def timed(stage: str):
+    """Decorator recording each call's duration as ``stage``."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+
+        return wrapper
+
+    return decorate
+
+
+def timed_iter(stage: str, iterator: Iterable) -> Iterator:
+    """Yield from ``iterator``, recording only the time spent producing items.
+
+    Time the consumer spends between items (e.g. writing a streamed term to
+    the client) is left out; one observation is made when the iterator ends.
+    """
+    iterator = iter(iterator)
+    spent = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                spent += time.perf_counter() - started
+                break
+            spent += time.perf_counter() - started
+            yield item
+    finally:
+        STAGE_SECONDS.observe(spent, stage)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a duration measured elsewhere, e.g. reported by a worker process."""
+    STAGE_SECONDS.observe(seconds, stage)
+
+
+_pools: dict[str, object] = {}
+_in_use: dict[str, int] = {}
+_in_use_lock = threading.Lock()
+
+
+def instrument_pools(**engines) -> None:
+    """Time checkouts and count connections for each named engine's pool.
+
+    Engines sharing a pool (no read replica configured) are instrumented once,
+    under the first name given.
+    """
+    from sqlalchemy import event
+
+    for name, engine in engines.items():
+        pool = getattr(engine, "sync_engine", engine).pool
+        if any(existing is pool for existing in _pools.values()):
+            continue
+        _pools[name] = pool
+        _in_use[name] = 0
+        connect = pool.connect
+
+        def timed_connect(connect=connect, name=name):
+            started = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                DB_CHECKOUT_SECONDS.observe(time.perf_counter() - started, name)
+
+        pool.connect = timed_connect
+        event.listen(pool, "checkout", functools.partial(_count_checkout, name, 1))
+        event.listen(pool, "checkin", functools.partial(_count_checkout, name, -1))
+
+
+def _count_checkout(name: str, delta: int, *args) -> None:
+    with _in_use_lock:
+        _in_use[name] += delta
+
+
+@register_gauges
+def _pool_gauges():
+    samples = []
+    for name, pool in _pools.items():
+        with _in_use_lock:
+            samples.append(({"pool": name, "state": "in_use"}, _in_use[name]))
+        # Only QueuePool-style pools report idle and overflow connections
+        for state, method in (("idle", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                samples.append(({"pool": name, "state": state}, max(getattr(pool, method)(), 0)))
+    yield (
+        "gradpath_db_pool_connections",
+        "DB connections by pool and state.",
+        "gauge",
+        samples,
+    )
+    yield (
+        "gradpath_db_pool_size",
+        "Configured size of each DB pool.",
+        "gauge",
+        [({"pool": name}, pool.size()) for name, pool in _pools.items() if hasattr(pool, "size")],
+    )
+
+
+class MetricsMiddleware:
+    """Record each HTTP request's latency under its route template, not its raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
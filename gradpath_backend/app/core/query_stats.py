@@ -0,0 +1,155 @@
+"""Per-request SQL statement counting and query budgets.
+
+``QueryStatsMiddleware`` opens a ``RequestQueries`` for each HTTP request; the
+engine listeners installed by ``install_query_stats`` add every statement
+executed on behalf of that request (also from threadpool and ``run_sync``
+code, which inherit the request's context) to it:
+
+- statement count and total time spent in the driver;
+- statement fingerprints (parameters and IN lists collapsed), so a query
+  repeated once per row shows up as one fingerprint with a high count.
+
+In development the figures go out as ``X-DB-Query-Count``, ``X-DB-Time-Ms``
+and, for fingerprints seen ``query_repeat_threshold`` times or more,
+``X-DB-Repeated``. Endpoints declare how many statements they may run with
+``@query_budget(n)``; with ``query_budget_enforce`` (test runs) exceeding it
+raises ``QueryBudgetExceeded``, which TestClient re-raises in the test.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+_PARAMETER = r"(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)"
+_PARAMETER_LIST = re.compile(rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)")
+_PARAMETER_ONE = re.compile(_PARAMETER)
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+_HEADER_FINGERPRINT_CHARS = 160
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints: Counter[str] = Counter()
+
+    def repeated(self) -> list[tuple[str, int]]:
+        return [
+            (fingerprint, count)
+            for fingerprint, count in self.fingerprints.most_common()
+            if count >= settings.query_repeat_threshold
+        ]
+
+
+_current: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    """``statement`` with parameters, IN lists and numbers replaced by ``?``."""
+    statement = _PARAMETER_LIST.sub("(?)", statement)
+    statement = _PARAMETER_ONE.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def current_queries() -> RequestQueries | None:
+    """Statements recorded so far for the request being handled, if any."""
+    return _current.get()
+
+
+def query_budget(max_statements: int):
+    """Declare the most SQL statements an endpoint may run per request."""
+
+    def decorate(endpoint):
+        endpoint.query_budget = max_statements
+        return endpoint
+
+    return decorate
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    if queries is None or not conn.info.get("query_stats_started"):
+        return
+    queries.seconds += time.perf_counter() - conn.info["query_stats_started"].pop()
+    queries.count += 1
+    queries.fingerprints[fingerprint(statement)] += 1
+
+
+def install_query_stats(*engines) -> None:
+    """Record statements from ``engines`` (sync or async) against the current request."""
+    if not settings.query_stats_enabled:
+        return
+    for engine in {id(e): e for e in engines}.values():
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Open a ``RequestQueries`` per HTTP request; report and enforce it at response start."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.query_stats_enabled:
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries()
+        token = _current.set(queries)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                _check_budget(scope, queries)
+                if settings.environment == "development":
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), *_headers(queries)],
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+
+
+def _check_budget(scope, queries: RequestQueries) -> None:
+    budget = getattr(scope.get("endpoint"), "query_budget", None)
+    if not settings.query_budget_enforce or budget is None or queries.count <= budget:
+        return
+    repeated = "; ".join(f"{count}x {fp}" for fp, count in queries.repeated())
+    raise QueryBudgetExceeded(
+        f"{scope['method']} {scope['path']} ran {queries.count} SQL statements "
+        f"(budget {budget})" + (f"; repeated: {repeated}" if repeated else "")
+    )
+
+
+def _headers(queries: RequestQueries) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"x-db-query-count", str(queries.count).encode()),
+        (b"x-db-time-ms", f"{queries.seconds * 1000:.2f}".encode()),
+    ]
+    repeated = queries.repeated()
+    if repeated:
+        value = " | ".join(
+            f"{count}x {fp[:_HEADER_FINGERPRINT_CHARS]}" for fp, count in repeated[:3]
+        )
+        headers.append((b"x-db-repeated", value.encode("latin-1", errors="replace")))
+    return headers
@@ -1,8 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from app.api.routes import router as api_router
-from app.core.database import engine
+from app.core.config import settings
+from app.core.database import async_engine, async_read_engine, engine, read_engine
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_pools, render
+from app.core.query_stats import QueryStatsMiddleware, install_query_stats
+from app.services.ingest import start_ingest_workers, stop_ingest_workers
+from app.services.pdf_pool import pool_stats, shutdown_pool
+from app.services.plan_gc import gc_stats, start_plan_gc_worker, stop_plan_gc_worker
+from app.services.reparse import start_reparse_worker, stop_reparse_worker
 from app.models.base import Base
 import app.models  # noqa: F401
 
@@ -16,9 +24,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(QueryStatsMiddleware)
+install_query_stats(engine, read_engine, async_engine, async_read_engine)
+
+# Outermost, so request latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
+instrument_pools(
+    primary=engine, replica=read_engine, async_primary=async_engine, async_replica=async_read_engine
+)
+
 app.include_router(api_router)
 
 
+# Duplicate catalog rows from before codes were unique: fold every duplicate's
+# fields into the lowest id with upsert.py's fill-only-empty rules, then drop
+# the rest. Portable SQL, as local runs use SQLite.
+_MERGE_DUPLICATE_COURSES = [
+    "UPDATE courses SET "
+    "title = coalesce(nullif(title, ''), (SELECT d.title FROM courses d WHERE d.code = courses.code "
+    "AND nullif(d.title, '') IS NOT NULL ORDER BY d.id LIMIT 1)), "
+    "credits = coalesce(nullif(credits, 0), (SELECT d.credits FROM courses d "
+    "WHERE d.code = courses.code AND nullif(d.credits, 0) IS NOT NULL ORDER BY d.id LIMIT 1)), "
+    "availability = coalesce(nullif(availability, ''), (SELECT d.availability FROM courses d "
+    "WHERE d.code = courses.code AND nullif(d.availability, '') IS NOT NULL "
+    "ORDER BY d.id LIMIT 1)), "
+    "honors_only = coalesce(honors_only, false) OR EXISTS ("
+    "SELECT 1 FROM courses d WHERE d.code = courses.code AND d.honors_only) "
+    "WHERE id IN (SELECT MIN(id) FROM courses GROUP BY code HAVING COUNT(*) > 1)",
+    "DELETE FROM courses WHERE id NOT IN (SELECT MIN(id) FROM courses GROUP BY code)",
+]
+_DROP_DUPLICATE_PREREQS = [
+    "DELETE FROM prerequisites WHERE id NOT IN ("
+    "SELECT MIN(id) FROM prerequisites GROUP BY course_code, prereq_code, relation)",
+]
+
+
+def _add_unique_index(conn, table: str, name: str, columns: str, collapse: list[str]) -> None:
+    """Collapse duplicates and create a unique index, once: skipped when it already exists."""
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(conn)
+    existing = {ix["name"] for ix in inspector.get_indexes(table)}
+    existing |= {uc["name"] for uc in inspector.get_unique_constraints(table)}
+    if name in existing:
+        return
+    try:
+        for stmt in [*collapse, f"CREATE UNIQUE INDEX {name} ON {table} ({columns})"]:
+            conn.execute(text(stmt))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
@@ -27,14 +84,86 @@ def on_startup():
         from sqlalchemy import text
         for stmt in [
             "ALTER TABLE plan_items ADD COLUMN IF NOT EXISTS credits INTEGER",
+            "ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)",
+            "CREATE INDEX IF NOT EXISTS ix_transcripts_content_sha256 ON transcripts (content_sha256)",
+            "ALTER TABLE document_uploads ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)",
+            "CREATE INDEX IF NOT EXISTS ix_document_uploads_content_sha256 "
+            "ON document_uploads (content_sha256)",
+            "ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS status_updated_at TIMESTAMP",
+            "ALTER TABLE document_uploads ADD COLUMN IF NOT EXISTS status_updated_at TIMESTAMP",
+            "ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+            "ALTER TABLE plans ADD COLUMN IF NOT EXISTS document BYTEA",
+            "ALTER TABLE plans ADD COLUMN IF NOT EXISTS parent_plan_id INTEGER REFERENCES plans (id)",
+            "CREATE INDEX IF NOT EXISTS ix_plans_parent_plan_id ON plans (parent_plan_id)",
+            "ALTER TABLE plans ADD COLUMN IF NOT EXISTS kind VARCHAR NOT NULL DEFAULT 'baseline'",
+            "ALTER TABLE plans ADD COLUMN IF NOT EXISTS superseded_at TIMESTAMP",
+            "CREATE INDEX IF NOT EXISTS ix_plans_student_kind_id ON plans (student_id, kind, id)",
+            "CREATE INDEX IF NOT EXISTS ix_plans_kind_id ON plans (kind, id)",
+            # Delta-stored simulations written before plans had a kind
+            "UPDATE plans SET kind = 'simulation' "
+            "WHERE parent_plan_id IS NOT NULL AND kind = 'baseline'",
+            "UPDATE plans SET superseded_at = CURRENT_TIMESTAMP "
+            "WHERE kind = 'baseline' AND superseded_at IS NULL AND id < ("
+            "SELECT MAX(p.id) FROM plans p WHERE p.student_id = plans.student_id AND p.kind = 'baseline')",
+            "ALTER TABLE extracted_texts ADD COLUMN IF NOT EXISTS compressed_text BYTEA",
+            "ALTER TABLE extracted_texts ALTER COLUMN text DROP NOT NULL",
         ]:
             try:
                 conn.execute(text(stmt))
                 conn.commit()
             except Exception:
-                pass
+                conn.rollback()
+        _add_unique_index(conn, "courses", "uq_courses_code", "code", _MERGE_DUPLICATE_COURSES)
+        _add_unique_index(
+            conn,
+            "prerequisites",
+            "uq_prerequisites_edge",
+            "course_code, prereq_code, relation",
+            _DROP_DUPLICATE_PREREQS,
+        )
+    # Compress legacy text and refresh parse results left stale by a parser version bump
+    start_reparse_worker()
+    # Pick up uploads queued before a restart
+    start_ingest_workers()
+    # Expire old simulations and superseded baselines
+    start_plan_gc_worker()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_ingest_workers()
+    stop_reparse_worker()
+    stop_plan_gc_worker()
+    shutdown_pool()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/pdf-extraction")
+def pdf_extraction_stats():
+    """Queue depth, outcome counters and timings for the PDF extraction pool."""
+    return pool_stats()
+
+
+@app.get("/health/plan-gc")
+def plan_gc_stats():
+    """Runs and rows reclaimed by the plan retention sweep."""
+    return gc_stats()
+
+
+@app.get("/metrics")
+def metrics():
+    """Request latencies, DB pool usage, hot-path timers and counters (Prometheus text format)."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=render(), media_type=CONTENT_TYPE)
@@ -8,3 +8,5 @@ from app.models.requirement import Requirement, RequirementCourse  # noqa: F401
 from app.models.prerequisite import Prerequisite  # noqa: F401
 from app.models.risk import Risk  # noqa: F401
 from app.models.document import DocumentUpload  # noqa: F401
+from app.models.extraction import ExtractedText, ParsedContent, UploadBlob  # noqa: F401
+from app.models.transcript_import import TranscriptImport, TranscriptImportEntry  # noqa: F401
@@ -1,10 +1,11 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, String, UniqueConstraint
 
 from app.models.base import Base
 
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (UniqueConstraint("code", name="uq_courses_code"),)
 
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, nullable=False, index=True)
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import deferred
 
 from app.models.base import Base
 
@@ -12,6 +13,8 @@ class DocumentUpload(Base):
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     kind = Column(String, nullable=False)  # transcript/audit/catalog
     filename = Column(String, nullable=True)
-    raw_text = Column(Text, nullable=True)
+    raw_text = deferred(Column(Text, nullable=True))  # legacy; text now lives in ExtractedText
+    content_sha256 = Column(String(64), nullable=True, index=True)  # see ExtractedText
     status = Column(String, default="received")
+    status_updated_at = Column(DateTime, nullable=True)  # set by the ingest worker
     uploaded_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,79 @@
+import zlib
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    TypeDecorator,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+
+from app.models.base import Base
+
+
+class CompressedText(TypeDecorator):
+    """Unicode text stored zlib-compressed in a binary column."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+
+class ExtractedText(Base):
+    """Text pulled out of an uploaded file, keyed by the SHA-256 of its bytes."""
+
+    __tablename__ = "extracted_texts"
+
+    content_sha256 = Column(String(64), primary_key=True)
+    compressed_text = deferred(Column(CompressedText, nullable=True))
+    # Uncompressed text from before compression; moved into compressed_text
+    # by the reparse worker.
+    text = deferred(Column(Text, nullable=True))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UploadBlob(Base):
+    """Uploaded file bytes awaiting background extraction, keyed by their SHA-256.
+
+    Rows are deleted once no pending transcript or document refers to them.
+    """
+
+    __tablename__ = "upload_blobs"
+
+    content_sha256 = Column(String(64), primary_key=True)
+    data = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ParsedContent(Base):
+    """Parser output for an extracted text, per parser and parser version."""
+
+    __tablename__ = "parsed_contents"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_sha256", "parser", "parser_version", name="uq_parsed_contents_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_sha256 = Column(String(64), nullable=False, index=True)
+    parser = Column(String, nullable=False)  # transcript/catalog/prereq
+    parser_version = Column(Integer, nullable=False)
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import Base
 from app.models.risk import Risk
@@ -9,13 +9,26 @@ from app.models.risk import Risk
 
 class Plan(Base):
     __tablename__ = "plans"
+    __table_args__ = (
+        # Latest-baseline lookups and the retention sweep (services/plan_gc.py)
+        Index("ix_plans_student_kind_id", "student_id", "kind", "id"),
+        Index("ix_plans_kind_id", "kind", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     status = Column(String, default="queued")
+    kind = Column(String, nullable=False, default="baseline", server_default="baseline")  # baseline/simulation
     created_at = Column(DateTime, default=datetime.utcnow)
-
-    terms = relationship("PlanTerm", back_populates="plan")
+    # Set on a baseline when a newer baseline is generated for the student
+    superseded_at = Column(DateTime, nullable=True)
+    # gzip-compressed JSON of the whole plan (see services/plan_documents.py);
+    # set instead of plan_terms/plan_items/risks rows when plan_storage="document".
+    document = deferred(Column(LargeBinary, nullable=True))
+    # Simulated plans: `document` is a term-level delta against this plan
+    parent_plan_id = Column(Integer, ForeignKey("plans.id"), nullable=True, index=True)
+
+    terms = relationship("PlanTerm", back_populates="plan", order_by="PlanTerm.id")
     risks = relationship("Risk", backref="plan")
 
 
@@ -28,7 +41,7 @@ class PlanTerm(Base):
     credits = Column(Integer, default=0)
 
     plan = relationship("Plan", back_populates="terms")
-    items = relationship("PlanItem", back_populates="term")
+    items = relationship("PlanItem", back_populates="term", order_by="PlanItem.id")
 
 
 class PlanItem(Base):
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, UniqueConstraint
 
 from app.models.base import Base
 
 
 class Prerequisite(Base):
     __tablename__ = "prerequisites"
+    __table_args__ = (
+        UniqueConstraint("course_code", "prereq_code", "relation", name="uq_prerequisites_edge"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     course_code = Column(String, nullable=False, index=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import Base
 
@@ -12,8 +12,11 @@ class Transcript(Base):
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     filename = Column(String, nullable=True)
-    raw_text = Column(Text, nullable=True)
+    raw_text = deferred(Column(Text, nullable=True))  # legacy; text now lives in ExtractedText
+    content_sha256 = Column(String(64), nullable=True, index=True)  # see ExtractedText
     status = Column(String, default="received")
+    status_updated_at = Column(DateTime, nullable=True)  # set by the ingest worker
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped when courses change
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
     courses = relationship("TranscriptCourse", back_populates="transcript")
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+
+from app.models.base import Base
+
+
+class TranscriptImport(Base):
+    """One bulk transcript archive, keyed by the SHA-256 of the zip so re-runs resume it."""
+
+    __tablename__ = "transcript_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    archive_sha256 = Column(String(64), nullable=False, unique=True)
+    filename = Column(String, nullable=True)
+    status = Column(String, default="running")  # running/complete/partial/failed
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TranscriptImportEntry(Base):
+    """Outcome for one file inside a transcript archive."""
+
+    __tablename__ = "transcript_import_entries"
+    __table_args__ = (
+        UniqueConstraint("import_id", "filename", name="uq_transcript_import_entries_file"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    import_id = Column(Integer, ForeignKey("transcript_imports.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    student_id = Column(Integer, nullable=True)
+    status = Column(String, nullable=False)  # imported/failed
+    transcript_id = Column(Integer, ForeignKey("transcripts.id"), nullable=True)
+    course_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class BatchSubRequest(BaseModel):
+    method: str = "GET"
+    # An /api route, optionally with a query string, e.g. "/api/plans/12/risks"
+    path: str
+    query: dict[str, Any] = {}
+    headers: dict[str, str] = {}
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    headers: dict[str, str] = {}
+    # Parsed JSON, or text for non-JSON responses; null for empty bodies
+    body: Any = None
@@ -19,3 +19,11 @@ class CourseResponse(CourseCreate):
     model_config = {
         "from_attributes": True,
     }
+
+
+class CourseImportResponse(BaseModel):
+    """Summary returned by POST /courses/upload."""
+
+    inserted: int
+    updated: int
+    rejected: int
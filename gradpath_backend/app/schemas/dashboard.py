@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+from app.schemas.plan_detail import PlanDetailResponse
+from app.schemas.risk import RiskResponse
+from app.schemas.student import StudentResumeResponse
+from app.schemas.transcript import TranscriptStatusResponse
+
+
+class GpaResponse(BaseModel):
+    gpa: float | None = None
+    credits: int = 0
+
+
+class DashboardResponse(BaseModel):
+    """GET /api/students/{id}/dashboard — sections not requested via ``fields`` are null."""
+
+    student_id: int
+    student: StudentResumeResponse | None = None
+    plan: PlanDetailResponse | None = None
+    risks: list[RiskResponse] | None = None
+    gpa: GpaResponse | None = None
+    transcript: TranscriptStatusResponse | None = None
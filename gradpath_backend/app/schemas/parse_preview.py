@@ -2,10 +2,15 @@ from pydantic import BaseModel
 
 
 class ParsePreviewResponse(BaseModel):
-    """Raw text preview (used by POST /documents/preview)."""
+    """Raw text preview (used by POST /documents/preview).
+
+    Extraction stops once the excerpt budget is filled, so ``length`` counts the
+    text read for the preview rather than the whole document.
+    """
 
     text_excerpt: str
     length: int
+    truncated: bool = False  # True when more text exists beyond the excerpt
 
 
 class DetectedCourse(BaseModel):
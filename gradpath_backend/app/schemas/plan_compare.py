@@ -1,9 +1,26 @@
 from pydantic import BaseModel
 
 
+class CourseMove(BaseModel):
+    course_code: str
+    from_term: str
+    to_term: str
+
+
+class TermDiff(BaseModel):
+    term_name: str
+    baseline_credits: int | None = None  # None when only the simulated plan has the term
+    simulated_credits: int | None = None  # None when only the baseline has the term
+    credit_diff: int
+    added_courses: list[str] = []
+    removed_courses: list[str] = []
+
+
 class PlanCompareResponse(BaseModel):
     baseline_plan_id: int
     simulated_plan_id: int
     term_count_diff: int
     added_courses: list[str]
     removed_courses: list[str]
+    moved_courses: list[CourseMove] = []
+    terms: list[TermDiff] = []
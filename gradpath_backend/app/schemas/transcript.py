@@ -38,11 +38,32 @@ class TranscriptConfirmRequest(BaseModel):
     courses: list[ConfirmCourse]
 
 
+class CourseKey(BaseModel):
+    course_code: str
+    term: str | None = None
+
+
+class CourseUpdate(CourseKey):
+    fields: list[str]
+
+
+class TranscriptChanges(BaseModel):
+    """What a confirmation changed, keyed by (course_code, term)."""
+
+    added: list[CourseKey] = []
+    updated: list[CourseUpdate] = []
+    removed: list[CourseKey] = []
+    # Hints for invalidating data derived from the transcript
+    completed_changed: bool = False
+    gpa_changed: bool = False
+
+
 class TranscriptConfirmResponse(BaseModel):
     transcript_id: int
     student_id: int
     status: str
     course_count: int
+    changes: TranscriptChanges = TranscriptChanges()
 
 
 class TranscriptStatusResponse(BaseModel):
@@ -50,7 +71,28 @@ class TranscriptStatusResponse(BaseModel):
 
     student_id: int
     transcript_id: int | None = None
-    # received | parsed_raw | confirmed
+    # received | extracting | parsed_raw | confirmed | failed
     status: str
     courses: list[TranscriptCourseOut] = []
     needs_review: bool = False
+
+
+class TranscriptImportFileResult(BaseModel):
+    filename: str
+    student_id: int | None = None
+    # imported | skipped (imported by an earlier run) | failed
+    status: str
+    transcript_id: int | None = None
+    course_count: int = 0
+    error: str | None = None
+
+
+class TranscriptImportResponse(BaseModel):
+    """POST /api/transcripts/import response — one result per archive entry."""
+
+    import_id: int
+    status: str
+    imported: int
+    skipped: int
+    failed: int
+    files: list[TranscriptImportFileResult]
@@ -0,0 +1,170 @@
+"""Batched API calls: several /api requests in one HTTP round trip.
+
+``POST /api/batch`` hands each sub-request straight to the API router
+in-process, so the app middleware (CORS, ...) and the HTTP transport run once
+for the whole batch. Consecutive GET sub-requests run concurrently; any other
+method runs on its own, in order, after everything before it has finished.
+Once a write has run, later reads send ``X-Read-Your-Writes`` so they see it.
+
+Sub-requests inherit the batch's ``Authorization`` header, and each route
+still opens its session through its own dependency: a SQLAlchemy session
+cannot run statements concurrently, so sharing one would serialize the reads.
+
+Event streams never finish on their own, so a sub-request answered with
+``text/event-stream`` is cut off and rejected with a 400, and any
+sub-request running longer than ``batch_request_timeout_seconds`` gets a 504.
+"""
+import asyncio
+import gzip
+import json
+import logging
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from app.core.config import settings
+from app.core.database import READ_YOUR_WRITES_HEADER
+from app.schemas.batch import BatchSubRequest
+
+_CONCURRENT_METHODS = {"GET", "HEAD"}
+_INHERITED_HEADERS = {"authorization", READ_YOUR_WRITES_HEADER.lower()}
+
+logger = logging.getLogger(__name__)
+
+
+async def run_batch(router, request: Request, sub_requests: list[BatchSubRequest]) -> list[dict]:
+    """Responses for ``sub_requests``, in the same order."""
+    if len(sub_requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.batch_max_requests} requests.",
+        )
+    for sub in sub_requests:
+        path = sub.path.partition("?")[0].rstrip("/")
+        if not path.startswith("/api/") or path == "/api/batch":
+            raise HTTPException(status_code=400, detail=f"Unsupported batch path: {sub.path}")
+
+    results: list[dict] = []
+    wrote = False
+    start = 0
+    while start < len(sub_requests):
+        end = start + 1
+        if sub_requests[start].method.upper() in _CONCURRENT_METHODS:
+            while (
+                end < len(sub_requests)
+                and sub_requests[end].method.upper() in _CONCURRENT_METHODS
+            ):
+                end += 1
+        results.extend(
+            await asyncio.gather(
+                *(_dispatch(router, request, sub, wrote) for sub in sub_requests[start:end])
+            )
+        )
+        wrote = wrote or sub_requests[start].method.upper() not in _CONCURRENT_METHODS
+        start = end
+    return results
+
+
+async def _dispatch(router, request: Request, sub: BatchSubRequest, read_your_writes: bool) -> dict:
+    path, _, query_string = sub.path.partition("?")
+    params = [
+        (key, str(v).lower() if isinstance(v, bool) else v)
+        for key, value in sub.query.items()
+        for v in (value if isinstance(value, list) else [value])
+    ]
+    if params:
+        query_string = "&".join(filter(None, [query_string, urlencode(params)]))
+
+    headers = {k: v for k, v in request.headers.items() if k in _INHERITED_HEADERS}
+    if read_your_writes:
+        headers[READ_YOUR_WRITES_HEADER.lower()] = "1"
+    body = b""
+    if sub.body is not None:
+        body = json.dumps(sub.body).encode("utf-8")
+        headers["content-type"] = "application/json"
+    headers.update({k.lower(): v for k, v in sub.headers.items()})
+    headers["content-length"] = str(len(body))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query_string.encode("latin-1"),
+        "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        "app": request.scope["app"],
+        # The app's handlers turn HTTPException/validation errors into responses
+        "starlette.exception_handlers": request.scope["starlette.exception_handlers"],
+    }
+
+    body_sent = False
+    hang_up = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Behave like a client that stays connected until the response ends,
+        # and that disconnects from an event stream as soon as it starts
+        await hang_up.wait()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    streaming = False
+    response_headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+
+    async def send(message: dict) -> None:
+        nonlocal status, streaming
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for key, value in message.get("headers", []):
+                response_headers[key.decode("latin-1")] = value.decode("latin-1")
+            if response_headers.get("content-type", "").startswith("text/event-stream"):
+                streaming = True
+                hang_up.set()
+        elif message["type"] == "http.response.body" and not streaming:
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(
+            router(scope, receive, send), settings.batch_request_timeout_seconds
+        )
+    except StarletteHTTPException as exc:
+        # Raised by the router itself for unknown paths and methods
+        return {"status": exc.status_code, "headers": {}, "body": {"detail": exc.detail}}
+    except asyncio.TimeoutError:
+        return {
+            "status": 504,
+            "headers": {},
+            "body": {"detail": "Sub-request timed out; send it outside the batch."},
+        }
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", sub.method.upper(), path)
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+    if streaming:
+        return {
+            "status": 400,
+            "headers": {},
+            "body": {"detail": "Event streams cannot be batched; request them directly."},
+        }
+
+    content = b"".join(chunks)
+    if response_headers.pop("content-encoding", None) == "gzip":
+        content = gzip.decompress(content)
+    response_headers.pop("content-length", None)
+    parsed = None
+    if content:
+        if response_headers.get("content-type", "").startswith("application/json"):
+            parsed = json.loads(content)
+        else:
+            parsed = content.decode("utf-8", errors="replace")
+    return {"status": status, "headers": response_headers, "body": parsed}
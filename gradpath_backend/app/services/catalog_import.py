@@ -0,0 +1,145 @@
+import csv
+from io import StringIO, TextIOWrapper
+from typing import BinaryIO
+
+from sqlalchemy import Boolean, Integer, String, column, func, literal_column, select, table, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+from app.services.transcript_parser import iter_catalog_csv
+from app.services.upsert import on_course_conflict_merge, upsert_courses
+
+# Rows staged per COPY + merge + commit cycle. Bounds memory regardless of file size.
+_IMPORT_BATCH_ROWS = 20_000
+_CODE_LOOKUP_CHUNK = 1000
+
+_STAGE_COLUMNS = ("seq", "code", "title", "credits", "availability", "honors_only")
+
+_stage = table(
+    "_course_import",
+    column("seq", Integer),
+    column("code", String),
+    column("title", String),
+    column("credits", Integer),
+    column("availability", String),
+    column("honors_only", Boolean),
+)
+
+
+def import_catalog_csv(db: Session, stream: BinaryIO) -> dict:
+    """Stream a catalog CSV into ``courses`` without materializing it.
+
+    Rows are decoded and parsed incrementally, loaded in batches, and merged
+    with the same fill-only-empty-fields rules as ``upsert_courses``. Each
+    batch is committed on its own. Returns inserted/updated/rejected counts.
+    """
+    counts = {"inserted": 0, "updated": 0, "rejected": 0}
+    merge = _copy_merge if db.get_bind().dialect.name == "postgresql" else _upsert_merge
+
+    reader = TextIOWrapper(stream, encoding="utf-8", errors="ignore", newline="")
+    try:
+        batch: list[dict] = []
+        for row in iter_catalog_csv(reader):
+            if row is None:
+                counts["rejected"] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= _IMPORT_BATCH_ROWS:
+                merge(db, batch, counts)
+                db.commit()
+                batch = []
+        if batch:
+            merge(db, batch, counts)
+            db.commit()
+    finally:
+        # Leave the upload's underlying file open for FastAPI to clean up
+        reader.detach()
+    return counts
+
+
+def _copy_merge(db: Session, batch: list[dict], counts: dict) -> None:
+    # The staging table lives on whichever pooled connection the session holds
+    # for this transaction, so it is (re)declared per batch; ON COMMIT DELETE ROWS
+    # empties it when the batch commits.
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS _course_import ("
+            "seq integer, code text, title text, credits integer, "
+            "availability text, honors_only boolean) ON COMMIT DELETE ROWS"
+        )
+    )
+
+    buf = StringIO()
+    writer = csv.writer(buf)
+    for seq, row in enumerate(batch):
+        writer.writerow(
+            (
+                seq,
+                row["code"],
+                row["title"],
+                row["credits"],
+                row["availability"],
+                "t" if row["honors_only"] else "f",
+            )
+        )
+    buf.seek(0)
+
+    dbapi_conn = db.connection().connection
+    with dbapi_conn.cursor() as cur:
+        cur.copy_expert(
+            f"COPY _course_import ({', '.join(_STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+
+    # Fold duplicate codes inside the file the same way upsert_courses does:
+    # first non-empty value wins, honors_only is sticky.
+    folded = (
+        select(
+            _stage.c.code,
+            _first_present(_stage.c.title, ""),
+            _first_present(_stage.c.credits, 0),
+            _first_present(_stage.c.availability, ""),
+            func.bool_or(_stage.c.honors_only),
+        )
+        .group_by(_stage.c.code)
+    )
+    merged = (
+        on_course_conflict_merge(
+            pg_insert(Course).from_select(
+                ["code", "title", "credits", "availability", "honors_only"], folded
+            )
+        )
+        # xmax is 0 only for tuples created by this statement
+        .returning(literal_column("(xmax = 0)", Boolean).label("inserted"))
+        .cte("merged")
+    )
+    inserted, updated = db.execute(
+        select(
+            func.count().filter(merged.c.inserted),
+            func.count().filter(~merged.c.inserted),
+        )
+    ).one()
+    counts["inserted"] += inserted
+    counts["updated"] += updated
+
+
+def _first_present(col, empty):
+    return array_agg(aggregate_order_by(col, _stage.c.seq)).filter(
+        func.nullif(col, empty).isnot(None)
+    )[1]
+
+
+def _upsert_merge(db: Session, batch: list[dict], counts: dict) -> None:
+    # Portable path for non-Postgres databases (local SQLite runs).
+    codes = list({row["code"] for row in batch})
+    existing = 0
+    for start in range(0, len(codes), _CODE_LOOKUP_CHUNK):
+        existing += db.scalar(
+            select(func.count())
+            .select_from(Course)
+            .where(Course.code.in_(codes[start:start + _CODE_LOOKUP_CHUNK]))
+        )
+    written = upsert_courses(db, batch)
+    counts["inserted"] += written - existing
+    counts["updated"] += existing
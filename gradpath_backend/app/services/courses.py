@@ -1,13 +1,10 @@
 from sqlalchemy.orm import Session
 
-from app.models.course import Course
-from app.schemas.course import CourseCreate
+from app.schemas.course import CourseCreate, CourseResponse
+from app.services.upsert import upsert_courses_returning
 
 
-def bulk_create_courses(db: Session, courses: list[CourseCreate]) -> list[Course]:
-    items = [Course(**course.model_dump()) for course in courses]
-    db.add_all(items)
+def bulk_create_courses(db: Session, courses: list[CourseCreate]) -> list[CourseResponse]:
+    rows = upsert_courses_returning(db, (course.model_dump() for course in courses))
     db.commit()
-    for item in items:
-        db.refresh(item)
-    return items
+    return [CourseResponse.model_validate(row._mapping) for row in rows]
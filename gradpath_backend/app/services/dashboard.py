@@ -0,0 +1,93 @@
+"""Everything the dashboard and export screens show, in a fixed number of queries.
+
+The first statement loads the student together with its latest transcript
+and latest plan ids (correlated subqueries), so the "latest" lookups that the
+individual endpoints each repeat happen once. Only the requested sections are
+loaded after that: transcript course rows (shared by GPA and transcript), the
+plan tree, and its risks.
+"""
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.plan import Plan
+from app.models.student import Student
+from app.models.transcript import Transcript, TranscriptCourse
+from app.schemas.student import StudentResumeResponse
+from app.services.plans import get_plan, get_plan_risks
+from app.services.students import gpa_from_courses
+from app.services.transcripts import transcript_status_payload
+
+DASHBOARD_SECTIONS = ("student", "plan", "risks", "gpa", "transcript")
+
+
+def parse_sections(fields: str | None) -> set[str]:
+    """``fields=plan,risks`` -> the requested sections; all of them when omitted."""
+    if not fields:
+        return set(DASHBOARD_SECTIONS)
+    sections = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sections.difference(DASHBOARD_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown dashboard fields: {', '.join(sorted(unknown))}. "
+            f"Choose from {', '.join(DASHBOARD_SECTIONS)}.",
+        )
+    return sections
+
+
+def get_dashboard(db: Session, student_id: int, sections: set[str]) -> dict:
+    def latest_transcript(column):
+        return (
+            select(column)
+            .where(Transcript.student_id == Student.id)
+            .order_by(Transcript.uploaded_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    row = db.execute(
+        select(
+            Student,
+            latest_transcript(Transcript.id).label("transcript_id"),
+            latest_transcript(Transcript.status).label("transcript_status"),
+            latest_transcript(Transcript.content_sha256).label("content_sha256"),
+            select(func.max(Plan.id))
+            .where(Plan.student_id == Student.id, Plan.kind == "baseline")
+            .scalar_subquery()
+            .label("plan_id"),
+        ).where(Student.id == student_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Student not found.")
+
+    result: dict = {"student_id": student_id}
+    if "student" in sections:
+        student = StudentResumeResponse.model_validate(row.Student)
+        student.transcript_id = row.transcript_id
+        student.transcript_status = row.transcript_status
+        student.plan_id = row.plan_id
+        result["student"] = student
+
+    if sections & {"gpa", "transcript"}:
+        courses = []
+        if row.transcript_id is not None:
+            courses = db.scalars(
+                select(TranscriptCourse).where(TranscriptCourse.transcript_id == row.transcript_id)
+            ).all()
+        if "gpa" in sections:
+            gpa, credits = gpa_from_courses(courses)
+            result["gpa"] = {"gpa": gpa, "credits": credits}
+        if "transcript" in sections:
+            result["transcript"] = transcript_status_payload(
+                db, student_id, row.transcript_id, row.transcript_status, row.content_sha256, courses
+            )
+
+    if row.plan_id is not None:
+        if "plan" in sections:
+            result["plan"] = get_plan(db, row.plan_id)
+        if "risks" in sections:
+            result["risks"] = get_plan_risks(db, row.plan_id)
+    elif "risks" in sections:
+        result["risks"] = []
+    return result
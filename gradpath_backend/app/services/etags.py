@@ -0,0 +1,84 @@
+"""Strong ETags for read endpoints, from lightweight version lookups.
+
+Each function answers with a single narrow query (row status, version or
+timestamp columns) so a conditional GET can be turned into a 304 without
+loading or serializing the resource. ``None`` means the resource has no
+stable version (it is missing or still being generated) and should not be
+cached.
+"""
+import hashlib
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.extraction import ParsedContent
+from app.models.plan import Plan
+from app.models.student import Student
+from app.models.transcript import Transcript
+from app.services.transcript_parser import PARSER_VERSION
+
+
+def plan_etag(db: Session, plan_id: int, representation: str) -> str | None:
+    """ETag for a completed plan; completed plans never change."""
+    status = db.scalar(select(Plan.status).where(Plan.id == plan_id))
+    return completed_plan_etag(plan_id, status, representation)
+
+
+def completed_plan_etag(plan_id: int, status: str | None, representation: str) -> str | None:
+    """``plan_etag`` for a caller that already has the plan's status."""
+    if status != "complete":
+        return None
+    return f'"plan-{plan_id}-{representation}"'
+
+
+def transcript_etag(db: Session, student_id: int, representation: str) -> str:
+    """ETag over the student's latest transcript: its id, status, course version and parse."""
+    row = db.execute(
+        select(Transcript.id, Transcript.status, Transcript.version, Transcript.content_sha256)
+        .where(Transcript.student_id == student_id)
+        .order_by(Transcript.uploaded_at.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        return _etag(representation, student_id, "none")
+    parse_version = None
+    if row.status == "parsed_raw" and row.content_sha256:
+        # Un-materialized transcripts are served from the persisted parse
+        parse_version = db.scalar(
+            select(func.max(ParsedContent.parser_version)).where(
+                ParsedContent.content_sha256 == row.content_sha256,
+                ParsedContent.parser == "transcript",
+            )
+        )
+    return _etag(
+        representation, student_id, row.id, row.status, row.version, PARSER_VERSION, parse_version
+    )
+
+
+def student_etag(db: Session, student_id: int) -> str | None:
+    """ETag over the student row plus the latest transcript/plan it points at."""
+    latest_transcript = (
+        select(Transcript.id, Transcript.status)
+        .where(Transcript.student_id == student_id)
+        .order_by(Transcript.uploaded_at.desc())
+        .limit(1)
+        .subquery()
+    )
+    row = db.execute(
+        select(
+            Student.updated_at,
+            select(latest_transcript.c.id).scalar_subquery(),
+            select(latest_transcript.c.status).scalar_subquery(),
+            select(func.max(Plan.id))
+            .where(Plan.student_id == student_id, Plan.kind == "baseline")
+            .scalar_subquery(),
+        ).where(Student.id == student_id)
+    ).first()
+    if row is None:
+        return None
+    return _etag("student", student_id, *row)
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{parts[0]}-{parts[1]}-{digest}"'
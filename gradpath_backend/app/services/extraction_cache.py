@@ -0,0 +1,137 @@
+"""Content-addressed cache of extracted PDF text and parser output.
+
+Uploads are keyed by the SHA-256 of their bytes. The first upload of a file
+pays for extraction and parsing; every later upload of the same bytes reads
+the stored text and parsed rows instead, and the transcript/document row
+only keeps the hash. Text is stored zlib-compressed and only loaded when a
+caller asks for it.
+"""
+import hashlib
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.extraction import ExtractedText, ParsedContent
+from app.services.pdf_pool import extract_and_parse_in_pool, extract_text_in_pool
+from app.services.transcript_parser import PARSER_VERSION, PARSERS
+from app.services.upsert import dialect_insert
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_or_extract_text(db: Session, digest: str, data: bytes) -> str:
+    """Return extracted text for these bytes, running extraction only on a miss."""
+    text = _cached_text(db, digest)
+    if text is not None:
+        return text
+    text, _ = extract_text_in_pool(data)
+    if text:
+        store_text(db, digest, text)
+    return text
+
+
+def get_or_extract_and_parse(
+    db: Session, digest: str, data: bytes, parser: str
+) -> tuple[str, list[dict]]:
+    """Extracted text plus ``parser`` output for these bytes.
+
+    On a miss both run together in the PDF worker, parsing pages as they are
+    extracted, and both results are stored.
+    """
+    text = _cached_text(db, digest)
+    if text is not None:
+        return text, get_or_parse(db, digest, parser, text)
+    text, rows = extract_and_parse_in_pool(data, parser)
+    if text:
+        store_text(db, digest, text)
+        store_parsed(db, digest, parser, rows)
+    return text, rows
+
+
+def get_or_parse(db: Session, digest: str | None, parser: str, text: str) -> list[dict]:
+    """Return ``parser`` output for ``text``, cached under (digest, parser, version).
+
+    Rows without a content hash (uploaded before the cache existed) are parsed
+    without caching.
+    """
+    if digest is None:
+        return PARSERS[parser]([text])
+    payload = db.scalar(
+        select(ParsedContent.payload).where(
+            ParsedContent.content_sha256 == digest,
+            ParsedContent.parser == parser,
+            ParsedContent.parser_version == PARSER_VERSION,
+        )
+    )
+    if payload is not None:
+        return payload
+    payload = PARSERS[parser]([text])
+    store_parsed(db, digest, parser, payload)
+    return payload
+
+
+def get_persisted_parse(
+    db: Session, digest: str | None, parser: str
+) -> tuple[list[dict] | None, bool]:
+    """Stored ``parser`` output for a content hash, without ever parsing.
+
+    Returns (payload, is_current). The newest stored version is returned even
+    when it predates PARSER_VERSION; (None, False) means nothing is stored yet.
+    """
+    if digest is None:
+        return None, False
+    row = db.execute(
+        select(ParsedContent.payload, ParsedContent.parser_version)
+        .where(ParsedContent.content_sha256 == digest, ParsedContent.parser == parser)
+        .order_by(ParsedContent.parser_version.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        return None, False
+    return row.payload, row.parser_version == PARSER_VERSION
+
+
+def store_text(db: Session, digest: str, text: str) -> None:
+    # A concurrent upload of the same file may have stored it first.
+    db.execute(
+        dialect_insert(db, ExtractedText)
+        .values(content_sha256=digest, compressed_text=text)
+        .on_conflict_do_nothing(index_elements=["content_sha256"])
+    )
+
+
+def store_parsed(db: Session, digest: str, parser: str, payload: list[dict]) -> None:
+    """Persist ``payload`` as the current-version result and drop older versions."""
+    db.execute(
+        dialect_insert(db, ParsedContent)
+        .values(
+            content_sha256=digest,
+            parser=parser,
+            parser_version=PARSER_VERSION,
+            payload=payload,
+        )
+        .on_conflict_do_nothing(index_elements=["content_sha256", "parser", "parser_version"])
+    )
+    db.execute(
+        delete(ParsedContent).where(
+            ParsedContent.content_sha256 == digest,
+            ParsedContent.parser == parser,
+            ParsedContent.parser_version < PARSER_VERSION,
+        )
+    )
+
+
+def load_texts(db: Session, digests) -> dict[str, str]:
+    """Stored text for each of ``digests`` that has any."""
+    rows = db.execute(
+        select(
+            ExtractedText.content_sha256, ExtractedText.compressed_text, ExtractedText.text
+        ).where(ExtractedText.content_sha256.in_(digests))
+    ).all()
+    return {row.content_sha256: row.compressed_text or row.text for row in rows}
+
+
+def _cached_text(db: Session, digest: str) -> str | None:
+    return load_texts(db, [digest]).get(digest)
@@ -1,6 +1,8 @@
 from collections import defaultdict, deque
 from dataclasses import dataclass
 
+from app.core.metrics import timed
+
 
 @dataclass
 class PrereqGraph:
@@ -9,6 +11,7 @@ class PrereqGraph:
     prereqs: dict[str, set[str]]  # course -> prereqs
 
 
+@timed("build_graph")
 def build_graph(prereq_map: dict[str, set[str]]) -> PrereqGraph:
     nodes = set(prereq_map.keys())
     edges: dict[str, set[str]] = defaultdict(set)
@@ -23,6 +26,7 @@ def build_graph(prereq_map: dict[str, set[str]]) -> PrereqGraph:
     return PrereqGraph(nodes=nodes, edges=edges, prereqs=prereqs)
 
 
+@timed("topo_sort")
 def topo_sort(graph: PrereqGraph) -> list[str]:
     indegree = {n: 0 for n in graph.nodes}
     for course, reqs in graph.prereqs.items():
@@ -0,0 +1,358 @@
+"""Background ingest of uploaded PDFs.
+
+Upload endpoints only store the file bytes (``UploadBlob``) and create the
+transcript/document row with ``status="received"``; they return at once.
+Worker threads then claim queued rows and advance them:
+
+    Transcript:      received -> extracting -> parsed_raw   (awaiting review)
+    DocumentUpload:  received -> extracting -> parsed_raw -> ingested
+
+Either ends in ``failed`` only when no text can be extracted. Claims are
+optimistic ``UPDATE ... WHERE status = 'received'`` statements, so several
+app processes can share the queue; rows stuck in ``extracting`` after a
+crash, or after an error unrelated to the document (database, extraction
+pool), are reclaimed and retried once they go stale. Each transition is
+likewise guarded on the row's current status: a transcript the student
+confirms while it is queued is no longer ``extracting`` when its parse
+finishes, so that parse and its course rows are discarded.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, exists, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.metrics import UPLOADS, record_parse_confidence
+from app.models.document import DocumentUpload
+from app.models.extraction import UploadBlob
+from app.models.transcript import Transcript, TranscriptCourse
+from app.services.extraction_cache import (
+    content_sha256,
+    get_or_extract_and_parse,
+    get_or_extract_text,
+)
+from app.services.upsert import dialect_insert, upsert_courses, upsert_prereqs
+
+# Parser applied to each document kind. Transcript-like documents are parsed
+# for the review preview; catalog and prereq lists are also ingested.
+DOCUMENT_PARSERS = {
+    "transcript": "transcript",
+    "degree_audit": "transcript",
+    "course_catalog": "catalog",
+    "prereq_list": "prereq",
+}
+
+PENDING_STATUSES = ("received", "extracting")
+TERMINAL_STATUSES = {
+    Transcript: {"parsed_raw", "confirmed", "failed"},
+    DocumentUpload: {"ingested", "failed"},
+}
+_CLAIM_CANDIDATES = 8
+_EVENT_POLL_SECONDS = 0.5
+_EVENT_HEARTBEAT_SECONDS = 15.0
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_transcript_pdf(
+    db: Session, student_id: int, filename: str | None, data: bytes
+) -> Transcript:
+    digest = _store_blob(db, data)
+    transcript = Transcript(
+        student_id=student_id,
+        filename=filename,
+        content_sha256=digest,
+        status="received",
+        status_updated_at=datetime.utcnow(),
+    )
+    db.add(transcript)
+    db.commit()
+    db.refresh(transcript)
+    UPLOADS.inc("transcript", "pdf")
+    request_ingest()
+    return transcript
+
+
+def enqueue_document_pdf(
+    db: Session, student_id: int, kind: str, filename: str | None, data: bytes
+) -> DocumentUpload:
+    digest = _store_blob(db, data)
+    doc = DocumentUpload(
+        student_id=student_id,
+        kind=kind,
+        filename=filename,
+        content_sha256=digest,
+        status="received",
+        status_updated_at=datetime.utcnow(),
+    )
+    db.add(doc)
+    db.commit()
+    db.refresh(doc)
+    UPLOADS.inc(kind, "pdf")
+    request_ingest()
+    return doc
+
+
+def ingest_pending(db: Session) -> int:
+    """Claim and process queued rows until none are left. Returns the count processed."""
+    processed = 0
+    while True:
+        claimed = False
+        for model, process in ((Transcript, _ingest_transcript), (DocumentUpload, _ingest_document)):
+            row_id = _claim(db, model)
+            if row_id is None:
+                continue
+            claimed = True
+            try:
+                process(db, db.get(model, row_id))
+            except HTTPException as exc:
+                db.rollback()
+                if exc.status_code != 503:
+                    raise
+                # Extraction pool is saturated or failed; retry on the next wake or poll.
+                _set_status(db, model, row_id, "received")
+                db.commit()
+                return processed
+            except Exception:
+                # Not evidence the PDF is unreadable (only empty text is), so keep
+                # the row and its blob: back to "extracting" (a document may have
+                # reached parsed_raw) until it goes stale and is claimed again. A
+                # transcript that was parsed or confirmed meanwhile is left alone.
+                db.rollback()
+                logger.exception(
+                    "Ingest of %s %d failed; retrying after %.0fs",
+                    model.__tablename__,
+                    row_id,
+                    settings.ingest_stale_seconds,
+                )
+                retry = ("extracting", "parsed_raw") if model is DocumentUpload else ("extracting",)
+                _set_status(db, model, row_id, "extracting", expected=retry)
+                db.commit()
+                continue
+            processed += 1
+        if not claimed:
+            return processed
+
+
+def is_queued(db: Session, row) -> bool:
+    """Whether a Transcript/DocumentUpload is still waiting on the ingest workers."""
+    return bool(
+        row.status in PENDING_STATUSES
+        and row.content_sha256
+        and db.scalar(select(exists().where(UploadBlob.content_sha256 == row.content_sha256)))
+    )
+
+
+async def status_events(model, row_id: int) -> AsyncIterator[str]:
+    """Server-sent events for a row's status until it is terminal or the stream times out.
+
+    Polls on the async engine, so an open stream holds no threadpool thread.
+    """
+    last = None
+    deadline = time.monotonic() + settings.ingest_events_timeout_seconds
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        async with AsyncSessionLocal() as db:
+            row = (
+                await db.execute(
+                    select(model.status, model.content_sha256).where(model.id == row_id)
+                )
+            ).first()
+        if row is None:
+            return
+        if row.status != last:
+            last = row.status
+            last_sent = time.monotonic()
+            yield f"event: status\ndata: {json.dumps({'id': row_id, 'status': row.status})}\n\n"
+        if row.status in TERMINAL_STATUSES[model] or (
+            row.status == "received" and row.content_sha256 is None  # never queued
+        ):
+            return
+        if time.monotonic() - last_sent > _EVENT_HEARTBEAT_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(_EVENT_POLL_SECONDS)
+
+
+def _ingest_transcript(db: Session, transcript: Transcript) -> None:
+    digest = transcript.content_sha256
+    text, rows = get_or_extract_and_parse(db, digest, _blob(db, digest), "transcript")
+    if not _set_status(db, Transcript, transcript.id, "parsed_raw" if text else "failed"):
+        # Confirmed by the student while we worked; their courses win, drop this parse.
+        db.rollback()
+        release_blob(db, digest)
+        return
+    if rows:
+        db.execute(
+            insert(TranscriptCourse),
+            [{**row, "transcript_id": transcript.id} for row in rows],
+        )
+        upsert_courses(
+            db,
+            (
+                {"code": r["course_code"], "title": r["course_title"], "credits": r["credits"]}
+                for r in rows
+            ),
+        )
+    db.commit()
+    release_blob(db, digest)
+    record_parse_confidence(rows)
+
+
+def _ingest_document(db: Session, doc: DocumentUpload) -> None:
+    digest = doc.content_sha256
+    parser = DOCUMENT_PARSERS.get(doc.kind)
+    data = _blob(db, digest)
+    if parser is None:
+        text, rows = get_or_extract_text(db, digest, data), []
+    else:
+        text, rows = get_or_extract_and_parse(db, digest, data, parser)
+    if not text:
+        _set_status(db, DocumentUpload, doc.id, "failed")
+        db.commit()
+        release_blob(db, digest)
+        return
+    _set_status(db, DocumentUpload, doc.id, "parsed_raw")
+    db.commit()
+
+    if doc.kind == "course_catalog":
+        upsert_courses(db, rows)
+    elif doc.kind == "prereq_list":
+        upsert_prereqs(db, rows)
+    _set_status(db, DocumentUpload, doc.id, "ingested", expected=("parsed_raw",))
+    db.commit()
+    release_blob(db, digest)
+
+
+def release_blob(db: Session, digest: str | None) -> None:
+    """Drop the upload bytes for ``digest`` once no queued row still needs them."""
+    if digest is None:
+        return
+    still_needed = or_(
+        *(
+            exists().where(m.content_sha256 == digest, m.status.in_(PENDING_STATUSES))
+            for m in (Transcript, DocumentUpload)
+        )
+    )
+    db.execute(delete(UploadBlob).where(UploadBlob.content_sha256 == digest, ~still_needed))
+    db.commit()
+
+
+def _claim(db: Session, model) -> int | None:
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.ingest_stale_seconds)
+    claimable = and_(
+        or_(
+            model.status == "received",
+            and_(model.status == "extracting", model.status_updated_at < stale_before),
+        ),
+        model.content_sha256.isnot(None),
+    )
+    candidates = db.scalars(
+        select(model.id)
+        .where(claimable, exists().where(UploadBlob.content_sha256 == model.content_sha256))
+        .order_by(model.id)
+        .limit(_CLAIM_CANDIDATES)
+    ).all()
+    for row_id in candidates:
+        claimed = db.execute(
+            update(model)
+            .where(model.id == row_id, claimable)
+            .values(status="extracting", status_updated_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        if claimed:
+            return row_id
+    return None
+
+
+def _set_status(
+    db: Session, model, row_id: int, status: str, expected: tuple[str, ...] = ("extracting",)
+) -> bool:
+    """Move a claimed row to ``status`` if it is still in one of the ``expected`` states.
+
+    Returns False when something else (e.g. a transcript confirm) moved it first.
+    """
+    return bool(
+        db.execute(
+            update(model)
+            .where(model.id == row_id, model.status.in_(expected))
+            .values(status=status, status_updated_at=datetime.utcnow())
+        ).rowcount
+    )
+
+
+def _store_blob(db: Session, data: bytes) -> str:
+    digest = content_sha256(data)
+    db.execute(
+        dialect_insert(db, UploadBlob)
+        .values(content_sha256=digest, data=data)
+        .on_conflict_do_nothing(index_elements=["content_sha256"])
+    )
+    return digest
+
+
+def _blob(db: Session, digest: str) -> bytes:
+    return db.scalar(select(UploadBlob.data).where(UploadBlob.content_sha256 == digest))
+
+
+class _IngestWorkers:
+    """Threads that drain the ingest queue when woken, and on a slow poll."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self, count: int) -> None:
+        if not self._threads:
+            for i in range(max(count, 1)):
+                thread = threading.Thread(target=self._run, name=f"ingest-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._wake.set()
+
+    def request(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(settings.ingest_poll_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            db = SessionLocal()
+            try:
+                ingest_pending(db)
+            except Exception:
+                # Rows stay queued and are retried on the next wake or poll
+                logger.exception("Ingest worker run failed")
+            finally:
+                db.close()
+
+
+_workers = _IngestWorkers()
+
+
+def start_ingest_workers() -> None:
+    _workers.start(settings.ingest_workers)
+
+
+def request_ingest() -> None:
+    """Wake the ingest workers to pick up newly queued uploads."""
+    _workers.request()
+
+
+def stop_ingest_workers() -> None:
+    _workers.stop()
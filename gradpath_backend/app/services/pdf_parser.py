@@ -1,26 +1,63 @@
 from io import BytesIO
-from typing import Iterable
+from typing import Generator
 
 from pypdf import PdfReader
 from pypdf.errors import DependencyError, PdfReadError
 
 
-def extract_text_from_pdf(data: bytes) -> str:
+def iter_pdf_pages(
+    data: bytes,
+    max_pages: int | None = None,
+    max_chars: int | None = None,
+) -> Generator[str, None, bool]:
+    """Yield the text of each page as it is extracted.
+
+    Stops early once ``max_pages`` pages or ``max_chars`` characters have been
+    produced, and at the first page pypdf cannot read. The generator returns
+    True when it stopped at one of the limits with pages left unread.
+    """
     try:
         reader = PdfReader(BytesIO(data))
     except (PdfReadError, DependencyError):
-        return ""
+        return False
     if reader.is_encrypted:
         try:
             reader.decrypt("")
         except Exception:
-            return ""
-    pages: Iterable[str] = []
-    texts = []
+            return False
+    total = len(reader.pages)
+    count = total if max_pages is None else min(total, max_pages)
+    produced = 0
     try:
-        for page in reader.pages:
-            text = page.extract_text() or ""
-            texts.append(text)
+        for index in range(count):
+            text = reader.pages[index].extract_text() or ""
+            yield text
+            produced += len(text)
+            if max_chars is not None and produced >= max_chars:
+                return index + 1 < total
     except (PdfReadError, DependencyError):
-        return ""
-    return "\n".join(texts).strip()
+        return False
+    return count < total
+
+
+def extract_text_from_pdf(
+    data: bytes,
+    max_pages: int | None = None,
+    max_chars: int | None = None,
+) -> str:
+    return extract_pdf_text(data, max_pages, max_chars)[0]
+
+
+def extract_pdf_text(
+    data: bytes,
+    max_pages: int | None = None,
+    max_chars: int | None = None,
+) -> tuple[str, bool]:
+    """Text within the limits, and whether pages were left unread because of them."""
+    source = iter_pdf_pages(data, max_pages, max_chars)
+    pages: list[str] = []
+    while True:
+        try:
+            pages.append(next(source))
+        except StopIteration as stop:
+            return "\n".join(pages).strip(), bool(stop.value)
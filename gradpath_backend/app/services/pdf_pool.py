@@ -0,0 +1,351 @@
+"""Bounded process pool for PDF text extraction.
+
+pypdf is pure Python and CPU-bound; running it on the request thread holds
+the GIL and stalls every other request on the worker. Extraction jobs are
+shipped to a small pool of spawned processes instead, each with a wall-clock
+timeout, a page cap and an address-space limit. Workers are recycled after a
+fixed number of jobs so fragmented heaps do not accumulate.
+"""
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import observe_stage, stage_timer
+from app.services.pdf_parser import extract_pdf_text, iter_pdf_pages
+from app.services.transcript_parser import PARSERS
+
+# Extra time the parent waits beyond the in-worker alarm before declaring a
+# worker hung and tearing the pool down.
+_HARD_TIMEOUT_GRACE_SECONDS = 5.0
+_POLL_SECONDS = 0.25
+
+
+class _JobTimeout(BaseException):
+    # BaseException so pypdf's broad ``except Exception`` handlers cannot swallow it
+    pass
+
+
+# Worker side of PdfExtractionPool._events, set by _init_worker
+_events = None
+
+
+def _init_worker(memory_mb: int, events) -> None:
+    global _events
+    _events = events
+    # Lets the parent find its workers to kill a hung one (see PdfExtractionPool._reset)
+    events.put(("worker", os.getpid()))
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # non-POSIX
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _on_alarm(signum, frame):
+    raise _JobTimeout()
+
+
+def _run_job(
+    job_id: int,
+    data: bytes,
+    max_pages: int,
+    max_chars: int | None,
+    parser: str | None,
+    timeout: float,
+) -> tuple[str, list[dict] | None, bool, str, float]:
+    """Worker entry point. Returns (text, parsed rows, truncated, outcome, seconds spent).
+
+    When ``parser`` is given, pages are fed to it as they are extracted so
+    parsing of early pages overlaps extraction of later ones.
+    """
+    # Starts the parent's hard deadline (see PdfExtractionPool._wait)
+    _events.put(("job", job_id))
+    start = time.perf_counter()
+    has_alarm = hasattr(signal, "setitimer")
+    if has_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    pages: list[str] = []
+    truncated = False
+
+    def collect():
+        nonlocal truncated
+        source = iter_pdf_pages(data, max_pages=max_pages, max_chars=max_chars)
+        while True:
+            try:
+                page = next(source)
+            except StopIteration as stop:
+                truncated = bool(stop.value)
+                return
+            pages.append(page)
+            yield page
+
+    stream = collect()
+    rows = None
+    try:
+        if parser is not None:
+            rows = PARSERS[parser](stream)
+        for _ in stream:
+            pass  # drain whatever the parser did not read so the text is complete
+        text = "\n".join(pages).strip()
+        outcome = "ok"
+    except _JobTimeout:
+        text, rows, outcome = "", None, "timeout"
+    except MemoryError:
+        text, rows, outcome = "", None, "memory"
+    finally:
+        if has_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return text, rows, truncated, outcome, time.perf_counter() - start
+
+
+class PdfExtractionPool:
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        job_timeout: float,
+        max_pages: int,
+        memory_mb: int,
+        max_jobs_per_worker: int,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.max_pages = max_pages
+        self.memory_mb = memory_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+
+        self._executor: ProcessPoolExecutor | None = None
+        # ("worker", pid) and ("job", id) messages from the current executor's workers
+        self._events = None
+        self._worker_pids: set[int] = set()
+        # Job id -> when a worker picked it up (None while still queued)
+        self._job_started: dict[int, float | None] = {}
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {
+            "jobs": 0,
+            "ok": 0,
+            "timeout": 0,
+            "memory": 0,
+            "crashed": 0,
+            "rejected": 0,
+        }
+        self._extract_seconds_sum = 0.0
+        self._extract_seconds_max = 0.0
+        self._wait_seconds_sum = 0.0
+
+    def run(
+        self,
+        data: bytes,
+        max_pages: int | None = None,
+        max_chars: int | None = None,
+        parser: str | None = None,
+    ) -> tuple[str, list[dict] | None, bool]:
+        """Extract (and optionally parse) in a worker process.
+
+        Returns (text, rows, truncated), where ``truncated`` says pages were
+        left unread because of ``max_pages``/``max_chars``. A document that
+        times out or exceeds the memory cap gives ("", None, False). When the
+        pool itself fails (a worker crashed or could not start, or the pool was
+        torn down) it raises a 503 instead, since the document may be fine.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="PDF extraction is busy. Please retry shortly.",
+                )
+            self._in_flight += 1
+            self._counters["jobs"] += 1
+            executor = self._get_executor()
+            self._collect_events()
+            job_id = next(self._job_ids)
+            self._job_started[job_id] = None
+
+        if max_pages is None or max_pages > self.max_pages:
+            max_pages = self.max_pages
+        submitted = time.perf_counter()
+        outcome = "crashed"
+        extract_seconds = 0.0
+        text, rows, truncated = "", None, False
+        try:
+            try:
+                future = executor.submit(
+                    _run_job, job_id, data, max_pages, max_chars, parser, self.job_timeout
+                )
+            except RuntimeError:
+                raise CancelledError()  # shut down by another job's reset after we picked it
+            text, rows, truncated, outcome, extract_seconds = self._wait(job_id, future, executor)
+        except BrokenProcessPool:
+            # A worker died (usually the memory cap); start a fresh pool.
+            self._reset(executor)
+        except CancelledError:
+            pass  # pool was torn down by another job's hard timeout
+        finally:
+            total = time.perf_counter() - submitted
+            with self._lock:
+                self._job_started.pop(job_id, None)
+                self._in_flight -= 1
+                self._counters[outcome] += 1
+                self._extract_seconds_sum += extract_seconds
+                self._extract_seconds_max = max(self._extract_seconds_max, extract_seconds)
+                self._wait_seconds_sum += max(total - extract_seconds, 0.0)
+            if outcome == "ok":
+                # Measured in the worker; includes parsing when a parser was given
+                observe_stage("extract_text_from_pdf", extract_seconds)
+        if outcome == "crashed":
+            raise HTTPException(
+                status_code=503,
+                detail="PDF extraction is temporarily unavailable. Please retry shortly.",
+            )
+        return text, rows, truncated
+
+    def _wait(
+        self, job_id: int, future, executor
+    ) -> tuple[str, list[dict] | None, bool, str, float]:
+        # The hard deadline starts when a worker reports it picked the job up.
+        # future.running() is no help: the executor marks a job running as soon
+        # as it enters the call queue (workers + 1 deep), so a job stuck behind
+        # a slow one would look hung and the reset would cancel healthy jobs.
+        while True:
+            try:
+                return future.result(timeout=_POLL_SECONDS)
+            except FutureTimeoutError:
+                with self._lock:
+                    self._collect_events()
+                    started_at = self._job_started.get(job_id)
+                if started_at is None:
+                    continue
+                now = time.perf_counter()
+                if now - started_at > self.job_timeout + _HARD_TIMEOUT_GRACE_SECONDS:
+                    # The in-worker alarm did not fire; the worker is stuck.
+                    self._reset(executor)
+                    return "", None, False, "timeout", now - started_at
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = sum(
+                self._counters[k] for k in ("ok", "timeout", "memory", "crashed")
+            )
+            return {
+                "workers": self.workers,
+                "queue_depth": self._in_flight,
+                "queue_capacity": self.max_queue,
+                **{f"{name}_total": value for name, value in self._counters.items()},
+                "extract_seconds_sum": round(self._extract_seconds_sum, 6),
+                "extract_seconds_max": round(self._extract_seconds_max, 6),
+                "extract_seconds_avg": round(self._extract_seconds_sum / completed, 6)
+                if completed
+                else 0.0,
+                "queue_wait_seconds_sum": round(self._wait_seconds_sum, 6),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Caller holds self._lock
+        if self._executor is None:
+            # max_tasks_per_child requires a non-fork start method
+            context = multiprocessing.get_context("spawn")
+            self._events = context.SimpleQueue()
+            self._worker_pids = set()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.memory_mb, self._events),
+                max_tasks_per_child=self.max_jobs_per_worker,
+            )
+        return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return  # another thread already replaced it
+            self._collect_events()
+            self._executor = None
+            pids, self._worker_pids = self._worker_pids, set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Only processes that are still our children: a recycled worker's PID
+        # may since have been reused by an unrelated process.
+        for process in multiprocessing.active_children():
+            if process.pid in pids:
+                process.terminate()
+
+    def _collect_events(self) -> None:
+        # Caller holds self._lock. Drained on every job and every wait poll so
+        # the pipe never fills; PIDs of exited workers are dropped. Start times
+        # are taken on receipt, at most one poll late.
+        if self._events is None:
+            return
+        while not self._events.empty():
+            kind, value = self._events.get()
+            if kind == "worker":
+                self._worker_pids.add(value)
+            elif value in self._job_started:  # else already finished
+                self._job_started[value] = time.perf_counter()
+        if len(self._worker_pids) > self.workers:
+            alive = {process.pid for process in multiprocessing.active_children()}
+            self._worker_pids &= alive
+
+
+_pool = PdfExtractionPool(
+    workers=settings.pdf_pool_workers,
+    max_queue=settings.pdf_pool_max_queue,
+    job_timeout=settings.pdf_job_timeout_seconds,
+    max_pages=settings.pdf_max_pages,
+    memory_mb=settings.pdf_worker_memory_mb,
+    max_jobs_per_worker=settings.pdf_worker_max_jobs,
+)
+
+
+def extract_text_in_pool(
+    data: bytes,
+    max_pages: int | None = None,
+    max_chars: int | None = None,
+) -> tuple[str, bool]:
+    """Extracted text, and whether pages were left unread because of the limits."""
+    if not settings.pdf_pool_enabled:
+        page_cap = min(max_pages or settings.pdf_max_pages, settings.pdf_max_pages)
+        with stage_timer("extract_text_from_pdf"):
+            return extract_pdf_text(data, max_pages=page_cap, max_chars=max_chars)
+    text, _, truncated = _pool.run(data, max_pages=max_pages, max_chars=max_chars)
+    return text, truncated
+
+
+def extract_and_parse_in_pool(data: bytes, parser: str) -> tuple[str, list[dict]]:
+    """Extract text and run the named parser over the pages as they stream in."""
+    if not settings.pdf_pool_enabled:
+        with stage_timer("extract_text_from_pdf"):
+            pages = list(iter_pdf_pages(data, max_pages=settings.pdf_max_pages))
+        return "\n".join(pages).strip(), PARSERS[parser](pages)
+    text, rows, _ = _pool.run(data, parser=parser)
+    return text, rows or []
+
+
+def pool_stats() -> dict:
+    return {"enabled": settings.pdf_pool_enabled, **_pool.stats()}
+
+
+def shutdown_pool() -> None:
+    _pool.shutdown()
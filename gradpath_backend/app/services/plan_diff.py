@@ -0,0 +1,150 @@
+"""Term-aligned diffs between two plans, for ``GET /plans/compare``.
+
+Plans are reduced to a compact form, a list of ``(term_name, credits,
+course codes)``, read straight from the stored document or from a single
+plan_terms/plan_items query, without hydrating ORM objects. The diff walks
+the simulated plan once against a course -> term index of the baseline.
+
+Completed plans never change, so diffs are memoized by the
+``(baseline, simulated)`` pair until the retention sweep deletes either plan.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.plan import Plan, PlanItem, PlanTerm
+from app.services.plan_documents import decode_plan_document
+from app.services.plans import materialize_plan_document
+
+CompactPlan = list[tuple[str, int, list[str]]]
+
+_diffs: OrderedDict[tuple[int, int], dict] = OrderedDict()
+_diffs_lock = threading.Lock()
+
+
+def load_compact_plan(db: Session, plan_id: int) -> tuple[str, CompactPlan] | None:
+    """``(status, terms)`` for a plan, or None if it does not exist."""
+    row = db.execute(
+        select(Plan.status, Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id)
+    ).first()
+    if row is None:
+        return None
+    if row.parent_plan_id is not None or row.document is not None:
+        blob = materialize_plan_document(db, plan_id) if row.parent_plan_id else row.document
+        document = decode_plan_document(blob)
+        return row.status, [
+            (t["term_name"], t["credits"] or 0, [i["course_code"] for i in t["items"]])
+            for t in document["terms"]
+        ]
+    terms: dict[int, tuple[str, int, list[str]]] = {}
+    for term_id, term_name, credits, course_code in db.execute(
+        select(PlanTerm.id, PlanTerm.term_name, PlanTerm.credits, PlanItem.course_code)
+        .outerjoin(PlanItem, PlanItem.term_id == PlanTerm.id)
+        .where(PlanTerm.plan_id == plan_id)
+        .order_by(PlanTerm.id, PlanItem.id)
+    ):
+        term = terms.setdefault(term_id, (term_name, credits or 0, []))
+        if course_code:
+            term[2].append(course_code)
+    return row.status, list(terms.values())
+
+
+def diff_plans(baseline: CompactPlan, simulated: CompactPlan) -> dict:
+    """Added, removed and moved courses plus per-term credit changes.
+
+    Terms are matched by name; the result lists them in schedule order, with
+    terms only one plan has merged in where they fall.
+    """
+    baseline_term = {code: name for name, _, codes in baseline for code in codes}
+    baseline_credits = {name: credits for name, credits, _ in baseline}
+    seen: set[str] = set()
+    added: dict[str, list[str]] = {}
+    moved = []
+    simulated_credits = {}
+    for name, credits, codes in simulated:
+        simulated_credits[name] = credits
+        for code in codes:
+            seen.add(code)
+            from_term = baseline_term.get(code)
+            if from_term is None:
+                added.setdefault(name, []).append(code)
+            elif from_term != name:
+                moved.append({"course_code": code, "from_term": from_term, "to_term": name})
+    removed: dict[str, list[str]] = {}
+    for name, _, codes in baseline:
+        for code in codes:
+            if code not in seen:
+                removed.setdefault(name, []).append(code)
+
+    terms = []
+    for name in _merge_term_order([t[0] for t in baseline], [t[0] for t in simulated]):
+        before = baseline_credits.get(name)
+        after = simulated_credits.get(name)
+        terms.append(
+            {
+                "term_name": name,
+                "baseline_credits": before,
+                "simulated_credits": after,
+                "credit_diff": (after or 0) - (before or 0),
+                "added_courses": added.get(name, []),
+                "removed_courses": removed.get(name, []),
+            }
+        )
+    return {
+        "term_count_diff": len(simulated) - len(baseline),
+        "added_courses": sorted(c for codes in added.values() for c in codes),
+        "removed_courses": sorted(c for codes in removed.values() for c in codes),
+        "moved_courses": moved,
+        "terms": terms,
+    }
+
+
+def _merge_term_order(baseline: list[str], simulated: list[str]) -> list[str]:
+    in_baseline = set(baseline)
+    merged, i = [], 0
+    for name in simulated:
+        if name in in_baseline:
+            # Baseline terms scheduled before this one come first
+            while i < len(baseline) and baseline[i] != name:
+                if baseline[i] not in merged:
+                    merged.append(baseline[i])
+                i += 1
+            i += 1
+        if name not in merged:
+            merged.append(name)
+    merged.extend(name for name in baseline[i:] if name not in merged)
+    return merged
+
+
+def compare_plans(db: Session, baseline_id: int, simulated_id: int) -> dict | None:
+    """Diff of two plans, or None if either is missing."""
+    key = (baseline_id, simulated_id)
+    with _diffs_lock:
+        if key in _diffs:
+            _diffs.move_to_end(key)
+            return _diffs[key]
+    baseline = load_compact_plan(db, baseline_id)
+    simulated = load_compact_plan(db, simulated_id)
+    if baseline is None or simulated is None:
+        return None
+    result = {
+        "baseline_plan_id": baseline_id,
+        "simulated_plan_id": simulated_id,
+        **diff_plans(baseline[1], simulated[1]),
+    }
+    if baseline[0] == simulated[0] == "complete":
+        with _diffs_lock:
+            _diffs[key] = result
+            while len(_diffs) > settings.plan_diff_cache_size:
+                _diffs.popitem(last=False)
+    return result
+
+
+def evict_plan_diffs(plan_ids) -> None:
+    plan_ids = set(plan_ids)
+    with _diffs_lock:
+        for key in [k for k in _diffs if k[0] in plan_ids or k[1] in plan_ids]:
+            del _diffs[key]
@@ -0,0 +1,189 @@
+"""Whole-plan documents: one gzip-compressed JSON blob per plan.
+
+With ``plan_storage="document"`` the planner writes the schedule, risks and
+the parameters it ran with into ``plans.document`` instead of plan_terms,
+plan_items and risks rows. Course titles and credits are resolved when the
+plan is written, so reads never consult the catalog.
+
+The document body is the ``GET /plans/{id}`` response itself (plus ``risks``
+and ``parameters``), so the stored gzip bytes can be sent as-is to clients
+that accept gzip. Term, item and risk ids inside a document are positions
+within the plan (1-based), not database keys.
+
+Simulated plans are stored as a delta against their baseline instead: only
+the terms that changed or were added, plus the new term count. Readers
+materialize the full document from the two (see services/plans.py).
+"""
+import gzip
+import json
+
+from app.schemas.plan_detail import PlanDetailResponse
+
+# gzip's default level; documents are a few KB and written on the request path.
+_GZIP_LEVEL = 6
+
+
+def build_plan_document(
+    plan_id: int,
+    student_id: int,
+    terms: list[dict],
+    course_details: dict[str, tuple[str | None, int | None]],
+    bottlenecks: list[str],
+    parameters: dict,
+) -> dict:
+    """Document for a scheduled plan; ``terms`` are scheduler dicts (term/credits/courses)."""
+    doc_terms = []
+    item_id = 0
+    for term_id, term in enumerate(terms, start=1):
+        items = []
+        for code in term["courses"]:
+            item_id += 1
+            title, credits = course_details.get(code, (None, None))
+            items.append(
+                {
+                    "id": item_id,
+                    "term_id": term_id,
+                    "course_code": code,
+                    "course_title": title,
+                    "credits": credits,
+                }
+            )
+        doc_terms.append(
+            {
+                "id": term_id,
+                "plan_id": plan_id,
+                "term_name": term["term"],
+                "credits": term["credits"],
+                "items": items,
+            }
+        )
+    return {
+        "id": plan_id,
+        "student_id": student_id,
+        "status": "complete",
+        "terms": doc_terms,
+        "risks": [
+            {"id": i, "plan_id": plan_id, "kind": "bottleneck", "message": message}
+            for i, message in enumerate(bottlenecks, start=1)
+        ],
+        "parameters": parameters,
+    }
+
+
+def encode_plan_document(document: dict) -> bytes:
+    body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    # mtime=0 keeps the bytes deterministic for identical plans
+    return gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+
+
+def decode_plan_document(blob: bytes) -> dict:
+    return json.loads(gzip.decompress(blob))
+
+
+def plan_document_view(blob: bytes) -> PlanDetailResponse:
+    """Attribute-style view of a stored document, shaped like a hydrated ``Plan``."""
+    return PlanDetailResponse.model_validate(decode_plan_document(blob))
+
+
+def _term_content(term: dict) -> tuple:
+    """A document term without its positional ids, for comparison."""
+    return (
+        term["term_name"],
+        term["credits"],
+        [(item["course_code"], item["course_title"], item["credits"]) for item in term["items"]],
+    )
+
+
+def _course_details(document: dict) -> dict[str, list]:
+    return {
+        item["course_code"]: [item["course_title"], item["credits"]]
+        for term in document["terms"]
+        for item in term["items"]
+    }
+
+
+def build_delta_document(parent_plan_id: int, parent: dict, child: dict) -> dict:
+    """Store ``child`` as the terms that differ from ``parent`` at the same position.
+
+    Terms past ``term_count`` are dropped from the parent; positions listed in
+    ``terms`` replace or extend it. Changed terms keep only course codes, with
+    titles and credits stored for courses the parent does not already carry.
+    """
+    parent_terms = [_term_content(t) for t in parent["terms"]]
+    parent_details = _course_details(parent)
+    child_details = _course_details(child)
+    changed = {}
+    for position, term in enumerate(child["terms"]):
+        if position >= len(parent_terms) or parent_terms[position] != _term_content(term):
+            changed[str(position)] = {
+                "term_name": term["term_name"],
+                "credits": term["credits"],
+                "courses": [item["course_code"] for item in term["items"]],
+            }
+    return {
+        "parent_plan_id": parent_plan_id,
+        "parent_term_count": len(parent_terms),
+        "term_count": len(child["terms"]),
+        "terms": changed,
+        "details": {
+            code: detail
+            for code, detail in child_details.items()
+            if parent_details.get(code) != detail
+        },
+        "risks": [{k: v for k, v in r.items() if k not in ("id", "plan_id")} for r in child["risks"]],
+        "parameters": child["parameters"],
+    }
+
+
+def apply_delta_document(plan_id: int, student_id: int, parent: dict, delta: dict) -> dict:
+    """The full document for a plan stored as ``delta`` against ``parent``."""
+    details = {**_course_details(parent), **delta["details"]}
+    terms = [
+        {
+            "term_name": t["term_name"],
+            "credits": t["credits"],
+            "courses": [item["course_code"] for item in t["items"]],
+        }
+        for t in parent["terms"][: delta["term_count"]]
+    ]
+    for position, term in sorted(delta["terms"].items(), key=lambda kv: int(kv[0])):
+        position = int(position)
+        if position < len(terms):
+            terms[position] = term
+        else:
+            terms.append(term)
+    doc_terms = []
+    item_id = 0
+    for term_id, term in enumerate(terms, start=1):
+        items = []
+        for code in term["courses"]:
+            item_id += 1
+            title, credits = details.get(code, (None, None))
+            items.append(
+                {
+                    "id": item_id,
+                    "term_id": term_id,
+                    "course_code": code,
+                    "course_title": title,
+                    "credits": credits,
+                }
+            )
+        doc_terms.append(
+            {
+                "id": term_id,
+                "plan_id": plan_id,
+                "term_name": term["term_name"],
+                "credits": term["credits"],
+                "items": items,
+            }
+        )
+    return {
+        "id": plan_id,
+        "student_id": student_id,
+        "status": "complete",
+        "terms": doc_terms,
+        "risks": [
+            {"id": i, "plan_id": plan_id, **risk} for i, risk in enumerate(delta["risks"], start=1)
+        ],
+        "parameters": delta["parameters"],
+    }
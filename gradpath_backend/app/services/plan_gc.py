@@ -0,0 +1,193 @@
+"""Retention for generated plans.
+
+Every generate and simulate call writes a plan. Simulations (``kind =
+"simulation"``) are what-if runs, and a baseline is marked ``superseded_at``
+as soon as a newer baseline is generated for the same student. A background
+thread deletes both once they are older than their retention period, along
+with their plan_terms, plan_items and risks rows.
+
+Plans are walked in id order (keyset, not OFFSET), ``plan_gc_batch_size`` at
+a time, one transaction per batch. A plan is never deleted while it is:
+
+- the student's latest plan of either kind, or latest baseline; or
+- the parent of a simulation that is itself still kept.
+
+Simulations are swept first, so a superseded baseline goes in the same run
+as the last of its simulations.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, exists, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.plan import Plan, PlanItem, PlanTerm
+from app.models.risk import Risk
+from app.services.plan_diff import evict_plan_diffs
+from app.services.plans import evict_plan_documents
+
+logger = logging.getLogger(__name__)
+
+
+def collect_plans(db: Session, now: datetime | None = None, batch_size: int | None = None) -> dict:
+    """Delete expired simulations and superseded baselines. Returns counts reclaimed."""
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.plan_gc_batch_size
+    counts = {"simulation": 0, "baseline": 0, "plan_terms": 0, "plan_items": 0, "risks": 0}
+    sweeps = (
+        (
+            "simulation",
+            and_(
+                Plan.kind == "simulation",
+                Plan.created_at
+                < now - timedelta(days=settings.plan_simulation_retention_days),
+            ),
+        ),
+        (
+            "baseline",
+            and_(
+                Plan.kind == "baseline",
+                Plan.superseded_at
+                < now - timedelta(days=settings.plan_superseded_retention_days),
+            ),
+        ),
+    )
+    for kind, expired in sweeps:
+        last_id = 0
+        while True:
+            ids = _expired_batch(db, expired, last_id, batch_size)
+            if not ids:
+                break
+            deleted = _delete_plans(db, ids)
+            db.commit()
+            evict_plan_documents(ids)
+            evict_plan_diffs(ids)
+            counts[kind] += deleted.pop("plans")
+            for table, count in deleted.items():
+                counts[table] += count
+            last_id = ids[-1]
+    return counts
+
+
+def _expired_batch(db: Session, expired, last_id: int, batch_size: int) -> list[int]:
+    newer = aliased(Plan)
+    child = aliased(Plan)
+    is_latest = ~exists().where(newer.student_id == Plan.student_id, newer.id > Plan.id)
+    is_latest_baseline = (Plan.kind == "baseline") & ~exists().where(
+        newer.student_id == Plan.student_id, newer.kind == "baseline", newer.id > Plan.id
+    )
+    is_parent = exists().where(child.parent_plan_id == Plan.id)
+    return db.scalars(
+        select(Plan.id)
+        .where(Plan.id > last_id, expired, ~is_latest, ~is_latest_baseline, ~is_parent)
+        .order_by(Plan.id)
+        .limit(batch_size)
+        # Rows locked here cannot gain a referencing simulation before commit
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def _delete_plans(db: Session, ids: list[int]) -> dict:
+    term_ids = select(PlanTerm.id).where(PlanTerm.plan_id.in_(ids))
+    return {
+        "plan_items": db.execute(delete(PlanItem).where(PlanItem.term_id.in_(term_ids))).rowcount,
+        "plan_terms": db.execute(delete(PlanTerm).where(PlanTerm.plan_id.in_(ids))).rowcount,
+        "risks": db.execute(delete(Risk).where(Risk.plan_id.in_(ids))).rowcount,
+        "plans": db.execute(delete(Plan).where(Plan.id.in_(ids))).rowcount,
+    }
+
+
+class _PlanGcWorker:
+    """Single background thread that runs ``collect_plans`` on an interval."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "runs": 0,
+            "failures": 0,
+            "simulation_plans_deleted": 0,
+            "baseline_plans_deleted": 0,
+            "plan_terms_deleted": 0,
+            "plan_items_deleted": 0,
+            "risks_deleted": 0,
+        }
+        self._last_run_at: datetime | None = None
+        self._last_run_seconds = 0.0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="plan-gc", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> dict:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            counts = collect_plans(db)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._counters["failures"] += 1
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._counters["runs"] += 1
+            self._counters["simulation_plans_deleted"] += counts["simulation"]
+            self._counters["baseline_plans_deleted"] += counts["baseline"]
+            for table in ("plan_terms", "plan_items", "risks"):
+                self._counters[f"{table}_deleted"] += counts[table]
+            self._last_run_at = datetime.utcnow()
+            self._last_run_seconds = time.perf_counter() - started
+        return counts
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.plan_gc_enabled,
+                **{f"{name}_total": value for name, value in self._counters.items()},
+                "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+                "last_run_seconds": round(self._last_run_seconds, 6),
+            }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # Counted in stats(); retried on the next interval
+                logger.exception(
+                    "Plan retention sweep failed; retrying in %.0fs",
+                    settings.plan_gc_interval_seconds,
+                )
+            self._stop.wait(settings.plan_gc_interval_seconds)
+
+
+_worker = _PlanGcWorker()
+
+
+def start_plan_gc_worker() -> None:
+    if settings.plan_gc_enabled:
+        _worker.start()
+
+
+def stop_plan_gc_worker() -> None:
+    _worker.stop()
+
+
+def run_plan_gc() -> dict:
+    """Run one retention sweep now, in the calling thread."""
+    return _worker.run_once()
+
+
+def gc_stats() -> dict:
+    return _worker.stats()
@@ -1,7 +1,15 @@
+import json
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Iterator
 
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import PLANS_GENERATED, timed, timed_iter
 from app.models.plan import Plan, PlanTerm, PlanItem
 from app.models.student import Student
 from app.models.course import Course
@@ -10,7 +18,22 @@ from app.models.prerequisite import Prerequisite
 from app.models.risk import Risk
 from app.schemas.plan import PlanGenerateRequest, PlanGenerateResponse, SemesterOut
 from app.services.graph import build_graph, topo_sort
-from app.services.scheduler import CourseOffering, schedule_terms
+from app.services.plan_documents import build_plan_document, encode_plan_document
+from app.services.scheduler import CourseOffering, iter_schedule_terms
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ComputedPlan:
+    """A schedule and everything needed to store it, before any plan row is written."""
+
+    terms: list[dict]
+    bottlenecks: list[str]
+    message: str
+    # course code -> (title, credits), resolved from the catalog at scheduling time
+    course_details: dict[str, tuple[str | None, int | None]] = field(default_factory=dict)
+    parameters: dict = field(default_factory=dict)
 
 
 def generate_plan(db: Session, payload: PlanGenerateRequest) -> PlanGenerateResponse:
@@ -18,6 +41,147 @@ def generate_plan(db: Session, payload: PlanGenerateRequest) -> PlanGenerateResp
     db.add(plan)
     db.commit()
     db.refresh(plan)
+
+    computed = compute_plan(db, payload)
+    _store_plan(db, plan, payload.student_id, computed)
+
+    return PlanGenerateResponse(
+        student_id=payload.student_id,
+        status="complete",
+        message=computed.message,
+        plan_id=plan.id,
+        semesters=[SemesterOut(**t) for t in computed.terms],
+        risk_summary=computed.bottlenecks,
+    )
+
+
+def generate_plan_stream(payload: PlanGenerateRequest, sse: bool = False) -> Iterator[str]:
+    """``generate_plan`` as a stream: each term as it is scheduled, then the rest.
+
+    Events are ``term`` (a ``SemesterOut``), ``bottlenecks`` (``risk_summary``)
+    and ``complete`` (the response without semesters or risks, with
+    ``plan_id``); ``error`` replaces whatever remains if generation fails.
+    Written as NDJSON lines (``{"event": ..., "data": ...}``) or, with
+    ``sse``, as server-sent events. The plan row is only written once every
+    term is out, so an abandoned stream leaves nothing behind.
+    """
+
+    def frame(event: str, data: dict) -> str:
+        if sse:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"event": event, "data": data}) + "\n"
+
+    db = SessionLocal()
+    try:
+        computed = ComputedPlan(terms=[], bottlenecks=[], message="")
+        for term in iter_plan_terms(db, payload, computed):
+            yield frame("term", SemesterOut(**term).model_dump())
+
+        plan = Plan(student_id=payload.student_id, status="queued")
+        db.add(plan)
+        db.commit()
+        db.refresh(plan)
+        _store_plan(db, plan, payload.student_id, computed)
+
+        yield frame("bottlenecks", {"risk_summary": computed.bottlenecks})
+        yield frame(
+            "complete",
+            PlanGenerateResponse(
+                student_id=payload.student_id,
+                status="complete",
+                message=computed.message,
+                plan_id=plan.id,
+            ).model_dump(exclude={"semesters", "risk_summary"}),
+        )
+    except Exception:
+        db.rollback()
+        logger.exception("Streamed plan generation failed for student %s", payload.student_id)
+        yield frame("error", {"detail": "Plan generation failed."})
+    finally:
+        db.close()
+
+
+@timed("plan_persist")
+def _store_plan(db: Session, plan: Plan, student_id: int, computed: ComputedPlan) -> None:
+    """Write a computed schedule into a queued plan row and mark it complete."""
+    if settings.plan_storage == "document":
+        plan.document = encode_plan_document(
+            build_plan_document(
+                plan.id,
+                student_id,
+                computed.terms,
+                computed.course_details,
+                computed.bottlenecks,
+                computed.parameters,
+            )
+        )
+    else:
+        # One statement per table rather than one per row
+        term_ids = []
+        if computed.terms:
+            term_ids = db.scalars(
+                insert(PlanTerm).returning(PlanTerm.id, sort_by_parameter_order=True),
+                [
+                    {"plan_id": plan.id, "term_name": term["term"], "credits": term["credits"]}
+                    for term in computed.terms
+                ],
+            ).all()
+        items = []
+        for term_id, term in zip(term_ids, computed.terms):
+            for course_code in term["courses"]:
+                title, credits = computed.course_details.get(course_code, (None, None))
+                items.append(
+                    {
+                        "term_id": term_id,
+                        "course_code": course_code,
+                        "course_title": title,
+                        "credits": credits,
+                    }
+                )
+        if items:
+            db.execute(insert(PlanItem), items)
+        if computed.bottlenecks:
+            db.execute(
+                insert(Risk),
+                [
+                    {"plan_id": plan.id, "kind": "bottleneck", "message": message}
+                    for message in computed.bottlenecks
+                ],
+            )
+        db.commit()
+
+    plan.status = "complete"
+    # Earlier baselines now only count down their retention (services/plan_gc.py)
+    db.execute(
+        update(Plan)
+        .where(
+            Plan.student_id == student_id,
+            Plan.kind == "baseline",
+            Plan.id < plan.id,
+            Plan.superseded_at.is_(None),
+        )
+        .values(superseded_at=datetime.utcnow())
+    )
+    db.commit()
+    PLANS_GENERATED.inc(settings.plan_storage)
+
+
+def compute_plan(db: Session, payload: PlanGenerateRequest) -> ComputedPlan:
+    """Schedule the student's remaining courses without writing anything."""
+    computed = ComputedPlan(terms=[], bottlenecks=[], message="")
+    for _ in iter_plan_terms(db, payload, computed):
+        pass
+    return computed
+
+
+def iter_plan_terms(
+    db: Session, payload: PlanGenerateRequest, computed: ComputedPlan
+) -> Iterator[dict]:
+    """Yield scheduled terms as they are filled, recording everything else on ``computed``.
+
+    ``computed`` is complete (terms, bottlenecks, message, details and
+    parameters) once the iterator is exhausted.
+    """
     student = db.get(Student, payload.student_id)
     # Per-request overrides take precedence over stored student preferences
     max_credits = payload.max_credits if payload.max_credits is not None else (student.max_credits if student else 15)
@@ -47,7 +211,9 @@ def generate_plan(db: Session, payload: PlanGenerateRequest) -> PlanGenerateResp
     }
 
     offerings: dict[str, CourseOffering] = {}
+    titles: dict[str, str | None] = {}
     for course in db.query(Course).all():
+        titles[course.code] = course.title
         availability = {"Fall", "Spring", "Summer"}
         if course.availability:
             availability = {s.strip() for s in course.availability.split(",")}
@@ -81,18 +247,22 @@ def generate_plan(db: Session, payload: PlanGenerateRequest) -> PlanGenerateResp
         tgt = _parse_term_label(student.target_grad_term)
         _start_parsed = _parse_term_label(f"{_start_term} {_start_year}")
         if tgt and _start_parsed and (_start_parsed[1], _start_parsed[2]) > (tgt[1], tgt[2]):
-            plan.status = "complete"
-            db.commit()
-            return PlanGenerateResponse(
-                student_id=payload.student_id,
-                status="complete",
-                message="Student completes degree in current semester.",
-                plan_id=plan.id,
-                semesters=[],
-                risk_summary=[],
-            )
+            computed.message = "Student completes degree in current semester."
+            return
 
-    schedule = schedule_terms(
+    # Titles and credits are resolved from the catalog loaded above
+    computed.course_details = {
+        code: (titles.get(code), offering.credits) for code, offering in offerings.items()
+    }
+    computed.parameters = {
+        "max_credits": max_credits,
+        "summer_ok": allow_summer,
+        "honors": honors_flag,
+        "start_term": f"{_start_term} {_start_year}",
+        # Counted before scheduling adds the planned courses to the set
+        "completed_courses": len(completed_courses),
+    }
+    terms = iter_schedule_terms(
         ordered_courses=ordered_courses,
         offerings=offerings,
         prereqs=prereq_map,
@@ -104,45 +274,16 @@ def generate_plan(db: Session, payload: PlanGenerateRequest) -> PlanGenerateResp
         honors_only=honors_flag,
         start_year=_start_year,
         start_term=_start_term,
+        bottlenecks=computed.bottlenecks,
     )
+    # Only time spent scheduling counts, not a stream consumer's writes between terms
+    for term in timed_iter("schedule_terms", terms):
+        computed.terms.append(term)
+        yield term
 
-    for term in schedule.terms:
-        term_row = PlanTerm(
-            plan_id=plan.id,
-            term_name=term["term"],
-            credits=term["credits"],
-        )
-        db.add(term_row)
-        db.flush()
-        for course_code in term["courses"]:
-            co = offerings.get(course_code)
-            course_obj = db.query(Course).filter(Course.code == course_code).first()
-            db.add(PlanItem(
-                term_id=term_row.id,
-                course_code=course_code,
-                course_title=course_obj.title if course_obj else None,
-                credits=co.credits if co else (course_obj.credits if course_obj else None),
-            ))
-    db.commit()
-
-    message = "Plan generated successfully."
-    if schedule.bottlenecks:
-        message = f"Plan generated with {len(schedule.bottlenecks)} warning(s)."
-        for item in schedule.bottlenecks:
-            db.add(Risk(plan_id=plan.id, kind="bottleneck", message=item))
-        db.commit()
-
-    plan.status = "complete"
-    db.commit()
-
-    return PlanGenerateResponse(
-        student_id=payload.student_id,
-        status="complete",
-        message=message,
-        plan_id=plan.id,
-        semesters=[SemesterOut(**t) for t in schedule.terms],
-        risk_summary=schedule.bottlenecks,
-    )
+    computed.message = "Plan generated successfully."
+    if computed.bottlenecks:
+        computed.message = f"Plan generated with {len(computed.bottlenecks)} warning(s)."
 
 
 def _infer_start_term(db: Session, student_ids: list[int]) -> tuple[str | None, int | None]:
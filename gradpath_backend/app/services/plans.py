@@ -1,71 +1,176 @@
-from sqlalchemy.orm import Session, joinedload
+import threading
+from collections import OrderedDict
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer
+
+from app.core.config import settings
 from app.models.plan import Plan, PlanTerm, PlanItem
 from app.models.course import Course
 from app.models.risk import Risk
+from app.schemas.plan_detail import PlanDetailResponse
+from app.schemas.risk import RiskResponse
+from app.services.plan_documents import (
+    apply_delta_document,
+    decode_plan_document,
+    encode_plan_document,
+    plan_document_view,
+)
+
+# Materialized documents of delta-stored (simulated) plans, by plan id. Plans
+# never change once complete, so entries are only evicted for space or when
+# the retention sweep deletes the plan.
+_materialized: OrderedDict[int, bytes] = OrderedDict()
+_materialized_lock = threading.Lock()
 
 
-def get_plan(db: Session, plan_id: int) -> Plan | None:
+def get_plan(db: Session, plan_id: int) -> Plan | PlanDetailResponse | None:
+    """The plan with its terms and items; document-stored plans come back as a view."""
     plan = (
         db.query(Plan)
-        .options(joinedload(Plan.terms).joinedload(PlanTerm.items))
+        .options(undefer(Plan.document), joinedload(Plan.terms).joinedload(PlanTerm.items))
         .filter(Plan.id == plan_id)
         .first()
     )
     if plan is None:
         return None
+    if plan.parent_plan_id is not None:
+        return plan_document_view(materialize_plan_document(db, plan.id))
+    if plan.document is not None:
+        return plan_document_view(plan.document)
+
+    codes = _codes_missing_details(plan)
+    if codes:
+        _apply_course_details(
+            plan, db.query(Course).filter(Course.code.in_(codes)).all()
+        )
+    return plan
+
+
+async def get_plan_async(db: AsyncSession, plan_id: int) -> Plan | PlanDetailResponse | None:
+    plan = await db.scalar(
+        select(Plan)
+        .options(undefer(Plan.document), selectinload(Plan.terms).selectinload(PlanTerm.items))
+        .where(Plan.id == plan_id)
+    )
+    if plan is None:
+        return None
+    if plan.parent_plan_id is not None:
+        return plan_document_view(await db.run_sync(materialize_plan_document, plan.id))
+    if plan.document is not None:
+        return plan_document_view(plan.document)
+    codes = _codes_missing_details(plan)
+    if codes:
+        _apply_course_details(
+            plan, (await db.scalars(select(Course).where(Course.code.in_(codes)))).all()
+        )
+    return plan
+
 
-    # Collect all course codes that need enrichment
-    all_codes = {
+def _codes_missing_details(plan: Plan) -> set[str]:
+    """Course codes of plan items that still need a title or credits from the catalog."""
+    return {
         item.course_code
         for term in plan.terms
         for item in term.items
         if item.course_code and (not item.course_title or item.credits is None)
     }
-    if all_codes:
-        course_map = {
-            c.code: c
-            for c in db.query(Course).filter(Course.code.in_(all_codes)).all()
-        }
-        for term in plan.terms:
-            for item in term.items:
-                if item.course_code in course_map:
-                    c = course_map[item.course_code]
-                    if not item.course_title and c.title:
-                        item.course_title = c.title
-                    if item.credits is None and c.credits:
-                        item.credits = c.credits
 
-    return plan
 
+def _apply_course_details(plan: Plan, courses) -> None:
+    course_map = {c.code: c for c in courses}
+    for term in plan.terms:
+        for item in term.items:
+            if item.course_code in course_map:
+                c = course_map[item.course_code]
+                if not item.course_title and c.title:
+                    item.course_title = c.title
+                if item.credits is None and c.credits:
+                    item.credits = c.credits
 
-def get_plan_risks(db: Session, plan_id: int) -> list[Risk]:
-    return db.query(Risk).filter(Risk.plan_id == plan_id).all()
 
+async def get_stored_plan_async(db: AsyncSession, plan_id: int):
+    """``(status, document, parent_plan_id)`` in one primary-key fetch, or None if missing."""
+    return (
+        await db.execute(
+            select(Plan.status, Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id)
+        )
+    ).first()
 
-def compare_plans(db: Session, baseline_id: int, simulated_id: int):
-    baseline = get_plan(db, baseline_id)
-    simulated = get_plan(db, simulated_id)
-    if baseline is None or simulated is None:
+
+def load_plan_document(db: Session, plan_id: int) -> dict | None:
+    """The full document for a plan, whichever way it is stored."""
+    row = db.execute(
+        select(Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id)
+    ).first()
+    if row is None:
         return None
+    if row.parent_plan_id is not None:
+        return decode_plan_document(materialize_plan_document(db, plan_id))
+    if row.document is not None:
+        return decode_plan_document(row.document)
+    document = PlanDetailResponse.model_validate(get_plan(db, plan_id)).model_dump()
+    document["risks"] = [
+        RiskResponse.model_validate(r).model_dump() for r in get_plan_risks(db, plan_id)
+    ]
+    return document
 
-    baseline_courses = {
-        item.course_code
-        for term in baseline.terms
-        for item in term.items
-        if item.course_code
-    }
-    simulated_courses = {
-        item.course_code
-        for term in simulated.terms
-        for item in term.items
-        if item.course_code
-    }
 
-    return {
-        "baseline_plan_id": baseline_id,
-        "simulated_plan_id": simulated_id,
-        "term_count_diff": len(simulated.terms) - len(baseline.terms),
-        "added_courses": sorted(simulated_courses - baseline_courses),
-        "removed_courses": sorted(baseline_courses - simulated_courses),
-    }
+def materialize_plan_document(db: Session, plan_id: int) -> bytes | None:
+    """Encoded full document of a delta-stored plan, cached after the first build."""
+    with _materialized_lock:
+        if plan_id in _materialized:
+            _materialized.move_to_end(plan_id)
+            return _materialized[plan_id]
+    row = db.execute(
+        select(Plan.student_id, Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id)
+    ).first()
+    if row is None:
+        return None
+    if row.parent_plan_id is None:
+        return row.document
+    parent = load_plan_document(db, row.parent_plan_id)
+    blob = encode_plan_document(
+        apply_delta_document(plan_id, row.student_id, parent, decode_plan_document(row.document))
+    )
+    cache_plan_document(plan_id, blob)
+    return blob
+
+
+def cache_plan_document(plan_id: int, blob: bytes) -> None:
+    with _materialized_lock:
+        _materialized[plan_id] = blob
+        _materialized.move_to_end(plan_id)
+        while len(_materialized) > settings.plan_cache_size:
+            _materialized.popitem(last=False)
+
+
+def evict_plan_documents(plan_ids) -> None:
+    with _materialized_lock:
+        for plan_id in plan_ids:
+            _materialized.pop(plan_id, None)
+
+
+def get_plan_risks(db: Session, plan_id: int) -> list[Risk] | list[dict]:
+    stored = db.execute(
+        select(Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id)
+    ).first()
+    if stored is not None and stored.parent_plan_id is not None:
+        return decode_plan_document(materialize_plan_document(db, plan_id))["risks"]
+    if stored is not None and stored.document is not None:
+        return decode_plan_document(stored.document)["risks"]
+    return db.query(Risk).filter(Risk.plan_id == plan_id).all()
+
+
+async def get_plan_risks_async(db: AsyncSession, plan_id: int) -> list[Risk] | list[dict]:
+    stored = (
+        await db.execute(select(Plan.document, Plan.parent_plan_id).where(Plan.id == plan_id))
+    ).first()
+    if stored is not None and stored.parent_plan_id is not None:
+        document = await db.run_sync(materialize_plan_document, plan_id)
+        return decode_plan_document(document)["risks"]
+    if stored is not None and stored.document is not None:
+        return decode_plan_document(stored.document)["risks"]
+    return (await db.scalars(select(Risk).where(Risk.plan_id == plan_id))).all()
+
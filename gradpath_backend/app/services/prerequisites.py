@@ -1,15 +1,12 @@
 from sqlalchemy.orm import Session
 
-from app.models.prerequisite import Prerequisite
-from app.schemas.prerequisite import PrerequisiteCreate
+from app.schemas.prerequisite import PrerequisiteCreate, PrerequisiteResponse
+from app.services.upsert import upsert_prereqs_returning
 
 
 def bulk_create_prereqs(
     db: Session, prereqs: list[PrerequisiteCreate]
-) -> list[Prerequisite]:
-    items = [Prerequisite(**item.model_dump()) for item in prereqs]
-    db.add_all(items)
+) -> list[PrerequisiteResponse]:
+    rows = upsert_prereqs_returning(db, (item.model_dump() for item in prereqs))
     db.commit()
-    for item in items:
-        db.refresh(item)
-    return items
+    return [PrerequisiteResponse.model_validate(row._mapping) for row in rows]
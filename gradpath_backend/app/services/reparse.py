@@ -0,0 +1,217 @@
+"""Background re-parsing of stored documents.
+
+Read endpoints only ever fetch persisted parse results. This worker keeps
+those results current: after a PARSER_VERSION bump (or for rows uploaded
+before parse results were persisted) it finds every content hash without a
+current-version result and re-parses them in parallel worker processes.
+It also moves legacy inline and uncompressed text into the compressed store.
+"""
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import and_, exists, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.document import DocumentUpload
+from app.models.extraction import ExtractedText, ParsedContent
+from app.models.transcript import Transcript
+from app.services.ingest import DOCUMENT_PARSERS
+from app.services.extraction_cache import load_texts, store_parsed, store_text
+from app.services.transcript_parser import PARSER_VERSION, PARSERS
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_job(job: tuple[str, str, str]) -> tuple[str, str, list[dict]]:
+    digest, parser, text = job
+    return digest, parser, PARSERS[parser]([text])
+
+
+def adopt_inline_text(db: Session, batch_size: int) -> int:
+    """Move raw_text stored inline on legacy rows into the content-addressed store.
+
+    Legacy rows have no upload bytes to hash, so they are keyed by the SHA-256
+    of the text itself.
+    """
+    adopted = 0
+    for model in (Transcript, DocumentUpload):
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(model.id, model.raw_text)
+                .where(
+                    model.id > last_id,
+                    model.content_sha256.is_(None),
+                    model.raw_text.isnot(None),
+                    model.raw_text != "",
+                )
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                digest = hashlib.sha256(row.raw_text.encode("utf-8")).hexdigest()
+                store_text(db, digest, row.raw_text)
+                db.execute(
+                    update(model)
+                    .where(model.id == row.id)
+                    .values(content_sha256=digest, raw_text=None)
+                )
+            db.commit()
+            adopted += len(rows)
+            last_id = rows[-1].id
+    return adopted
+
+
+def compress_legacy_text(db: Session, batch_size: int) -> int:
+    """Rewrite uncompressed ExtractedText rows into the compressed column."""
+    compressed = 0
+    while True:
+        rows = db.execute(
+            select(ExtractedText.content_sha256, ExtractedText.text)
+            .where(ExtractedText.text.isnot(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            db.execute(
+                update(ExtractedText)
+                .where(ExtractedText.content_sha256 == row.content_sha256)
+                .values(compressed_text=row.text, text=None)
+            )
+        db.commit()
+        compressed += len(rows)
+    return compressed
+
+
+def find_stale(db: Session, limit: int) -> list[tuple[str, str]]:
+    """(content hash, parser) pairs in use that lack a current-version result."""
+
+    def missing_current(digest_col, parser: str):
+        return ~exists().where(
+            ParsedContent.content_sha256 == digest_col,
+            ParsedContent.parser == parser,
+            ParsedContent.parser_version == PARSER_VERSION,
+        )
+
+    pairs: list[tuple[str, str]] = []
+    sources = [(Transcript.content_sha256, "transcript", None)]
+    for parser in sorted(set(DOCUMENT_PARSERS.values())):
+        kinds = [kind for kind, p in DOCUMENT_PARSERS.items() if p == parser]
+        sources.append((DocumentUpload.content_sha256, parser, DocumentUpload.kind.in_(kinds)))
+
+    for digest_col, parser, kind_filter in sources:
+        conditions = [
+            digest_col.isnot(None),
+            exists().where(ExtractedText.content_sha256 == digest_col),
+            missing_current(digest_col, parser),
+        ]
+        if kind_filter is not None:
+            conditions.append(kind_filter)
+        digests = db.scalars(
+            select(digest_col).where(and_(*conditions)).distinct().limit(limit - len(pairs))
+        ).all()
+        pairs.extend((digest, parser) for digest in digests)
+        if len(pairs) >= limit:
+            break
+    return pairs
+
+
+def reparse_stale(batch_size: int | None = None, workers: int | None = None) -> dict:
+    """Bring every stored parse result up to PARSER_VERSION. Safe to re-run."""
+    batch_size = batch_size or settings.reparse_batch_size
+    workers = workers or settings.reparse_workers
+    counts = {"compressed": 0, "adopted": 0, "reparsed": 0}
+    db = SessionLocal()
+    executor = None
+    try:
+        counts["compressed"] = compress_legacy_text(db, batch_size)
+        counts["adopted"] = adopt_inline_text(db, batch_size)
+        while True:
+            pairs = find_stale(db, batch_size)
+            if not pairs:
+                break
+            texts = load_texts(db, {digest for digest, _ in pairs})
+            jobs = [(digest, parser, texts[digest]) for digest, parser in pairs]
+            if executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            for digest, parser, payload in executor.map(_parse_job, jobs, chunksize=8):
+                store_parsed(db, digest, parser, payload)
+            db.commit()
+            counts["reparsed"] += len(jobs)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        db.close()
+    return counts
+
+
+class _ReparseWorker:
+    """Single background thread that runs ``reparse_stale`` on request."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reparse", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def request(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                reparse_stale()
+                failures = 0
+            except Exception:
+                # Reads keep serving stored results; retry after a growing delay
+                # so a persistent error is neither silent nor retried in a loop.
+                failures += 1
+                delay = min(
+                    settings.reparse_retry_seconds * 2 ** (failures - 1),
+                    settings.reparse_retry_max_seconds,
+                )
+                logger.exception(
+                    "Re-parse run failed (%d in a row); retrying in %.1fs", failures, delay
+                )
+                self._stop.wait(delay)
+                self._wake.set()
+
+
+_worker = _ReparseWorker()
+
+
+def start_reparse_worker() -> None:
+    _worker.start()
+
+
+def request_reparse() -> None:
+    """Ask the background worker to refresh stale or missing parse results."""
+    _worker.request()
+
+
+def stop_reparse_worker() -> None:
+    _worker.stop()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Iterator
 
 
 @dataclass
@@ -28,8 +29,42 @@ def schedule_terms(
     start_year: int | None = None,
     start_term: str | None = None,
 ) -> ScheduleResult:
-    terms = []
-    bottlenecks = []
+    bottlenecks: list[str] = []
+    terms = list(
+        iter_schedule_terms(
+            ordered_courses,
+            offerings,
+            prereqs,
+            coreqs,
+            optional_prereqs,
+            completed,
+            max_credits,
+            allow_summer,
+            honors_only,
+            start_year,
+            start_term,
+            bottlenecks=bottlenecks,
+        )
+    )
+    return ScheduleResult(terms=terms, bottlenecks=bottlenecks)
+
+
+def iter_schedule_terms(
+    ordered_courses: list[str],
+    offerings: dict[str, CourseOffering],
+    prereqs: dict[str, set[str]],
+    coreqs: dict[str, set[str]],
+    optional_prereqs: dict[str, set[str]],
+    completed: set[str],
+    max_credits: int,
+    allow_summer: bool,
+    honors_only: bool,
+    start_year: int | None = None,
+    start_term: str | None = None,
+    *,
+    bottlenecks: list[str],
+) -> Iterator[dict]:
+    """Yield each term as soon as it is filled; warnings are appended to ``bottlenecks``."""
     queue = [c for c in ordered_courses if c not in completed]
 
     term_names = ["Spring", "Fall"]
@@ -82,17 +117,13 @@ def schedule_terms(
 
             queue = remaining
             if current:
-                terms.append(
-                    {
-                        "term": f"{term} {year}",
-                        "courses": current,
-                        "credits": credits,
-                    }
-                )
+                yield {
+                    "term": f"{term} {year}",
+                    "courses": current,
+                    "credits": credits,
+                }
             if term == "Fall":
                 year += 1
         if year > max_year:
             bottlenecks.append("Scheduling exceeded 6 years")
             break
-
-    return ScheduleResult(terms=terms, bottlenecks=bottlenecks)
@@ -1,8 +1,11 @@
 from datetime import datetime
 
 from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.models.plan import Plan
 from app.models.student import Student
 from app.models.transcript import Transcript, TranscriptCourse
 from app.schemas.student import StudentCreateRequest, StudentUpdateRequest
@@ -57,6 +60,47 @@ def get_student(db: Session, student_id: int) -> Student:
     return student
 
 
+async def get_student_async(db: AsyncSession, student_id: int) -> Student:
+    student = await db.get(Student, student_id)
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found.")
+    return student
+
+
+async def lookup_student_async(db: AsyncSession, school_student_id: str) -> dict:
+    """Resolve a school-issued ID to the record with the most transcript courses (lowest id on ties)."""
+    course_count = (
+        select(func.count(TranscriptCourse.id))
+        .join(Transcript, TranscriptCourse.transcript_id == Transcript.id)
+        .where(Transcript.student_id == Student.id)
+        .scalar_subquery()
+    )
+    latest_plan_id = (
+        select(func.max(Plan.id))
+        .where(Plan.student_id == Student.id, Plan.kind == "baseline")
+        .scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            select(Student, latest_plan_id.label("plan_id"))
+            .where(Student.student_id == school_student_id)
+            .order_by(course_count.desc(), Student.id)
+            .limit(1)
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="No student found with that student ID.")
+    best = row.Student
+    return {
+        "db_id": best.id,
+        "first_name": best.first_name,
+        "last_name": best.last_name,
+        "major": best.major,
+        "school": best.school,
+        "plan_id": row.plan_id,
+    }
+
+
 def update_student(db: Session, student_id: int, payload: StudentUpdateRequest) -> Student:
     student = db.get(Student, student_id)
     if student is None:
@@ -85,9 +129,29 @@ def calculate_gpa(db: Session, student_id: int) -> tuple[float | None, int]:
         .filter(TranscriptCourse.transcript_id == latest.id)
         .all()
     )
-    if not courses:
-        return None, 0
+    return gpa_from_courses(courses)
+
+
+async def calculate_gpa_async(db: AsyncSession, student_id: int) -> tuple[float | None, int]:
+    latest_id = (
+        select(Transcript.id)
+        .where(Transcript.student_id == student_id)
+        .order_by(Transcript.uploaded_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    courses = (
+        await db.execute(
+            select(TranscriptCourse.credits, TranscriptCourse.grade).where(
+                TranscriptCourse.transcript_id == latest_id
+            )
+        )
+    ).all()
+    return gpa_from_courses(courses)
+
 
+def gpa_from_courses(courses) -> tuple[float | None, int]:
+    """GPA and graded credits over already-loaded transcript course rows."""
     total_points = 0.0
     total_credits = 0
     for course in courses:
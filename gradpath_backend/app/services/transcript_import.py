@@ -0,0 +1,416 @@
+"""Bulk import of transcript archives.
+
+A registrar's zip holds transcript PDFs/CSVs plus a ``manifest.csv`` mapping
+each file to a student (``filename,student_id``). The archive is read entry
+by entry from its spooled upload file, PDFs are extracted and parsed in a
+dedicated process pool, and Transcript/TranscriptCourse rows are inserted in
+batches, each batch committed together with its per-file results.
+
+Imports are keyed by the archive's SHA-256: submitting the same archive
+again resumes it, skipping files that were already imported and retrying
+the ones that failed or never ran.
+"""
+import csv
+import hashlib
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from io import TextIOWrapper
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import UPLOADS, record_parse_confidence
+from app.models.student import Student
+from app.models.transcript import Transcript, TranscriptCourse
+from app.models.transcript_import import TranscriptImport, TranscriptImportEntry
+from app.services.extraction_cache import (
+    content_sha256,
+    get_persisted_parse,
+    store_parsed,
+    store_text,
+)
+from app.services.pdf_pool import PdfExtractionPool, extract_and_parse_in_pool
+from app.services.transcript_parser import parse_transcript_csv, transcript_rows
+from app.services.upsert import dialect_insert, upsert_courses
+
+_MANIFEST_NAME = "manifest.csv"
+# Same per-file cap as a single /transcripts/upload
+_MAX_ENTRY_BYTES = 20 * 1024 * 1024
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def import_transcript_archive(
+    db: Session,
+    archive: BinaryIO,
+    filename: str | None = None,
+    manifest: BinaryIO | None = None,
+) -> dict:
+    """Import (or resume importing) a zip of transcripts. Returns the per-file report.
+
+    ``manifest`` overrides a ``manifest.csv`` inside the archive.
+    """
+    job = _get_or_create_job(db, _hash_stream(archive), filename)
+    try:
+        results = _import_entries(db, job, archive, manifest)
+    except Exception:
+        # Never leave the job "running"; submitting the archive again resumes it
+        db.rollback()
+        job.status = "failed"
+        db.commit()
+        raise
+    failed = sum(1 for r in results if r["status"] == "failed")
+    job.status = "partial" if failed else "complete"
+    db.commit()
+    return _report(job, results)
+
+
+def _import_entries(
+    db: Session, job: TranscriptImport, archive: BinaryIO, manifest: BinaryIO | None
+) -> list[dict]:
+    try:
+        zf = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=422, detail="Upload is not a valid zip archive.")
+
+    with zf:
+        if manifest is None:
+            name = next(
+                (n for n in zf.namelist() if n.lower() == _MANIFEST_NAME), None
+            )
+            if name is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Archive has no {_MANIFEST_NAME} mapping files to student ids.",
+                )
+            with zf.open(name) as fh:
+                students = _read_manifest(fh)
+        else:
+            students = _read_manifest(manifest)
+
+        done = {
+            e.filename: e
+            for e in db.scalars(
+                select(TranscriptImportEntry).where(
+                    TranscriptImportEntry.import_id == job.id,
+                    TranscriptImportEntry.status == "imported",
+                )
+            )
+        }
+        known_students = set(
+            db.scalars(select(Student.id).where(Student.id.in_(set(students.values()))))
+        )
+
+        results: dict[str, dict] = {}
+        pending: list[tuple[zipfile.ZipInfo, int]] = []
+        in_archive = set()
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.lower() == _MANIFEST_NAME or name.startswith("__MACOSX/"):
+                continue
+            in_archive.add(name)
+            student_id = students.get(name)
+            if name in done:
+                results[name] = _result_from_entry(done[name], "skipped")
+            elif student_id is None:
+                results[name] = _failed(name, None, "Not listed in manifest.")
+            elif student_id not in known_students:
+                results[name] = _failed(name, student_id, f"Student {student_id} not found.")
+            elif info.file_size > _MAX_ENTRY_BYTES:
+                results[name] = _failed(name, student_id, "File exceeds 20 MB limit.")
+            elif not name.lower().endswith((".pdf", ".csv")):
+                results[name] = _failed(name, student_id, "Unsupported file type; expected .pdf or .csv.")
+            else:
+                results[name] = None  # keeps the report in archive order
+                pending.append((info, student_id))
+        for name, student_id in students.items():
+            if name not in in_archive and name not in done:
+                results[name] = _failed(name, student_id, "Missing from archive.")
+
+        _record_entries(
+            db, job.id, [r for r in results.values() if r and r["status"] == "failed"]
+        )
+        db.commit()
+
+        for result in _process(db, zf, job.id, pending):
+            results[result["filename"]] = result
+    return list(results.values())
+
+
+def get_import_report(db: Session, import_id: int) -> dict:
+    job = db.get(TranscriptImport, import_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found.")
+    entries = db.scalars(
+        select(TranscriptImportEntry)
+        .where(TranscriptImportEntry.import_id == import_id)
+        .order_by(TranscriptImportEntry.id)
+    )
+    return _report(job, [_result_from_entry(e, e.status) for e in entries])
+
+
+def _process(db: Session, zf: zipfile.ZipFile, import_id: int, pending):
+    """Parse pending entries with bounded look-ahead, flushing results in batches."""
+    workers = max(settings.import_workers, 1)
+    pool = None
+    if settings.pdf_pool_enabled:
+        pool = PdfExtractionPool(
+            workers=workers,
+            max_queue=workers * 2,
+            job_timeout=settings.pdf_job_timeout_seconds,
+            max_pages=settings.pdf_max_pages,
+            memory_mb=settings.pdf_worker_memory_mb,
+            max_jobs_per_worker=settings.pdf_worker_max_jobs,
+        )
+
+    def extract(data: bytes) -> tuple[str, list[dict]]:
+        if pool is None:
+            return extract_and_parse_in_pool(data, "transcript")
+        text, rows, _ = pool.run(data, parser="transcript")
+        return text, rows or []
+
+    batch: list[dict] = []
+    in_flight: deque[tuple[dict, Future]] = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            for info, student_id in pending:
+                item, future = _start_entry(db, zf, info, student_id, extract, threads)
+                in_flight.append((item, future))
+                # Hold at most a couple of entries per worker in memory
+                while len(in_flight) > workers * 2:
+                    batch.append(_finish_entry(*in_flight.popleft()))
+                    if len(batch) >= settings.import_batch_files:
+                        yield from _flush(db, import_id, batch)
+                        batch = []
+            while in_flight:
+                batch.append(_finish_entry(*in_flight.popleft()))
+                if len(batch) >= settings.import_batch_files:
+                    yield from _flush(db, import_id, batch)
+                    batch = []
+        if batch:
+            yield from _flush(db, import_id, batch)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _start_entry(db, zf, info, student_id, extract, threads) -> tuple[dict, Future]:
+    item = {
+        "filename": info.filename,
+        "student_id": student_id,
+        "digest": None,
+        "is_pdf": info.filename.lower().endswith(".pdf"),
+        "text": None,
+        "rows": None,
+    }
+    try:
+        data = zf.read(info)
+        if not item["is_pdf"]:
+            courses = parse_transcript_csv(data.decode("utf-8", errors="ignore"))
+    except Exception as exc:  # corrupt member (bad CRC, truncated) or unparsable CSV
+        return item, _raised(exc)  # reported by _finish_entry like any per-file failure
+    item["digest"] = content_sha256(data)
+    if item["is_pdf"]:
+        rows, current = get_persisted_parse(db, item["digest"], "transcript")
+        if current:
+            return item, _done((None, rows))  # text and parse already stored
+        return item, threads.submit(extract, data)
+    return item, _done((None, transcript_rows(courses)))
+
+
+def _finish_entry(item: dict, future: Future) -> dict:
+    try:
+        item["text"], item["rows"] = future.result()
+    except HTTPException as exc:
+        if exc.status_code == 503:
+            # The extraction pool failed or was saturated, not the file
+            item["error"] = (
+                "PDF extraction was unavailable on the server; "
+                "submit the archive again to retry this file."
+            )
+        else:
+            item["error"] = exc.detail
+    except Exception as exc:  # a single bad file must not abort the archive
+        item["error"] = f"Could not read file: {exc}"
+    else:
+        if item["is_pdf"] and item["text"] == "":
+            item["error"] = "No text could be extracted from this PDF."
+    return item
+
+
+def _flush(db: Session, import_id: int, batch: list[dict]) -> list[dict]:
+    ok = [item for item in batch if not item.get("error")]
+    if ok:
+        transcript_ids = db.scalars(
+            insert(Transcript).returning(Transcript.id, sort_by_parameter_order=True),
+            [
+                {
+                    "student_id": item["student_id"],
+                    "filename": item["filename"],
+                    "content_sha256": item["digest"] if item["is_pdf"] else None,
+                    # Mirrors the single-file uploads: PDFs await review, CSVs are confirmed
+                    "status": "parsed_raw" if item["is_pdf"] else "confirmed",
+                }
+                for item in ok
+            ],
+        ).all()
+        course_rows = []
+        for item, transcript_id in zip(ok, transcript_ids):
+            item["transcript_id"] = transcript_id
+            if item["text"]:
+                store_text(db, item["digest"], item["text"])
+                store_parsed(db, item["digest"], "transcript", item["rows"])
+            for row in item["rows"]:
+                course_rows.append({**row, "transcript_id": transcript_id})
+        if course_rows:
+            db.execute(insert(TranscriptCourse), course_rows)
+            upsert_courses(
+                db,
+                (
+                    {"code": r["course_code"], "title": r["course_title"], "credits": r["credits"]}
+                    for r in course_rows
+                ),
+            )
+
+    results = [
+        _failed(item["filename"], item["student_id"], item["error"])
+        if item.get("error")
+        else {
+            "filename": item["filename"],
+            "student_id": item["student_id"],
+            "status": "imported",
+            "transcript_id": item["transcript_id"],
+            "course_count": len(item["rows"]),
+            "error": None,
+        }
+        for item in batch
+    ]
+    _record_entries(db, import_id, results)
+    db.commit()
+    for item in ok:
+        UPLOADS.inc("transcript", "pdf" if item["is_pdf"] else "csv")
+        if item["is_pdf"]:
+            record_parse_confidence(item["rows"])
+    return results
+
+
+def _record_entries(db: Session, import_id: int, results: list[dict]) -> None:
+    if not results:
+        return
+    stmt = dialect_insert(db, TranscriptImportEntry).values(
+        [
+            {
+                "import_id": import_id,
+                "filename": r["filename"],
+                "student_id": r["student_id"],
+                "status": r["status"],
+                "transcript_id": r["transcript_id"],
+                "course_count": r["course_count"],
+                "error": r["error"],
+            }
+            for r in results
+        ]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["import_id", "filename"],
+            set_={
+                "student_id": stmt.excluded.student_id,
+                "status": stmt.excluded.status,
+                "transcript_id": stmt.excluded.transcript_id,
+                "course_count": stmt.excluded.course_count,
+                "error": stmt.excluded.error,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+    )
+
+
+def _read_manifest(stream: BinaryIO) -> dict[str, int]:
+    reader = TextIOWrapper(stream, encoding="utf-8-sig", errors="ignore", newline="")
+    try:
+        rows = csv.DictReader(reader)
+        columns = {name.strip().lower(): name for name in rows.fieldnames or []}
+        file_col = columns.get("filename") or columns.get("file")
+        student_col = columns.get("student_id")
+        if not file_col or not student_col:
+            raise HTTPException(
+                status_code=422,
+                detail="Manifest must have 'filename' and 'student_id' columns.",
+            )
+        students: dict[str, int] = {}
+        for row in rows:
+            name = (row.get(file_col) or "").strip()
+            try:
+                students[name] = int((row.get(student_col) or "").strip())
+            except ValueError:
+                continue
+        return students
+    finally:
+        reader.detach()
+
+
+def _get_or_create_job(db: Session, digest: str, filename: str | None) -> TranscriptImport:
+    db.execute(
+        dialect_insert(db, TranscriptImport)
+        .values(archive_sha256=digest, filename=filename, status="running")
+        .on_conflict_do_nothing(index_elements=["archive_sha256"])
+    )
+    db.commit()
+    job = db.scalar(select(TranscriptImport).where(TranscriptImport.archive_sha256 == digest))
+    job.status = "running"
+    return job
+
+
+def _hash_stream(stream: BinaryIO) -> str:
+    sha = hashlib.sha256()
+    stream.seek(0)
+    while chunk := stream.read(_HASH_CHUNK_BYTES):
+        sha.update(chunk)
+    stream.seek(0)
+    return sha.hexdigest()
+
+
+def _done(value) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def _raised(exc: Exception) -> Future:
+    future: Future = Future()
+    future.set_exception(exc)
+    return future
+
+
+def _failed(filename: str, student_id: int | None, error: str) -> dict:
+    return {
+        "filename": filename,
+        "student_id": student_id,
+        "status": "failed",
+        "transcript_id": None,
+        "course_count": 0,
+        "error": error,
+    }
+
+
+def _result_from_entry(entry: TranscriptImportEntry, status: str) -> dict:
+    return {
+        "filename": entry.filename,
+        "student_id": entry.student_id,
+        "status": status,
+        "transcript_id": entry.transcript_id,
+        "course_count": entry.course_count or 0,
+        "error": entry.error,
+    }
+
+
+def _report(job: TranscriptImport, files: list[dict]) -> dict:
+    counts = {"imported": 0, "skipped": 0, "failed": 0}
+    for f in files:
+        counts[f["status"]] += 1
+    return {"import_id": job.id, "status": job.status, **counts, "files": files}
@@ -1,9 +1,16 @@
 import csv
 import re
+from dataclasses import dataclass
 from io import StringIO
+from itertools import chain
+from typing import Callable, Iterable, Iterator
 
+from app.core.metrics import timed
 from app.models.transcript import TranscriptCourse
 
+# Bump whenever parsing output changes so cached/persisted results are re-derived.
+PARSER_VERSION = 2
+
 
 def parse_transcript_csv(content: str) -> list[TranscriptCourse]:
     reader = csv.DictReader(StringIO(content))
@@ -26,63 +33,193 @@ def parse_transcript_csv(content: str) -> list[TranscriptCourse]:
 
 
 def parse_catalog_csv(content: str) -> list[dict]:
-    reader = csv.DictReader(StringIO(content))
-    rows = []
+    return [row for row in iter_catalog_csv(StringIO(content)) if row is not None]
+
+
+def iter_catalog_csv(lines: Iterable[str]) -> Iterator[dict | None]:
+    """Stream catalog rows from CSV text one record at a time.
+
+    Yields ``None`` for records that have no course code so callers can count
+    rejects without materializing the whole file.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name.strip().lower(): idx for idx, name in enumerate(header)}
+
+    def cell(row: list[str], *names: str) -> str | None:
+        for name in names:
+            idx = columns.get(name)
+            if idx is not None and idx < len(row) and row[idx]:
+                return row[idx]
+        return None
+
     for row in reader:
-        code = row.get("course_code") or row.get("code") or row.get("course")
-        if not code:
+        if not row:
             continue
-        rows.append(
-            {
-                "code": code.strip(),
-                "title": row.get("course_title") or row.get("title"),
-                "credits": _to_int(row.get("credits")),
-                "availability": row.get("availability"),
-                "honors_only": str(row.get("honors_only", "")).lower()
-                in {"true", "1", "yes"},
-            }
-        )
-    return rows
+        code = cell(row, "course_code", "code", "course")
+        if not code or not code.strip():
+            yield None
+            continue
+        yield {
+            "code": code.strip(),
+            "title": cell(row, "course_title", "title"),
+            "credits": _to_int(cell(row, "credits")),
+            "availability": cell(row, "availability"),
+            "honors_only": str(cell(row, "honors_only") or "").lower()
+            in {"true", "1", "yes"},
+        }
 
 
 def parse_transcript_text(content: str) -> list[TranscriptCourse]:
     """Detect transcript format and parse accordingly.
 
     Supports:
-    - Philander Smith University columnar format (primary)
+    - Every format in the transcript format registry (Philander Smith
+      University columnar format)
     - Generic free-text fallback
     """
-    if _PSU_TERM_RE.search(content):
-        return _parse_psu_transcript(content)
-    return _parse_generic_transcript(content)
+    return parse_transcript_pages([content])
+
+
+@timed("parse_transcript")
+def parse_transcript_pages(pages: Iterable[str]) -> list[TranscriptCourse]:
+    """Like ``parse_transcript_text`` but consumes text page by page.
+
+    Pages are pulled lazily: the format is normally identified from the first
+    page, and the remaining pages are parsed as they arrive, so a streaming
+    extractor can still be working on later pages. The generic fallback needs
+    the whole document before it can rule every registered format out.
+    """
+    pages = iter(pages)
+    seen: list[str] = []
+    for page in pages:
+        seen.append(page)
+        fmt = detect_transcript_format(page)
+        if fmt is not None:
+            return fmt.parse_lines(
+                line for chunk in chain(seen, pages) for line in chunk.splitlines()
+            )
+    return _parse_generic_transcript("\n".join(seen))
+
+
+def transcript_rows(courses: list[TranscriptCourse]) -> list[dict]:
+    """Plain-dict form of parsed courses, for caching and crossing process boundaries."""
+    return [
+        {
+            "course_code": c.course_code,
+            "course_title": c.course_title,
+            "credits": c.credits,
+            "term": c.term,
+            "grade": c.grade,
+            "confidence": c.confidence,
+        }
+        for c in courses
+    ]
+
+
+# ── Format registry ──────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class TranscriptFormat:
+    """A school's transcript layout: how to recognize it and how to read it.
+
+    ``fingerprints`` are (keyword, regex) pairs. The keyword is a lowercase
+    word every match of the regex contains; the regex is only tried on pages
+    where that word occurs. Each distinct fingerprint found scores a point,
+    and the format is a candidate once it reaches ``min_score`` with every
+    fingerprint listed in ``required`` (by index) among them; the others only
+    add to the score. ``parse_lines`` is the line grammar for the layout.
+    """
+
+    name: str
+    fingerprints: tuple[tuple[str, str], ...]
+    parse_lines: Callable[[Iterable[str]], list[TranscriptCourse]]
+    min_score: int = 1
+    required: tuple[int, ...] = ()
+
+
+_FORMATS: list[TranscriptFormat] = []
+# keyword -> [(format index, fingerprint index, compiled regex)]. Detection
+# tokenizes the page once and only tries fingerprints whose keyword is present,
+# so its cost does not grow with the number of registered formats.
+_FINGERPRINT_INDEX: dict[str, list[tuple[int, int, re.Pattern]]] = {}
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def register_transcript_format(fmt: TranscriptFormat) -> None:
+    for keyword, _ in fmt.fingerprints:
+        if not _WORD_RE.fullmatch(keyword):
+            raise ValueError(f"Fingerprint keyword must be a lowercase word: {keyword!r}")
+    fmt_idx = len(_FORMATS)
+    _FORMATS.append(fmt)
+    for fp_idx, (keyword, pattern) in enumerate(fmt.fingerprints):
+        _FINGERPRINT_INDEX.setdefault(keyword, []).append(
+            (fmt_idx, fp_idx, re.compile(pattern, re.IGNORECASE | re.MULTILINE))
+        )
+
+
+def detect_transcript_format(page: str) -> TranscriptFormat | None:
+    """Highest-scoring registered format whose fingerprints appear on ``page``.
+
+    Ties go to the format registered first. Returns None when no format
+    reaches its ``min_score``.
+    """
+    hits: dict[int, set[int]] = {}
+    for word in set(_WORD_RE.findall(page.lower())):
+        for fmt_idx, fp_idx, pattern in _FINGERPRINT_INDEX.get(word, ()):
+            if pattern.search(page):
+                hits.setdefault(fmt_idx, set()).add(fp_idx)
+
+    best: TranscriptFormat | None = None
+    best_score = 0
+    for fmt_idx in sorted(hits):
+        fmt = _FORMATS[fmt_idx]
+        score = len(hits[fmt_idx])
+        if not hits[fmt_idx].issuperset(fmt.required):
+            continue
+        if score >= fmt.min_score and score > best_score:
+            best, best_score = fmt, score
+    return best
 
 
 # ── Philander Smith University format ────────────────────────────────────────
 
 # "2022-2023 Academic Year : Fall Semester"
-_PSU_TERM_RE = re.compile(
-    r"(\d{4})-(\d{4})\s+Academic\s+Year\s*:\s*(Fall|Spring|Summer)\s+Semester",
-    re.IGNORECASE,
+_PSU_TERM = (
+    r"(?P<year1>\d{4})-(?P<year2>\d{4})\s+Academic\s+Year\s*:\s*"
+    r"(?P<semester>Fall|Spring|Summer)\s+Semester"
 )
 
 # "CSCI-123 Programming I LT A 3.00 3.00 3.00 12.00"
 # "MTH -215 Calculus I - HYBRID LT A 5.00 5.00 5.00 20.00"
 # "CSCI-143 Applied Comp Science LTA 3.00 3.00 3.00 12.00"   (LTA = LT + A no space)
 # "CSCI-373 Machine Learning LT WIP 3.00 0.00 0.00 0.00"
-_PSU_COURSE_RE = re.compile(
-    r"^([A-Z]{2,5})\s*-\s*(\d{3})\s+(.+?)\s+LT\s*([A-Z+\-]+)\s+([\d]+\.[\d]+)",
-    re.IGNORECASE,
+_PSU_COURSE = (
+    r"(?P<dept>[A-Z]{2,5})\s*-\s*(?P<num>\d{3})\s+(?P<title>.+?)\s+"
+    r"LT\s*(?P<grade>[A-Z+\-]+)\s+(?P<credits>[\d]+\.[\d]+)"
 )
 
 # Lines we always skip
-_PSU_SKIP_RE = re.compile(
-    r"^(Term Totals|Career Totals|Page\s*:|Copy of Transcript|Undergraduate Division|"
+_PSU_SKIP = (
+    r"Term Totals|Career Totals|Page\s*:|Copy of Transcript|Undergraduate Division|"
     r"Course Number|Bertha|Philander Smith|900 Daisy|ID\s*:|Name\s*:|Address|"
     r"Abuja|Degree Information|Major|Minor|Registrar|Transcript Official|"
     r"\*\s*Means|R\s*Means|ACCREDITATION|HISTORY|FAMILY EDUCATIONAL|"
-    r"UNIT OF CREDIT|COURSE NUM|GRADES|REPEATED|FRAUDULENT|OFFICIAL)",
+    r"UNIT OF CREDIT|COURSE NUM|GRADES|REPEATED|FRAUDULENT|OFFICIAL"
+)
+
+# One match per line classifies it. Alternatives are tried in priority order:
+# skip (at line start), then a term header anywhere, then a course row.
+_PSU_LINE_RE = re.compile(
+    rf"\s*(?:(?P<skip>{_PSU_SKIP})|(?P<term>.*?{_PSU_TERM})|(?P<course>{_PSU_COURSE}))",
     re.IGNORECASE,
 )
+_PSU_TERM_RE = re.compile(_PSU_TERM, re.IGNORECASE)
+# Trailing "Copy of Transcript" artifact, and everything after it
+_PSU_ARTIFACT_RE = re.compile(r"\.?\s*Copy of Transcript.*$", re.IGNORECASE)
+_PSU_TITLE_TAG_RE = re.compile(r"\s*-\s*(HYBRID|ONLINE)\b", re.IGNORECASE)
 
 
 def _psu_term_label(year1: str, year2: str, semester: str) -> str:
@@ -94,42 +231,34 @@ def _psu_term_label(year1: str, year2: str, semester: str) -> str:
     return f"Summer {year2}"  # Summer belongs to second year
 
 
-def _parse_psu_transcript(content: str) -> list[TranscriptCourse]:
-    rows: list[TranscriptCourse] = []
-    current_term: str | None = None
+def _tokenize_psu(lines: Iterable[str]) -> Iterator[tuple[str, re.Match]]:
+    """Yield ("term" | "course", match) for each meaningful line."""
+    classify = _PSU_LINE_RE.match
+    for line in lines:
+        if "copy of transcript" in line.lower():
+            line = _PSU_ARTIFACT_RE.sub("", line)
+        m = classify(line)
+        if m is not None and m.lastgroup != "skip":
+            yield m.lastgroup, m
 
-    for raw_line in content.splitlines():
-        line = raw_line.strip()
-        # Strip trailing "Copy of Transcript" artifact
-        line = re.sub(r"\.?\s*Copy of Transcript.*$", "", line, flags=re.IGNORECASE).strip()
-        if not line:
-            continue
-        if _PSU_SKIP_RE.match(line):
-            continue
 
-        # Term header?
-        tm = _PSU_TERM_RE.search(line)
-        if tm:
-            current_term = _psu_term_label(tm.group(1), tm.group(2), tm.group(3))
-            continue
+def _parse_psu_transcript(lines: Iterable[str]) -> list[TranscriptCourse]:
+    rows: list[TranscriptCourse] = []
+    current_term: str | None = None
 
-        # Course row?
-        cm = _PSU_COURSE_RE.match(line)
-        if not cm:
+    for kind, m in _tokenize_psu(lines):
+        if kind == "term":
+            current_term = _psu_term_label(m["year1"], m["year2"], m["semester"])
             continue
 
-        dept       = cm.group(1).upper()
-        num        = cm.group(2)
-        raw_title  = cm.group(3).strip()
-        grade_raw  = cm.group(4).upper()
-        credits_str= cm.group(5)
-
-        code = f"{dept} {num}"
+        grade_raw = m["grade"].upper()
+        code = f"{m['dept'].upper()} {m['num']}"
 
         # Clean up title
-        title = re.sub(r"\s*-\s*HYBRID\b", " (Hybrid)", raw_title, flags=re.IGNORECASE)
-        title = re.sub(r"\s*-\s*ONLINE\b", " (Online)", title, flags=re.IGNORECASE)
-        title = title.strip(" -")
+        title = m["title"].strip()
+        if "-" in title:
+            title = _PSU_TITLE_TAG_RE.sub(lambda t: f" ({t[1].title()})", title)
+            title = title.strip(" -")
 
         # Grade / WIP
         in_progress = grade_raw == "WIP"
@@ -137,7 +266,7 @@ def _parse_psu_transcript(content: str) -> list[TranscriptCourse]:
 
         # Credits — the first number is always the planned credit hours
         try:
-            credits = int(float(credits_str))
+            credits = int(float(m["credits"]))
         except (ValueError, TypeError):
             credits = None
 
@@ -158,23 +287,44 @@ def _parse_psu_transcript(content: str) -> list[TranscriptCourse]:
     return rows
 
 
+register_transcript_format(
+    TranscriptFormat(
+        name="philander_smith",
+        # The term header selects this format and is required: free-text
+        # transcripts that merely name the school must stay with the generic
+        # parser. The other fingerprints only raise the score against other formats.
+        fingerprints=(
+            ("academic", _PSU_TERM_RE.pattern),
+            ("philander", r"Philander\s+Smith"),
+            ("transcript", r"Copy\s+of\s+Transcript"),
+        ),
+        parse_lines=_parse_psu_transcript,
+        required=(0,),
+    )
+)
+
+
 # ── Generic fallback ──────────────────────────────────────────────────────────
 
+def _tokenize_generic(content: str) -> Iterator[tuple[str, re.Match, str]]:
+    """Yield ("term" | "course", match, normalized line); a term anywhere wins."""
+    classify = _GENERIC_LINE_RE.match
+    for line in _normalize_lines(content):
+        m = classify(line)
+        if m is not None:
+            yield m.lastgroup, m, line
+
+
 def _parse_generic_transcript(content: str) -> list[TranscriptCourse]:
     rows: list[TranscriptCourse] = []
     term = None
-    for line in _normalize_lines(content):
-        term_match = _TERM_RE.search(line)
-        if term_match:
-            term = f"{term_match.group(1).title()} {term_match.group(2)}"
-            continue
-
-        code_match = _COURSE_RE.search(line)
-        if not code_match:
+    for kind, m, line in _tokenize_generic(content):
+        if kind == "term":
+            term = f"{m['season'].title()} {m['year']}"
             continue
 
-        code = f"{code_match.group(1)} {code_match.group(2)}"
-        title = _extract_title(line, code_match.end())
+        code = f"{m['dept']} {m['num']}"
+        title = _extract_title(line, m.end("course"))
         credits = _extract_credits(line)
         grade = _extract_grade(line)
         confidence = _compute_confidence(term, credits, grade)
@@ -266,11 +416,16 @@ _TERM_RE = re.compile(r"\b(Spring|Summer|Fall|Winter)\s+(20\d{2})\b", re.I)
 _COURSE_RE = re.compile(r"\b([A-Z]{2,4})\s?-?\s?(\d{3}[A-Z]?)\b")
 _CREDITS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:cr|credits)\b", re.I)
 _GRADE_RE = re.compile(r"\b([ABCDF][+-]?)\b")
+# _TERM_RE or else _COURSE_RE, searched in one match with named groups
+_GENERIC_LINE_RE = re.compile(
+    r"(?:.*?(?P<term>\b(?i:(?P<season>Spring|Summer|Fall|Winter))\s+(?P<year>20\d{2})\b)"
+    r"|.*?(?P<course>\b(?P<dept>[A-Z]{2,4})\s?-?\s?(?P<num>\d{3}[A-Z]?)\b))"
+)
 
 
 def _normalize_lines(content: str):
     for line in content.splitlines():
-        clean = re.sub(r"\s+", " ", line).strip()
+        clean = " ".join(line.split())
         if clean:
             yield clean
 
@@ -306,3 +461,12 @@ def _extract_availability(line: str) -> str | None:
         if season in lower:
             seasons.append(season.title())
     return ",".join(seasons) if seasons else None
+
+
+# Parsers addressable by name, taking page texts and returning plain dicts.
+# Used by the extraction cache and the PDF worker processes.
+PARSERS: dict[str, Callable[[Iterable[str]], list[dict]]] = {
+    "transcript": lambda pages: transcript_rows(parse_transcript_pages(pages)),
+    "catalog": lambda pages: parse_catalog_text("\n".join(pages)),
+    "prereq": lambda pages: parse_prereq_text("\n".join(pages)),
+}
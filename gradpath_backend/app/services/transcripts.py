@@ -1,15 +1,26 @@
+from datetime import datetime
+
 from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.course import Course
+from app.core.metrics import UPLOADS
 from app.models.document import DocumentUpload
 from app.models.transcript import Transcript, TranscriptCourse
 from app.schemas.transcript import ConfirmCourse, TranscriptConfirmRequest
-from app.services.transcript_parser import (
-    parse_transcript_csv,
-    parse_transcript_text,
+from app.services.extraction_cache import get_persisted_parse
+from app.services.ingest import (
+    PENDING_STATUSES,
+    enqueue_transcript_pdf,
+    is_queued,
+    release_blob,
 )
-from app.services.pdf_parser import extract_text_from_pdf
+from app.services.reparse import request_reparse
+from app.services.transcript_parser import parse_transcript_csv
+from app.services.upsert import upsert_courses
+
+_CONFIRM_FIELDS = ("course_title", "credits", "grade")
 
 
 def get_transcript_status(db: Session, student_id: int) -> dict:
@@ -21,6 +32,58 @@ def get_transcript_status(db: Session, student_id: int) -> dict:
         .first()
     )
     if transcript is None:
+        return transcript_status_payload(db, student_id, None, None, None, [])
+    db_courses = (
+        db.query(TranscriptCourse)
+        .filter(TranscriptCourse.transcript_id == transcript.id)
+        .all()
+    )
+    return transcript_status_payload(
+        db, student_id, transcript.id, transcript.status, transcript.content_sha256, db_courses
+    )
+
+
+async def get_transcript_status_async(db: AsyncSession, student_id: int) -> dict:
+    transcript = (
+        await db.execute(
+            select(Transcript.id, Transcript.status, Transcript.content_sha256)
+            .where(Transcript.student_id == student_id)
+            .order_by(Transcript.uploaded_at.desc())
+            .limit(1)
+        )
+    ).first()
+    if transcript is None:
+        return transcript_status_payload(db, student_id, None, None, None, [])
+    db_courses = (
+        await db.scalars(
+            select(TranscriptCourse).where(TranscriptCourse.transcript_id == transcript.id)
+        )
+    ).all()
+    if transcript.status == "parsed_raw" and not db_courses:
+        # Falls back to the persisted parse, which only has a sync reader
+        return await db.run_sync(
+            transcript_status_payload,
+            student_id,
+            transcript.id,
+            transcript.status,
+            transcript.content_sha256,
+            db_courses,
+        )
+    return transcript_status_payload(
+        db, student_id, transcript.id, transcript.status, transcript.content_sha256, db_courses
+    )
+
+
+def transcript_status_payload(
+    db: Session,
+    student_id: int,
+    transcript_id: int | None,
+    status: str | None,
+    digest: str | None,
+    db_courses,
+) -> dict:
+    """Build the transcript status body from an already-loaded transcript and its course rows."""
+    if transcript_id is None:
         return {
             "student_id": student_id,
             "transcript_id": None,
@@ -29,88 +92,37 @@ def get_transcript_status(db: Session, student_id: int) -> dict:
             "needs_review": False,
         }
 
-    courses = []
+    # Saved rows (written at upload or confirm time) always win over the raw
+    # parse, which yields false-positive "courses" from addresses, IDs, etc.
+    courses = [
+        {
+            "id": c.id,
+            "course_code": c.course_code,
+            "course_title": c.course_title,
+            "credits": c.credits,
+            "term": c.term,
+            "grade": c.grade,
+            "confidence": c.confidence,
+        }
+        for c in db_courses
+    ]
     needs_review = False
-    if transcript.status == "confirmed":
-        courses = [
-            {
-                "id": c.id,
-                "course_code": c.course_code,
-                "course_title": c.course_title,
-                "credits": c.credits,
-                "term": c.term,
-                "grade": c.grade,
-                "confidence": c.confidence,
-            }
-            for c in db.query(TranscriptCourse)
-            .filter(TranscriptCourse.transcript_id == transcript.id)
-            .all()
-        ]
-    elif transcript.status == "parsed_raw":
-        # Prefer already-saved DB rows (written at upload time) over re-parsing
-        # raw text on every request, which causes the generic regex to produce
-        # false-positive "courses" from addresses, IDs, etc. in the PDF.
-        db_courses = (
-            db.query(TranscriptCourse)
-            .filter(TranscriptCourse.transcript_id == transcript.id)
-            .all()
-        )
+    if status == "parsed_raw":
         if db_courses:
-            courses = [
-                {
-                    "id": c.id,
-                    "course_code": c.course_code,
-                    "course_title": c.course_title,
-                    "credits": c.credits,
-                    "term": c.term,
-                    "grade": c.grade,
-                    "confidence": c.confidence,
-                }
-                for c in db_courses
-            ]
-            needs_review = any((c.confidence or 0) < 0.7 for c in db_courses) or not db_courses
+            needs_review = any((c.confidence or 0) < 0.7 for c in db_courses)
         else:
-            # No rows yet — fall back to live parse (first-time or failed save)
-            raw_courses = parse_transcript_text(transcript.raw_text or "")
-            courses = [
-                {
-                    "id": -1,
-                    "course_code": c.course_code,
-                    "course_title": c.course_title,
-                    "credits": c.credits,
-                    "term": c.term,
-                    "grade": c.grade,
-                    "confidence": c.confidence,
-                }
-                for c in raw_courses
-            ]
-            needs_review = any((c.confidence or 0) < 0.7 for c in raw_courses) or not raw_courses
-    else:
-        # Fallback: for any other status (e.g. "received" from old CSV uploads),
-        # return whatever TranscriptCourse rows exist in the DB.
-        db_courses = (
-            db.query(TranscriptCourse)
-            .filter(TranscriptCourse.transcript_id == transcript.id)
-            .all()
-        )
-        if db_courses:
-            courses = [
-                {
-                    "id": c.id,
-                    "course_code": c.course_code,
-                    "course_title": c.course_title,
-                    "credits": c.credits,
-                    "term": c.term,
-                    "grade": c.grade,
-                    "confidence": c.confidence,
-                }
-                for c in db_courses
-            ]
+            # No rows yet — serve the persisted parse result (never re-parse on read)
+            raw_courses, current = get_persisted_parse(db, digest, "transcript")
+            if not current:
+                request_reparse()
+            raw_courses = raw_courses or []
+            courses = [{"id": -1, **c} for c in raw_courses]
+            needs_review = any((c["confidence"] or 0) < 0.7 for c in raw_courses) or not raw_courses
 
     return {
         "student_id": student_id,
-        "transcript_id": transcript.id,
-        "status": transcript.status,
+        "transcript_id": transcript_id,
+        "status": status,
         "courses": courses,
         "needs_review": needs_review,
     }
@@ -136,19 +148,20 @@ def create_transcript_with_csv(
     db.refresh(transcript)
 
     courses = parse_transcript_csv(content)
-    for course in courses:
-        db.add(
-            TranscriptCourse(
-                transcript_id=transcript.id,
-                course_code=course.course_code,
-                course_title=course.course_title,
-                credits=course.credits,
-                term=course.term,
-                grade=course.grade,
-            )
+    db.add_all(
+        TranscriptCourse(
+            transcript_id=transcript.id,
+            course_code=course.course_code,
+            course_title=course.course_title,
+            credits=course.credits,
+            term=course.term,
+            grade=course.grade,
         )
-        _upsert_course(db, course.course_code, course.course_title, course.credits)
+        for course in courses
+    )
+    _upsert_catalog_entries(db, courses)
     db.commit()
+    UPLOADS.inc("transcript", "csv")
     return transcript
 
 
@@ -158,53 +171,33 @@ def create_transcript_with_pdf(
     filename: str | None,
     data: bytes,
 ) -> Transcript:
-    raw_text = extract_text_from_pdf(data)
-    status = "parsed_raw" if raw_text else "received"
-    transcript = Transcript(
-        student_id=student_id,
-        filename=filename,
-        raw_text=raw_text,
-        status=status,
-    )
-    db.add(transcript)
-    db.commit()
-    db.refresh(transcript)
-
-    if raw_text:
-        courses = parse_transcript_text(raw_text)
-        for course in courses:
-            db.add(
-                TranscriptCourse(
-                    transcript_id=transcript.id,
-                    course_code=course.course_code,
-                    course_title=course.course_title,
-                    credits=course.credits,
-                    term=course.term,
-                    grade=course.grade,
-                    confidence=course.confidence,
-                )
-            )
-            _upsert_course(db, course.course_code, course.course_title, course.credits)
-        db.commit()
-    return transcript
+    """Store the PDF and queue it; the ingest workers extract and parse it."""
+    return enqueue_transcript_pdf(db, student_id, filename, data)
 
 
 def get_parse_preview_for_document(db: Session, document_id: int) -> dict:
-    """Re-parse a DocumentUpload and return structured preview without writing to DB."""
+    """Return the persisted structured parse of a DocumentUpload without re-parsing it."""
     doc = db.get(DocumentUpload, document_id)
     if doc is None:
         raise HTTPException(status_code=404, detail="Document not found.")
 
-    raw_text = doc.raw_text or ""
     notes: list[str] = []
     detected: list[dict] = []
 
     if doc.kind in ("transcript", "degree_audit"):
-        if not raw_text:
-            notes.append("No text could be extracted from this document. Try a different PDF.")
+        courses = None
+        queued = is_queued(db, doc)
+        if not queued and doc.status != "failed":
+            courses, current = get_persisted_parse(db, doc.content_sha256, "transcript")
+            if not current and (doc.content_sha256 or doc.raw_text):
+                request_reparse()
+        if courses is None:
+            if queued or (doc.status != "failed" and (doc.content_sha256 or doc.raw_text)):
+                notes.append("This document is still being processed. Check back shortly.")
+            else:
+                notes.append("No text could be extracted from this document. Try a different PDF.")
         else:
-            courses = parse_transcript_text(raw_text)
-            low_conf = [c for c in courses if (c.confidence or 0) < 0.7]
+            low_conf = [c for c in courses if (c["confidence"] or 0) < 0.7]
             if low_conf:
                 notes.append(
                     f"{len(low_conf)} course(s) have low confidence — please review them carefully."
@@ -213,12 +206,12 @@ def get_parse_preview_for_document(db: Session, document_id: int) -> dict:
                 notes.append("No courses were detected. The format may not be supported.")
             detected = [
                 {
-                    "course_code": c.course_code,
-                    "course_title": c.course_title,
-                    "term": c.term,
-                    "credits": c.credits,
-                    "grade": c.grade,
-                    "confidence": c.confidence or 0.4,
+                    "course_code": c["course_code"],
+                    "course_title": c["course_title"],
+                    "term": c["term"],
+                    "credits": c["credits"],
+                    "grade": c["grade"],
+                    "confidence": c["confidence"] or 0.4,
                 }
                 for c in courses
             ]
@@ -253,49 +246,104 @@ def confirm_transcript(
         db.add(transcript)
         db.flush()
 
-    # Replace existing courses with user-confirmed set
-    db.query(TranscriptCourse).filter(
-        TranscriptCourse.transcript_id == transcript.id
-    ).delete(synchronize_session=False)
-
-    for c in payload.courses:
-        db.add(
-            TranscriptCourse(
-                transcript_id=transcript.id,
-                course_code=c.course_code,
-                course_title=c.course_title,
-                credits=c.credits,
-                term=c.term,
-                grade=c.grade,
-                confidence=None,  # null means user-confirmed
-            )
-        )
-        _upsert_course(db, c.course_code, c.course_title, c.credits)
+    was_confirmed = transcript.status == "confirmed"
+    pending = transcript.status in PENDING_STATUSES
+    if pending:
+        # Take the row from the ingest workers before writing courses: their
+        # guarded parsed_raw update no longer matches, so their parse is dropped.
+        transcript.status = "confirmed"
+        transcript.status_updated_at = datetime.utcnow()
+        db.flush()
+
+    changes = _apply_confirmed_courses(db, transcript.id, payload.courses)
 
+    if was_confirmed and (changes["added"] or changes["updated"] or changes["removed"]):
+        transcript.version = (transcript.version or 1) + 1  # invalidates cached reads
     transcript.status = "confirmed"
     db.commit()
+    if pending:
+        release_blob(db, transcript.content_sha256)
     return {
         "transcript_id": transcript.id,
         "student_id": payload.student_id,
         "status": "confirmed",
         "course_count": len(payload.courses),
+        "changes": changes,
     }
 
 
-def _upsert_course(
-    db: Session,
-    code: str,
-    title: str | None,
-    credits: int | None,
-):
-    existing = db.query(Course).filter(Course.code == code).first()
-    if existing:
-        if title and not existing.title:
-            existing.title = title
-        if credits and not existing.credits:
-            existing.credits = credits
-        db.add(existing)
-        return existing
-    course = Course(code=code, title=title, credits=credits)
-    db.add(course)
-    return course
+def _apply_confirmed_courses(db: Session, transcript_id: int, courses: list[ConfirmCourse]) -> dict:
+    """Diff ``courses`` against the stored rows by (course_code, term) and write only the delta.
+
+    Matched rows are updated in one executemany (also marking them user-confirmed),
+    new ones inserted in one, and leftovers deleted in one statement.
+    """
+    existing: dict[tuple, list] = {}
+    for row in db.execute(
+        select(
+            TranscriptCourse.id,
+            TranscriptCourse.course_code,
+            TranscriptCourse.term,
+            TranscriptCourse.course_title,
+            TranscriptCourse.credits,
+            TranscriptCourse.grade,
+            TranscriptCourse.confidence,
+        )
+        .where(TranscriptCourse.transcript_id == transcript_id)
+        .order_by(TranscriptCourse.id)
+    ):
+        existing.setdefault((row.course_code, row.term), []).append(row)
+
+    inserts, updates, catalog = [], [], []
+    changes = {"added": [], "updated": [], "removed": []}
+    graded_churn = False  # a graded course was added or removed
+    for c in courses:
+        key = {"course_code": c.course_code, "term": c.term}
+        values = {f: getattr(c, f) for f in _CONFIRM_FIELDS}
+        matches = existing.get((c.course_code, c.term))
+        if not matches:
+            inserts.append({"transcript_id": transcript_id, **key, **values, "confidence": None})
+            changes["added"].append(key)
+            graded_churn = graded_churn or bool(c.grade)
+            catalog.append(c)
+            continue
+        row = matches.pop(0)
+        changed = [f for f in _CONFIRM_FIELDS if getattr(row, f) != values[f]]
+        if changed or row.confidence is not None:  # null confidence means user-confirmed
+            updates.append({"id": row.id, **values, "confidence": None})
+        if changed:
+            changes["updated"].append({**key, "fields": changed})
+            if "course_title" in changed or "credits" in changed:
+                catalog.append(c)
+
+    stale = [row for rows in existing.values() for row in rows]
+    if stale:
+        db.execute(delete(TranscriptCourse).where(TranscriptCourse.id.in_([r.id for r in stale])))
+        changes["removed"] = [{"course_code": r.course_code, "term": r.term} for r in stale]
+        graded_churn = graded_churn or any(r.grade for r in stale)
+    if updates:
+        db.execute(update(TranscriptCourse), updates)
+    if inserts:
+        db.execute(insert(TranscriptCourse), inserts)
+    _upsert_catalog_entries(db, catalog)
+
+    changes["completed_changed"] = bool(
+        changes["added"]
+        or changes["removed"]
+        or any("grade" in u["fields"] for u in changes["updated"])
+    )
+    changes["gpa_changed"] = graded_churn or any(
+        "grade" in u["fields"] or "credits" in u["fields"] for u in changes["updated"]
+    )
+    return changes
+
+
+def _upsert_catalog_entries(db: Session, courses) -> None:
+    """Make sure every transcript course exists in the catalog (one batched upsert)."""
+    upsert_courses(
+        db,
+        (
+            {"code": c.course_code, "title": c.course_title, "credits": c.credits}
+            for c in courses
+        ),
+    )
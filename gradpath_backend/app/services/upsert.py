@@ -0,0 +1,155 @@
+from typing import Iterable
+
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+from app.models.prerequisite import Prerequisite
+
+# Rows per INSERT statement. Keeps bind parameters well under the driver limits
+# while letting a full catalog go through in a handful of round trips.
+_BATCH_SIZE = 1000
+
+
+def upsert_courses(db: Session, rows: Iterable[dict]) -> int:
+    """Insert or merge catalog rows keyed by ``code`` in set-based batches.
+
+    Existing courses only have their empty fields filled in; ``honors_only``
+    is sticky once set. Returns the number of distinct codes written.
+    The caller owns the transaction.
+    """
+    merged = _merge_course_rows(rows)
+    values = list(merged.values())
+    for start in range(0, len(values), _BATCH_SIZE):
+        db.execute(_course_upsert_stmt(db, values[start:start + _BATCH_SIZE]))
+    return len(values)
+
+
+def upsert_courses_returning(db: Session, rows: Iterable[dict]) -> list:
+    """Same merge as ``upsert_courses`` but hands back the resulting rows.
+
+    Runs as a single executemany INSERT ... ON CONFLICT ... RETURNING, which
+    SQLAlchemy pages through "insertmanyvalues" instead of one statement per
+    row. Rows come back in first-seen order of their codes.
+    """
+    values = list(_merge_course_rows(rows).values())
+    if not values:
+        return []
+    stmt = on_course_conflict_merge(dialect_insert(db, Course)).returning(*Course.__table__.c)
+    by_code = {row.code: row for row in db.execute(stmt, values)}
+    return [by_code[value["code"]] for value in values]
+
+
+def upsert_prereqs(db: Session, rows: Iterable[dict]) -> int:
+    """Insert prerequisite edges, skipping ones that already exist.
+
+    Returns the number of distinct edges submitted. The caller owns the
+    transaction.
+    """
+    values = list(_dedupe_prereq_rows(rows).values())
+    for start in range(0, len(values), _BATCH_SIZE):
+        stmt = dialect_insert(db, Prerequisite).values(values[start:start + _BATCH_SIZE])
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=["course_code", "prereq_code", "relation"]
+        )
+        db.execute(stmt)
+    return len(values)
+
+
+def upsert_prereqs_returning(db: Session, rows: Iterable[dict]) -> list:
+    """Insert prerequisite edges and return every submitted edge's row.
+
+    Existing edges are matched with a no-op update so RETURNING still yields
+    them; the whole payload goes through one insertmanyvalues execution.
+    """
+    values = list(_dedupe_prereq_rows(rows).values())
+    if not values:
+        return []
+    stmt = dialect_insert(db, Prerequisite)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["course_code", "prereq_code", "relation"],
+        set_={"relation": stmt.excluded.relation},
+    ).returning(*Prerequisite.__table__.c)
+    by_edge = {
+        (row.course_code, row.prereq_code, row.relation): row
+        for row in db.execute(stmt, values)
+    }
+    return [
+        by_edge[(value["course_code"], value["prereq_code"], value["relation"])]
+        for value in values
+    ]
+
+
+def _dedupe_prereq_rows(rows: Iterable[dict]) -> dict[tuple[str, str, str], dict]:
+    edges: dict[tuple[str, str, str], dict] = {}
+    for row in rows:
+        course_code = row.get("course_code")
+        prereq_code = row.get("prereq_code")
+        relation = row.get("relation") or "required"
+        if not course_code or not prereq_code:
+            continue
+        edges.setdefault(
+            (course_code, prereq_code, relation),
+            {"course_code": course_code, "prereq_code": prereq_code, "relation": relation},
+        )
+    return edges
+
+
+def _merge_course_rows(rows: Iterable[dict]) -> dict[str, dict]:
+    # Postgres rejects ON CONFLICT DO UPDATE touching the same row twice in one
+    # statement, so duplicate codes are folded here with the same fill-empty rules.
+    merged: dict[str, dict] = {}
+    for row in rows:
+        code = (row.get("code") or "").strip()
+        if not code:
+            continue
+        current = merged.get(code)
+        if current is None:
+            merged[code] = {
+                "code": code,
+                "title": row.get("title") or None,
+                "credits": row.get("credits") or None,
+                "availability": row.get("availability") or None,
+                "honors_only": bool(row.get("honors_only")),
+            }
+            continue
+        current["title"] = current["title"] or row.get("title") or None
+        current["credits"] = current["credits"] or row.get("credits") or None
+        current["availability"] = current["availability"] or row.get("availability") or None
+        current["honors_only"] = current["honors_only"] or bool(row.get("honors_only"))
+    return merged
+
+
+def _course_upsert_stmt(db: Session, values: list[dict]):
+    return on_course_conflict_merge(dialect_insert(db, Course).values(values))
+
+
+def on_course_conflict_merge(stmt):
+    """Attach the fill-only-empty-fields merge to an INSERT into ``courses``."""
+    table = Course.__table__
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["code"],
+        set_={
+            "title": func.coalesce(func.nullif(table.c.title, ""), excluded.title),
+            "credits": func.coalesce(func.nullif(table.c.credits, 0), excluded.credits),
+            "availability": func.coalesce(
+                func.nullif(table.c.availability, ""), excluded.availability
+            ),
+            "honors_only": or_(
+                func.coalesce(table.c.honors_only, False), excluded.honors_only
+            ),
+        },
+    )
+
+
+def dialect_insert(db: Session, model):
+    """INSERT construct with ON CONFLICT support for the session's database.
+
+    SQLite is only used for local runs; production is Postgres.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
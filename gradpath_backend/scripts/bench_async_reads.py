@@ -0,0 +1,121 @@
+"""
+Benchmark the async read endpoints against their previous sync versions.
+
+Seeds one student with a confirmed transcript and a plan, then drives the
+student, plan, risks, GPA, transcript status and lookup endpoints with a
+fixed number of concurrent clients. The "before" app serves the same paths
+from sync routes backed by the sync services, so every request holds one of
+Starlette's threadpool threads for its full database wait. Reports requests
+per second and p50/p99 latency for each.
+
+Run from gradpath_backend/ against the configured DATABASE_URL (the seeded
+student is left in place). Numbers are only meaningful on Postgres; SQLite
+serialises access and aiosqlite opens a connection per session:
+
+    python -m scripts.bench_async_reads
+    python -m scripts.bench_async_reads --clients 500 --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.main import app
+from app.models.plan import Plan
+from app.models.student import Student
+from app.services.plans import get_plan, get_plan_risks
+from app.services.students import calculate_gpa, get_student
+from app.services.transcripts import get_transcript_status
+from scripts.bench_dashboard import _seed
+
+
+def _sync_app() -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.get("/api/students/lookup")
+    def lookup(school_student_id: str = Query(...), db: Session = Depends(get_db)):
+        student = db.query(Student).filter(Student.student_id == school_student_id).first()
+        plan = db.query(Plan).filter(Plan.student_id == student.id).order_by(Plan.id.desc()).first()
+        return {"db_id": student.id, "plan_id": plan.id if plan else None}
+
+    @legacy.get("/api/students/{student_id}")
+    def student(student_id: int, db: Session = Depends(get_db)):
+        return {"id": get_student(db, student_id).id}
+
+    @legacy.get("/api/students/{student_id}/gpa")
+    def gpa(student_id: int, db: Session = Depends(get_db)):
+        value, credits = calculate_gpa(db, student_id)
+        return {"gpa": value, "credits": credits}
+
+    @legacy.get("/api/plans/{plan_id}")
+    def plan(plan_id: int, db: Session = Depends(get_db)):
+        return {"terms": len(get_plan(db, plan_id).terms)}
+
+    @legacy.get("/api/plans/{plan_id}/risks")
+    def risks(plan_id: int, db: Session = Depends(get_db)):
+        return [r.id for r in get_plan_risks(db, plan_id)]
+
+    @legacy.get("/api/transcripts/{student_id}")
+    def transcript(student_id: int, db: Session = Depends(get_db)):
+        return get_transcript_status(db, student_id)
+
+    return legacy
+
+
+async def _drive(target: FastAPI, paths: list[str], clients: int, total: int):
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker():
+            nonlocal errors
+            for i in remaining:
+                start = time.perf_counter()
+                resp = await client.get(paths[i % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                errors += resp.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return total / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=40)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        sid, plan_id = _seed(client, args.courses)
+        client.put(f"/api/students/{sid}", json={"student_id": f"BENCH-{sid}"})
+    paths = [
+        f"/api/students/{sid}",
+        f"/api/plans/{plan_id}",
+        f"/api/plans/{plan_id}/risks",
+        f"/api/students/{sid}/gpa",
+        f"/api/transcripts/{sid}",
+        f"/api/students/lookup?school_student_id=BENCH-{sid}",
+    ]
+
+    print(f"{'routes':<16} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for label, target in (("sync (before)", _sync_app()), ("async", app)):
+        rate, p50, p99, errors = asyncio.run(_drive(target, paths, args.clients, args.requests))
+        print(
+            f"{label:<16} {args.clients:>8} {rate:>10,.0f} {p50 * 1000:>9.1f} "
+            f"{p99 * 1000:>9.1f} {errors:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark POST /courses and POST /prerequisites service paths.
+
+Compares the old add_all + refresh-per-row implementation with the
+INSERT ... RETURNING (insertmanyvalues) one, reporting statements sent to the
+database and wall-clock latency for 10 / 1k / 10k-row payloads.
+
+Run from gradpath_backend/ against the configured DATABASE_URL:
+
+    python -m scripts.bench_bulk_create
+    python -m scripts.bench_bulk_create --sizes 10 1000
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.models.base import Base
+from app.models.course import Course
+from app.models.prerequisite import Prerequisite
+from app.schemas.course import CourseCreate
+from app.schemas.prerequisite import PrerequisiteCreate
+from app.services.courses import bulk_create_courses
+from app.services.prerequisites import bulk_create_prereqs
+import app.models  # noqa: F401
+
+
+class _RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _legacy_bulk_create(db, model, rows):
+    items = [model(**row.model_dump()) for row in rows]
+    db.add_all(items)
+    db.commit()
+    for item in items:
+        db.refresh(item)
+    return items
+
+
+def _measure(fn):
+    counter = _RoundTrips()
+    event.listen(engine, "before_cursor_execute", counter)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        fn(db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", counter)
+    return counter.count, elapsed
+
+
+def _cleanup(prefix: str):
+    db = SessionLocal()
+    try:
+        db.query(Prerequisite).filter(Prerequisite.course_code.like(f"{prefix}%")).delete(
+            synchronize_session=False
+        )
+        db.query(Course).filter(Course.code.like(f"{prefix}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _payloads(prefix: str, size: int):
+    courses = [
+        CourseCreate(code=f"{prefix}{i:05d}", title=f"Bench course {i}", credits=3)
+        for i in range(size)
+    ]
+    prereqs = [
+        PrerequisiteCreate(course_code=f"{prefix}{i:05d}", prereq_code=f"{prefix}{i - 1:05d}")
+        for i in range(1, size + 1)
+    ]
+    return courses, prereqs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print(f"{'rows':>7} {'path':<10} {'target':<14} {'round trips':>12} {'seconds':>9}")
+    for size in args.sizes:
+        for label, course_fn, prereq_fn in (
+            (
+                "before",
+                lambda db, rows: _legacy_bulk_create(db, Course, rows),
+                lambda db, rows: _legacy_bulk_create(db, Prerequisite, rows),
+            ),
+            ("after", bulk_create_courses, bulk_create_prereqs),
+        ):
+            prefix = f"BN{uuid.uuid4().hex[:6]}-"
+            courses, prereqs = _payloads(prefix, size)
+            try:
+                for target, fn, rows in (
+                    ("courses", course_fn, courses),
+                    ("prerequisites", prereq_fn, prereqs),
+                ):
+                    trips, elapsed = _measure(lambda db: fn(db, rows))
+                    print(f"{size:>7} {label:<10} {target:<14} {trips:>12} {elapsed:>9.3f}")
+            finally:
+                _cleanup(prefix)
+
+
+if __name__ == "__main__":
+    main()
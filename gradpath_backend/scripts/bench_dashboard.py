@@ -0,0 +1,118 @@
+"""
+Benchmark GET /students/{id}/dashboard against the five calls it replaces.
+
+Seeds one student with a confirmed transcript and a generated plan, then
+times the dashboard screen's previous sequence (student, plan, risks, GPA,
+transcript) against the single aggregated request, reporting SQL statements
+and median latency per page load.
+
+Run from gradpath_backend/ against the configured DATABASE_URL (the seeded
+student is left in place):
+
+    python -m scripts.bench_dashboard
+    python -m scripts.bench_dashboard --courses 60 --repeat 200
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.database import async_engine, async_read_engine, engine, read_engine
+from app.main import app
+
+# Every engine a read may go through: the dashboard's reads run on the async
+# engines (and the replicas, when configured), not only the sync primary.
+_ENGINES = list(
+    {
+        id(e): e
+        for e in (
+            engine,
+            read_engine,
+            async_engine.sync_engine,
+            async_read_engine.sync_engine,
+        )
+    }.values()
+)
+
+
+class _RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _seed(client: TestClient, n_courses: int) -> tuple[int, int]:
+    sid = client.post("/api/students", json={"first_name": "Bench", "last_name": "Dashboard"}).json()["id"]
+    terms = ["Fall 2022", "Spring 2023", "Fall 2023", "Spring 2024"]
+    courses = [
+        {
+            "course_code": f"BD {100 + i}",
+            "course_title": f"Bench course {i}",
+            "credits": 3,
+            "term": terms[i % len(terms)],
+            "grade": "ABC"[i % 3],
+        }
+        for i in range(n_courses)
+    ]
+    client.post("/api/transcripts/confirm", json={"student_id": sid, "courses": courses})
+    plan_id = client.post("/api/plans/generate", json={"student_id": sid}).json()["plan_id"]
+    return sid, plan_id
+
+
+def _measure(fn, repeat: int) -> tuple[int, float]:
+    counter = _RoundTrips()
+    fn()  # warm up
+    for e in _ENGINES:
+        event.listen(e, "before_cursor_execute", counter)
+    try:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        for e in _ENGINES:
+            event.remove(e, "before_cursor_execute", counter)
+    return counter.count // repeat, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        sid, plan_id = _seed(client, args.courses)
+
+        def five_calls():
+            for path in (
+                f"/api/students/{sid}",
+                f"/api/plans/{plan_id}",
+                f"/api/plans/{plan_id}/risks",
+                f"/api/students/{sid}/gpa",
+                f"/api/transcripts/{sid}",
+            ):
+                client.get(path).raise_for_status()
+
+        print(f"{'path':<28} {'statements':>10} {'median ms':>10}")
+        for label, fn in (
+            ("five calls (before)", five_calls),
+            ("dashboard", lambda: client.get(f"/api/students/{sid}/dashboard").raise_for_status()),
+            (
+                "dashboard ?fields=gpa,risks",
+                lambda: client.get(
+                    f"/api/students/{sid}/dashboard", params={"fields": "gpa,risks"}
+                ).raise_for_status(),
+            ),
+        ):
+            statements, median = _measure(fn, args.repeat)
+            print(f"{label:<28} {statements:>10} {median * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark the transcript line tokenizers on a synthetic 10k-line transcript.
+
+Compares the previous per-line classification (one regex call per line
+class plus title clean-up substitutions) with the single-match tokenizers,
+and reports lines/second for each, plus end-to-end parser throughput for
+the Philander Smith and generic formats.
+
+Run from gradpath_backend/:
+
+    python -m scripts.bench_line_tokenizer
+    python -m scripts.bench_line_tokenizer --lines 50000
+"""
+import argparse
+import random
+import re
+import time
+
+from app.services.transcript_parser import (
+    _COURSE_RE,
+    _PSU_TITLE_TAG_RE,
+    _TERM_RE,
+    _parse_generic_transcript,
+    _parse_psu_transcript,
+    _tokenize_generic,
+    _tokenize_psu,
+)
+from scripts.bench_transcript_formats import _generic_pages, _philander_smith_pages
+
+_LEGACY_PSU_TERM_RE = re.compile(
+    r"(\d{4})-(\d{4})\s+Academic\s+Year\s*:\s*(Fall|Spring|Summer)\s+Semester", re.I
+)
+_LEGACY_PSU_COURSE_RE = re.compile(
+    r"^([A-Z]{2,5})\s*-\s*(\d{3})\s+(.+?)\s+LT\s*([A-Z+\-]+)\s+([\d]+\.[\d]+)", re.I
+)
+_LEGACY_PSU_SKIP_RE = re.compile(
+    r"^(Term Totals|Career Totals|Page\s*:|Copy of Transcript|Undergraduate Division|"
+    r"Course Number|Bertha|Philander Smith|900 Daisy|ID\s*:|Name\s*:|Address|"
+    r"Abuja|Degree Information|Major|Minor|Registrar|Transcript Official|"
+    r"\*\s*Means|R\s*Means|ACCREDITATION|HISTORY|FAMILY EDUCATIONAL|"
+    r"UNIT OF CREDIT|COURSE NUM|GRADES|REPEATED|FRAUDULENT|OFFICIAL)",
+    re.I,
+)
+
+
+def _legacy_psu(lines) -> int:
+    rows = 0
+    for raw_line in lines:
+        line = raw_line.strip()
+        line = re.sub(r"\.?\s*Copy of Transcript.*$", "", line, flags=re.I).strip()
+        if not line or _LEGACY_PSU_SKIP_RE.match(line):
+            continue
+        if _LEGACY_PSU_TERM_RE.search(line):
+            continue
+        cm = _LEGACY_PSU_COURSE_RE.match(line)
+        if not cm:
+            continue
+        title = re.sub(r"\s*-\s*HYBRID\b", " (Hybrid)", cm.group(3).strip(), flags=re.I)
+        title = re.sub(r"\s*-\s*ONLINE\b", " (Online)", title, flags=re.I)
+        rows += 1
+    return rows
+
+
+def _legacy_generic(content: str) -> int:
+    rows = 0
+    for line in content.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line or _TERM_RE.search(line):
+            continue
+        if _COURSE_RE.search(line):
+            rows += 1
+    return rows
+
+
+def _corpus(build, target_lines: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    lines: list[str] = []
+    while len(lines) < target_lines:
+        for page in build(rng, 4):
+            lines.extend(page.splitlines())
+    return lines[:target_lines]
+
+
+def _rate(fn, n_lines: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n_lines / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    psu_lines = _corpus(_philander_smith_pages, args.lines, args.seed)
+    generic_text = "\n".join(_corpus(_generic_pages, args.lines, args.seed))
+
+    def tokenize_psu():
+        for kind, m in _tokenize_psu(psu_lines):
+            if kind == "course" and "-" in m["title"]:
+                _PSU_TITLE_TAG_RE.sub(lambda t: f" ({t[1].title()})", m["title"])
+
+    print(f"{'parser':<18} {'stage':<22} {'lines/s':>12}")
+    for name, stages in (
+        (
+            "philander_smith",
+            (
+                ("classify (before)", lambda: _legacy_psu(psu_lines)),
+                ("classify (tokenizer)", tokenize_psu),
+                ("full parse", lambda: _parse_psu_transcript(psu_lines)),
+            ),
+        ),
+        (
+            "generic",
+            (
+                ("classify (before)", lambda: _legacy_generic(generic_text)),
+                ("classify (tokenizer)", lambda: sum(1 for _ in _tokenize_generic(generic_text))),
+                ("full parse", lambda: _parse_generic_transcript(generic_text)),
+            ),
+        ),
+    ):
+        for label, fn in stages:
+            print(f"{name:<18} {label:<22} {_rate(fn, args.lines, args.repeat):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark plan storage modes: plan_terms/plan_items rows vs one document.
+
+Seeds a synthetic catalog with prerequisite chains, then generates plans
+with plan_storage="rows" and "document" and reads them back through
+GET /plans/{id}. Reports SQL statements and median latency for the write
+and the read, and the stored document size.
+
+Run from gradpath_backend/ against the configured DATABASE_URL (seeded
+courses, the student and its plans are left in place; the planner uses the
+whole catalog, so a scratch database is best):
+
+    python -m scripts.bench_plan_storage
+    python -m scripts.bench_plan_storage --courses 300 --repeat 20
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal, async_engine, engine
+from app.main import app
+from app.models.plan import Plan
+
+
+class _RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _seed(client: TestClient, n_courses: int) -> int:
+    prefix = f"PS{uuid.uuid4().hex[:4]}-"
+    client.post(
+        "/api/courses",
+        json={
+            "courses": [
+                {"code": f"{prefix}{i:04d}", "title": f"Bench course {i}", "credits": 3}
+                for i in range(n_courses)
+            ]
+        },
+    ).raise_for_status()
+    client.post(
+        "/api/prerequisites",
+        json={
+            "prerequisites": [
+                {"course_code": f"{prefix}{i:04d}", "prereq_code": f"{prefix}{i - 1:04d}"}
+                for i in range(1, n_courses, 4)
+            ]
+        },
+    ).raise_for_status()
+    return client.post("/api/students", json={"first_name": "Bench", "last_name": "Plans"}).json()["id"]
+
+
+def _measure(fn, repeat: int):
+    counter = _RoundTrips()
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    samples, result = [], None
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+    return counter.count // repeat, statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        sid = _seed(client, args.courses)
+        print(f"{'storage':<10} {'step':<8} {'statements':>10} {'median ms':>10}")
+        for mode in ("rows", "document"):
+            settings.plan_storage = mode
+            statements, median, plan_id = _measure(
+                lambda: client.post("/api/plans/generate", json={"student_id": sid}).json()["plan_id"],
+                args.repeat,
+            )
+            print(f"{mode:<10} {'write':<8} {statements:>10} {median * 1000:>10.2f}")
+            statements, median, _ = _measure(
+                lambda: client.get(f"/api/plans/{plan_id}").raise_for_status(), args.repeat
+            )
+            print(f"{mode:<10} {'read':<8} {statements:>10} {median * 1000:>10.2f}")
+
+        db = SessionLocal()
+        try:
+            size = db.scalar(
+                select(func.length(Plan.document)).where(Plan.id == plan_id)
+            )
+        finally:
+            db.close()
+        print(f"document size: {size:,} bytes (gzip)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark streamed plan generation: time to the first term vs the whole plan.
+
+Seeds a synthetic catalog with prerequisite chains, then compares
+POST /plans/generate with the generator behind POST /plans/generate/stream.
+Reports the median time until the first term is produced and until the
+stream is complete. The stream is timed in-process because TestClient
+buffers whole response bodies.
+
+Run from gradpath_backend/ against the configured DATABASE_URL (seeded
+courses and the student are left in place; the planner uses the whole
+catalog, so a scratch database is best):
+
+    python -m scripts.bench_plan_stream
+    python -m scripts.bench_plan_stream --courses 1000 --repeat 10
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.plan import PlanGenerateRequest
+from app.services.planner import generate_plan_stream
+from scripts.bench_plan_storage import _seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-credits", type=int, default=9)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        sid = _seed(client, args.courses)
+        payload = {"student_id": sid, "max_credits": args.max_credits}
+
+        blocking = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            client.post("/api/plans/generate", json=payload).raise_for_status()
+            blocking.append(time.perf_counter() - start)
+
+        first, total, terms = [], [], 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            lines = generate_plan_stream(PlanGenerateRequest(**payload))
+            next(lines)
+            first.append(time.perf_counter() - start)
+            terms = 1 + sum(1 for line in lines if line.startswith('{"event": "term"'))
+            total.append(time.perf_counter() - start)
+
+        print(f"{'request':<22} {'first term ms':>14} {'complete ms':>12}")
+        print(f"{'generate':<22} {'-':>14} {statistics.median(blocking) * 1000:>12.1f}")
+        print(
+            f"{'generate/stream':<22} {statistics.median(first) * 1000:>14.1f} "
+            f"{statistics.median(total) * 1000:>12.1f}"
+        )
+        print(f"terms per plan: {terms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark simulated-plan storage: term-level deltas vs whole plans.
+
+Seeds a synthetic catalog with prerequisite chains, generates a baseline
+plan, then simulates it under a few credit-load/summer scenarios. For each
+scenario reports the stored delta size, the size of a full document for the
+same plan, the plan_terms/plan_items/risks rows a row-stored copy would
+write, and SQL statements for a cold read (materialization) and for
+GET /plans/compare.
+
+Run from gradpath_backend/ against the configured DATABASE_URL (seeded
+courses, the student and its plans are left in place; the planner uses the
+whole catalog, so a scratch database is best):
+
+    python -m scripts.bench_simulation_storage
+    python -m scripts.bench_simulation_storage --courses 300
+"""
+import argparse
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.plan import Plan
+from app.services import plans as plan_service
+from scripts.bench_plan_storage import _measure, _seed
+
+SCENARIOS = (
+    ("unchanged", {}),
+    ("max_credits=12", {"max_credits": 12}),
+    ("max_credits=18", {"max_credits": 18, "summer_ok": True}),
+    ("summer_ok=false", {"summer_ok": False}),
+)
+
+
+def _stored_size(plan_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.length(Plan.document)).where(Plan.id == plan_id))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=120)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        sid = _seed(client, args.courses)
+        base = client.post("/api/plans/generate", json={"student_id": sid}).json()["plan_id"]
+        print(
+            f"{'scenario':<16} {'delta B':>8} {'full B':>8} {'rows':>6} "
+            f"{'read stmts':>10} {'compare stmts':>13}"
+        )
+        for name, overrides in SCENARIOS:
+            sim = client.post("/api/plans/simulate", json={"plan_id": base, **overrides}).json()
+            sim_id = sim["sim_plan_id"]
+
+            # The same plan stored whole, for comparison
+            previous = settings.plan_storage
+            settings.plan_storage = "document"
+            try:
+                full_id = client.post(
+                    "/api/plans/generate", json={"student_id": sid, **overrides}
+                ).json()["plan_id"]
+            finally:
+                settings.plan_storage = previous
+            full = client.get(f"/api/plans/{full_id}").json()
+            rows = len(full["terms"]) + sum(len(t["items"]) for t in full["terms"])
+            rows += len(client.get(f"/api/plans/{full_id}/risks").json())
+
+            plan_service._materialized.clear()
+            read_statements, _, _ = _measure(
+                lambda: client.get(f"/api/plans/{sim_id}").raise_for_status(), 1
+            )
+            compare_statements, _, _ = _measure(
+                lambda: client.get(
+                    "/api/plans/compare",
+                    params={"baseline_plan_id": base, "simulated_plan_id": sim_id},
+                ).raise_for_status(),
+                1,
+            )
+            print(
+                f"{name:<16} {_stored_size(sim_id):>8,} {_stored_size(full_id):>8,} {rows:>6} "
+                f"{read_statements:>10} {compare_statements:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Bulk-import a zip archive of transcript PDFs/CSVs.
+
+The archive must contain a manifest.csv (filename,student_id) unless one is
+given with --manifest. Re-running with the same archive resumes the import:
+files already imported are skipped and failed ones are retried.
+
+Run from gradpath_backend/ against the configured DATABASE_URL:
+
+    python -m scripts.import_transcripts transcripts.zip
+    python -m scripts.import_transcripts transcripts.zip --manifest students.csv
+"""
+import argparse
+import sys
+
+from app.core.database import SessionLocal, engine
+from app.models.base import Base
+from app.services.transcript_import import import_transcript_archive
+import app.models  # noqa: F401
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("archive")
+    parser.add_argument("--manifest")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    manifest = open(args.manifest, "rb") if args.manifest else None
+    try:
+        with open(args.archive, "rb") as archive:
+            report = import_transcript_archive(db, archive, args.archive, manifest)
+    finally:
+        if manifest is not None:
+            manifest.close()
+        db.close()
+
+    for f in report["files"]:
+        detail = f["error"] or f"transcript {f['transcript_id']}, {f['course_count']} courses"
+        print(f"{f['status']:<9} {f['filename']}  {detail}")
+    print(
+        f"\nimport {report['import_id']} {report['status']}: {report['imported']} imported, "
+        f"{report['skipped']} skipped, {report['failed']} failed"
+    )
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,15 +48,30 @@ class _DashboardScreenState extends State<DashboardScreen> {
     _loadData();
   }
 
+  /// Loads everything the overview shows from the aggregated dashboard
+  /// endpoint in a single request.
   Future<void> _loadData() async {
     if (!mounted) return;
     setState(() => _loading = true);
     try {
-      await Future.wait([
-        _loadGpa(),
-        _loadTranscript(),
-        _loadPlanData(),
-      ]);
+      final id = widget.studentId;
+      if (id == null) return;
+      final uri = Uri.parse(
+          '${GradPathConfig.backendBaseUrl}/api/students/$id/dashboard');
+      final resp = await http.get(uri);
+      if (resp.statusCode != 200 || !mounted) return;
+      final data = jsonDecode(resp.body) as Map<String, dynamic>;
+      final gpa = data['gpa'] as Map<String, dynamic>?;
+      setState(() {
+        _gpa = (gpa?['gpa'] as num?)?.toDouble();
+        _risks = ((data['risks'] as List?) ?? [])
+            .whereType<Map<String, dynamic>>()
+            .toList();
+      });
+      _applyTranscript(data['transcript'] as Map<String, dynamic>?);
+      _applyPlan(
+          data['plan'] as Map<String, dynamic>? ?? widget.planDetail);
+    } catch (_) {
     } finally {
       if (mounted) {
         setState(() {
@@ -67,99 +82,29 @@ class _DashboardScreenState extends State<DashboardScreen> {
     }
   }
 
-  /// Fetches the latest plan for this student, resolving the plan ID
-  /// from the student endpoint, then loads risks and
-  /// fills in projected graduation from the plan when transcript is empty.
-  Future<void> _loadPlanData() async {
-    final id = widget.studentId;
-    if (id == null) return;
-
-    // Always fetch the latest plan_id from student endpoint for freshness
-    int? planId;
-    try {
-      final uri =
-          Uri.parse('${GradPathConfig.backendBaseUrl}/api/students/$id');
-      final resp = await http.get(uri);
-      if (resp.statusCode == 200) {
-        final data = jsonDecode(resp.body) as Map<String, dynamic>;
-        planId = data['plan_id'] as int?;
-      }
-    } catch (_) {}
-    // Fall back to widget prop if student fetch failed
-    planId ??= widget.planDetail?['id'] as int?;
-    if (planId == null) return;
-
-    // Load risks
-    try {
-      final uri =
-          Uri.parse('${GradPathConfig.backendBaseUrl}/api/plans/$planId/risks');
-      final resp = await http.get(uri);
-      if (resp.statusCode == 200 && mounted) {
-        final raw = jsonDecode(resp.body);
-        final items = raw is List
-            ? raw.whereType<Map<String, dynamic>>().toList()
-            : ((raw as Map)['risks'] as List? ?? [])
-                .whereType<Map<String, dynamic>>()
-                .toList();
-        setState(() {
-          _risks = items;
-        });
-      }
-    } catch (_) {}
-
-    // Load plan to derive projected grad when transcript is empty
-    try {
-      final uri =
-          Uri.parse('${GradPathConfig.backendBaseUrl}/api/plans/$planId');
-      final resp = await http.get(uri);
-      if (resp.statusCode == 200) {
-        final data = jsonDecode(resp.body) as Map<String, dynamic>;
-        final terms = (data['terms'] as List?) ?? [];
-        if (terms.isNotEmpty) {
-          // Last term in the plan is the projected graduation term
-          final lastTerm = terms.last as Map<String, dynamic>?;
-          final termName = lastTerm?['term_name'] as String?;
-          if (termName != null && mounted) {
-            setState(() {
-              // Only set from plan if transcript didn't already set it
-              _projectedGrad ??= termName;
-            });
-          }
-        }
-      }
-    } catch (_) {}
-  }
-
-  Future<void> _loadGpa() async {
-    final id = widget.studentId;
-    if (id == null) return;
-    try {
-      final uri =
-          Uri.parse('${GradPathConfig.backendBaseUrl}/api/students/$id/gpa');
-      final resp = await http.get(uri);
-      if (resp.statusCode != 200) return;
-      final data = jsonDecode(resp.body) as Map<String, dynamic>;
-      if (!mounted) return;
+  /// Fills in projected graduation from the plan's last term when the
+  /// transcript did not already set it.
+  void _applyPlan(Map<String, dynamic>? plan) {
+    final terms = (plan?['terms'] as List?) ?? [];
+    if (terms.isEmpty) return;
+    // Last term in the plan is the projected graduation term
+    final lastTerm = terms.last as Map<String, dynamic>?;
+    final termName = lastTerm?['term_name'] as String?;
+    if (termName != null && mounted) {
       setState(() {
-        _gpa = (data['gpa'] as num?)?.toDouble();
+        _projectedGrad ??= termName;
       });
-    } catch (_) {}
+    }
   }
 
-  /// Loads transcript courses and derives:
+  /// Derives from the transcript courses:
   ///  - completed credits (graded terms)
   ///  - WIP credits & term name (current in-progress semester)
   ///  - transcript term count
   ///  - projected graduation term
-  Future<void> _loadTranscript() async {
-    final id = widget.studentId;
-    if (id == null) return;
+  void _applyTranscript(Map<String, dynamic>? data) {
+    if (data == null) return;
     try {
-      final uri =
-          Uri.parse('${GradPathConfig.backendBaseUrl}/api/transcripts/$id');
-      final resp = await http.get(uri);
-      if (resp.statusCode != 200) return;
-      final data = jsonDecode(resp.body) as Map<String, dynamic>;
       final courses = (data['courses'] as List?) ?? [];
       if (courses.isEmpty) return;
 
@@ -85,63 +85,42 @@ class _ExportScreenState extends State<ExportScreen> {
     Map<String, dynamic>? plan = widget.planDetail;
     int? planId = plan?['id'] as int?;
 
-    // ── Step 1: resolve plan — always fetch fresh from backend ──
+    // One aggregated request: student, latest plan, risks, GPA, transcript
     if (sid != null) {
       try {
         final res = await http
-            .get(Uri.parse('$base/api/students/$sid'))
+            .get(Uri.parse('$base/api/students/$sid/dashboard'))
             .timeout(const Duration(seconds: 10));
         if (res.statusCode == 200) {
-          final body = jsonDecode(res.body) as Map<String, dynamic>;
-          // Capture school-issued student ID and program name
-          _schoolStudentId = body['student_id'] as String?;
-          final rawMajor = body['major'] as String?;
+          final data = jsonDecode(res.body) as Map<String, dynamic>;
+
+          // ── Student: school-issued ID and program name ────────
+          final student = data['student'] as Map<String, dynamic>?;
+          _schoolStudentId = student?['student_id'] as String?;
+          final rawMajor = student?['major'] as String?;
           // Strip accidental trailing punctuation from major
           _programName = rawMajor?.replaceAll(RegExp(r'[\.\s]+$'), '').trim();
-          final latestId = body['plan_id'] as int?;
-          final targetId = latestId ?? planId;
-          if (targetId != null) {
-            // Always fetch fresh plan to ensure up-to-date data
-            final pRes = await http
-                .get(Uri.parse('$base/api/plans/$targetId'))
-                .timeout(const Duration(seconds: 10));
-            if (pRes.statusCode == 200) {
-              plan = jsonDecode(pRes.body) as Map<String, dynamic>;
-              planId = targetId;
-            }
+
+          // ── Latest plan (falls back to the widget's plan) ─────
+          final fresh = data['plan'] as Map<String, dynamic>?;
+          if (fresh != null) {
+            plan = fresh;
+            planId = fresh['id'] as int?;
           }
-        }
-      } catch (_) {}
-    }
 
-    // ── Step 2: GPA ─────────────────────────────────────────────
-    if (sid != null) {
-      try {
-        final res = await http
-            .get(Uri.parse('$base/api/students/$sid/gpa'))
-            .timeout(const Duration(seconds: 10));
-        if (res.statusCode == 200) {
-          final body = jsonDecode(res.body);
-          final raw = body['gpa'] ?? body['cumulative_gpa'];
-          if (raw != null && raw.toString() != 'null') {
+          // ── GPA ───────────────────────────────────────────────
+          final gpa = data['gpa'] as Map<String, dynamic>?;
+          final raw = gpa?['gpa'];
+          if (raw != null) {
             final d = double.tryParse(raw.toString());
             if (d != null && d > 0) {
               _gpa = d.toStringAsFixed(2);
             }
           }
-        }
-      } catch (_) {}
-    }
 
-    // ── Step 3: completed credits + WIP term from transcript ────
-    if (sid != null) {
-      try {
-        final res = await http
-            .get(Uri.parse('$base/api/transcripts/$sid'))
-            .timeout(const Duration(seconds: 10));
-        if (res.statusCode == 200) {
-          final body = jsonDecode(res.body) as Map<String, dynamic>;
-          final courses = (body['courses'] as List?) ?? [];
+          // ── Completed credits + WIP term from transcript ──────
+          final transcript = data['transcript'] as Map<String, dynamic>?;
+          final courses = (transcript?['courses'] as List?) ?? [];
           int sum = 0;
           final Map<String, List<Map<String, dynamic>>> wipGrouped = {};
           for (final c in courses) {
@@ -186,21 +165,11 @@ class _ExportScreenState extends State<ExportScreen> {
               'status': 'wip',
             };
           }
-        }
-      } catch (_) {}
-    }
 
-    // ── Step 4: risks ────────────────────────────────────────────
-    if (planId != null) {
-      try {
-        final res = await http
-            .get(Uri.parse('$base/api/plans/$planId/risks'))
-            .timeout(const Duration(seconds: 10));
-        if (res.statusCode == 200) {
-          final raw = jsonDecode(res.body);
-          if (raw is List) {
-            _risks = raw.whereType<Map<String, dynamic>>().toList();
-          }
+          // ── Risks ─────────────────────────────────────────────
+          _risks = ((data['risks'] as List?) ?? [])
+              .whereType<Map<String, dynamic>>()
+              .toList();
         }
       } catch (_) {}
     }
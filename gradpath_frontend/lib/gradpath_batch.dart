@@ -0,0 +1,36 @@
+import 'dart:convert';
+
+import 'package:http/http.dart' as http;
+
+import 'gradpath_config.dart';
+
+/// One sub-response from `POST /api/batch`.
+class BatchResult {
+  const BatchResult(this.status, this.body);
+
+  final int status;
+  final dynamic body;
+
+  bool get ok => status >= 200 && status < 300;
+}
+
+/// Runs several `/api` requests in one round trip; results come back in the
+/// same order. Each entry is `{'method': 'GET', 'path': '/api/...'}`, with
+/// optional `query`, `headers` and `body`.
+Future<List<BatchResult>> fetchBatch(
+  List<Map<String, dynamic>> requests, {
+  Map<String, String> headers = const {},
+}) async {
+  final resp = await http.post(
+    Uri.parse('${GradPathConfig.backendBaseUrl}/api/batch'),
+    headers: {'Content-Type': 'application/json', ...headers},
+    body: jsonEncode({'requests': requests}),
+  );
+  if (resp.statusCode < 200 || resp.statusCode >= 300) {
+    throw Exception('Batch request failed (${resp.statusCode}).');
+  }
+  return (jsonDecode(resp.body) as List)
+      .whereType<Map<String, dynamic>>()
+      .map((r) => BatchResult((r['status'] as num).toInt(), r['body']))
+      .toList();
+}
@@ -5,6 +5,10 @@ class GradPathConfig {
   static const backendBaseUrl = String.fromEnvironment("BACKEND_BASE_URL",
       defaultValue: "http://127.0.0.1:8000");
 
+  /// Sent on reads that must see a write made just before (e.g. fetching a
+  /// freshly generated plan) so the backend skips its read replica.
+  static const readYourWritesHeaders = {'X-Read-Your-Writes': '1'};
+
   static bool get hasCollegeScorecardKey =>
       collegeScorecardApiKey.trim().isNotEmpty;
 }
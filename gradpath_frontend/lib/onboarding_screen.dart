@@ -406,6 +406,11 @@ class _OnboardingScreenState extends State<OnboardingScreen> {
         if (response.statusCode < 200 || response.statusCode >= 300) {
           throw Exception(body.isNotEmpty ? body : "Upload failed");
         }
+        // PDFs are processed in the background; wait so the plan sees them.
+        await _waitForProcessing(
+          file.kind,
+          jsonDecode(body) as Map<String, dynamic>,
+        );
         setState(() {
           _selectedFiles[i] =
               file.copyWith(status: _UploadStatus.done, message: null);
@@ -423,6 +428,30 @@ class _OnboardingScreenState extends State<OnboardingScreen> {
     }
   }
 
+  Future<void> _waitForProcessing(
+      _UploadKind kind, Map<String, dynamic> upload) async {
+    const pending = {"received", "extracting"};
+    var status = upload["status"] as String?;
+    final id = upload["id"];
+    if (id == null || !pending.contains(status)) return;
+    const base = GradPathConfig.backendBaseUrl;
+    final uri = kind == _UploadKind.transcript
+        ? Uri.parse("$base/api/transcripts/uploads/$id")
+        : Uri.parse("$base/api/documents/$id");
+    for (var attempt = 0;
+        attempt < 60 && pending.contains(status);
+        attempt++) {
+      await Future.delayed(const Duration(seconds: 1));
+      final response = await http.get(uri);
+      if (response.statusCode < 200 || response.statusCode >= 300) return;
+      status = (jsonDecode(response.body) as Map<String, dynamic>)["status"]
+          as String?;
+    }
+    if (status == "failed") {
+      throw Exception("We couldn't read this file. Try a different PDF.");
+    }
+  }
+
   String _friendlyUploadError(Object err) {
     final raw = err.toString();
     if (raw.contains("Failed to fetch") ||
@@ -468,7 +497,8 @@ class _OnboardingScreenState extends State<OnboardingScreen> {
 
   Future<Map<String, dynamic>> _fetchPlan(int planId) async {
     final uri = Uri.parse("${GradPathConfig.backendBaseUrl}/api/plans/$planId");
-    final response = await http.get(uri);
+    final response =
+        await http.get(uri, headers: GradPathConfig.readYourWritesHeaders);
     if (response.statusCode < 200 || response.statusCode >= 300) {
       throw Exception("Unable to load plan details.");
     }
@@ -112,6 +112,7 @@ class _ReturningStudentScreenState extends State<ReturningStudentScreen> {
       // ── 3. Fetch plan detail ──────────────────────────────────────────────
       final planResp = await http.get(
         Uri.parse('${GradPathConfig.backendBaseUrl}/api/plans/$planId'),
+        headers: GradPathConfig.readYourWritesHeaders,
       );
       if (planResp.statusCode != 200) {
         setState(
@@ -4,6 +4,7 @@ import 'package:flutter/gestures.dart';
 import 'package:flutter/material.dart';
 import 'package:http/http.dart' as http;
 
+import 'gradpath_batch.dart';
 import 'gradpath_config.dart';
 import 'gradpath_theme.dart';
 
@@ -112,35 +113,34 @@ class _ScheduleScreenState extends State<ScheduleScreen> {
           (jsonDecode(genResp.body) as Map<String, dynamic>)['plan_id'] as int?;
       if (planId == null) throw Exception('No plan ID returned.');
 
-      // ── 2. Fetch plan detail ───────────────────────────────────────────────
-      final planResp = await http
-          .get(Uri.parse('${GradPathConfig.backendBaseUrl}/api/plans/$planId'));
-      if (planResp.statusCode < 200 || planResp.statusCode >= 300) {
+      // ── 2–4. Fetch plan detail, transcript and GPA in one round trip ──────
+      final results = await fetchBatch([
+        {'path': '/api/plans/$planId'},
+        {'path': '/api/transcripts/$studentId'},
+        {'path': '/api/students/$studentId/gpa'},
+      ], headers: GradPathConfig.readYourWritesHeaders);
+      final planResult = results[0];
+      if (!planResult.ok || planResult.body is! Map<String, dynamic>) {
         throw Exception('Unable to load updated plan.');
       }
-      final planDetail = jsonDecode(planResp.body) as Map<String, dynamic>;
+      final planDetail = planResult.body as Map<String, dynamic>;
 
-      // ── 3. Fetch transcript ────────────────────────────────────────────────
-      final transcriptResp = await http.get(Uri.parse(
-          '${GradPathConfig.backendBaseUrl}/api/transcripts/$studentId'));
-      final transcriptCourses = transcriptResp.statusCode == 200
-          ? ((jsonDecode(transcriptResp.body)
-                  as Map<String, dynamic>)['courses'] as List? ??
+      final transcriptResult = results[1];
+      final transcriptCourses = transcriptResult.status == 200 &&
+              transcriptResult.body is Map<String, dynamic>
+          ? ((transcriptResult.body as Map<String, dynamic>)['courses']
+                  as List? ??
               [])
           : <dynamic>[];
 
-      // ── 4. Fetch GPA ───────────────────────────────────────────────────────
       double? newGpa;
       int? newGpaCredits;
-      try {
-        final gpaResp = await http.get(Uri.parse(
-            '${GradPathConfig.backendBaseUrl}/api/students/$studentId/gpa'));
-        if (gpaResp.statusCode == 200) {
-          final g = jsonDecode(gpaResp.body) as Map<String, dynamic>;
-          newGpa = (g['gpa'] as num?)?.toDouble();
-          newGpaCredits = (g['credits'] as num?)?.toInt();
-        }
-      } catch (_) {}
+      final gpaResult = results[2];
+      if (gpaResult.status == 200 && gpaResult.body is Map<String, dynamic>) {
+        final g = gpaResult.body as Map<String, dynamic>;
+        newGpa = (g['gpa'] as num?)?.toDouble();
+        newGpaCredits = (g['credits'] as num?)?.toInt();
+      }
 
       if (!mounted) return;
 